@@ -1,8 +1,10 @@
 from __future__ import annotations
 from statistics import variance
 
+import functools
 import gradio as gr
 import json
+import os
 
 from handlers import (
     connect,
@@ -15,16 +17,63 @@ from handlers import (
     list_tools_with_history,
     invoke_tool_with_history,
     ping_with_history,
+    custom_request_with_history,
+    RAW_REQUEST_ROUTES,
+    set_log_level_handler,
+    log_tail_handler,
+    clear_logs_handler,
     get_sampling_log,
     start_oauth_flow,
+    guided_oauth_start,
+    guided_oauth_continue,
+    OAUTH_GUIDED_STEPS,
     clear_oauth_state,
     get_server_notifications_handler,
     update_roots_handler,
     get_pending_sampling_requests,
     submit_sampling_response,
+    build_tool_inputs,
+    search_handler,
+    load_history,
+    page_history,
+    clear_history,
+    FLEET_COLUMNS,
+    fleet_connect_handler,
+    fleet_disconnect_handler,
+    fleet_operation_handler,
+    CONNECTED_SOURCE,
+    catalog_sources,
+    refresh_catalog_sources,
+    save_catalog_snapshot_handler,
+    catalog_diff_handler,
+    SWEEP_COLUMNS,
+    SWEEP_SOURCES,
+    sweep_handler,
+    argument_completer,
+    supports_completions,
+    stdio_status_handler,
+    MONITOR_COLUMNS,
+    monitor_targets,
+    refresh_monitor_targets,
+    add_monitor_job_handler,
+    remove_monitor_job_handler,
+    monitor_dashboard_handler,
 )
 
+from blob_store import BLOB_DIR
+from concurrency import LONG_CALL_LANE, POLL_LANE, configure as configure_queue
+from history_store import session_secret
+from log_stream import LEVELS as LOG_LEVELS
+from monitor import CONNECTED_TARGET as MONITOR_CONNECTED_TARGET, JOB_KINDS as MONITOR_JOB_KINDS
+import metrics
+import tracing
+from schema_forms import collect_arguments, get_tool_spec
+from inprocess import IN_PROCESS_TRANSPORT
+import stdio_servers
+from stdio_servers import ALLOW_LOCAL_SERVERS, POOL_SIZE as STDIO_POOL_SIZE, STDIO_TRANSPORT
+from sweep import SWEEP_DIR
 from theme import CustomTheme
+from uri_template import TemplateError, expand as expand_uri_template, variables as uri_template_variables
 
 css = """
 .resource-content-display {
@@ -61,8 +110,13 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
 
     gr.Markdown("# Gradio MCP Inspector")
     server_url_state = gr.State("")
-    history_state = gr.State([])
-    tools_state = gr.State([])
+    # Only the history session key lives in the browser; handlers read it but never send it back
+    history_state = gr.BrowserState(
+        {"session": ""},
+        storage_key="mcp_inspector_history",
+        secret=session_secret(),
+    )
+    tools_state = gr.State({})
     resources_state = gr.State([])
     templates_state = gr.State([])
     prompts_state = gr.State([])
@@ -71,7 +125,7 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
     with gr.Row(equal_height=True):
         with gr.Column(scale=1, min_width=320):
             transport_type = gr.Dropdown(
-                ["Streamable HTTP","SSE"],
+                ["Streamable HTTP","SSE"] + ([STDIO_TRANSPORT, IN_PROCESS_TRANSPORT] if ALLOW_LOCAL_SERVERS else []),
                 label="Transport Type",
                 value="Streamable HTTP",
             )
@@ -79,6 +133,43 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                 label="URL",
                 placeholder="https://your-mcp-server.example/mcp",
             )
+            with gr.Group(visible=False) as stdio_group:
+                stdio_command = gr.Textbox(label="Command", placeholder="python server.py")
+                stdio_args = gr.Textbox(label="Arguments", placeholder="--port 0 --verbose")
+                stdio_env = gr.Textbox(label="Environment", placeholder="KEY=value, one per line", lines=2)
+                stdio_pool = gr.Number(
+                    label="Prewarmed Processes",
+                    value=STDIO_POOL_SIZE,
+                    precision=0,
+                    minimum=0,
+                    info="Idle server processes kept ready for the next connect",
+                )
+            with gr.Accordion("Server Process", open=False, visible=False) as stdio_process:
+                stdio_status = gr.Markdown("_No stdio server connected._")
+                stdio_stderr = gr.Code(label="stderr", language=None, lines=10, max_lines=20, interactive=False)
+                stdio_key_state = gr.State(None)
+                stdio_timer = gr.Timer(1.0)
+            stdio_timer.tick(
+                stdio_status_handler,
+                inputs=[stdio_key_state],
+                outputs=[stdio_status, stdio_stderr, stdio_key_state],
+                show_progress="hidden",
+                **POLL_LANE,
+            )
+
+            def _transport_fields(transport):
+                if transport == IN_PROCESS_TRANSPORT:
+                    url = gr.update(visible=True, label="Server Object", placeholder="my_package.server:mcp or path/to/server.py:mcp")
+                else:
+                    url = gr.update(visible=transport != STDIO_TRANSPORT, label="URL", placeholder="https://your-mcp-server.example/mcp")
+                stdio = gr.update(visible=transport == STDIO_TRANSPORT)
+                return url, stdio, stdio
+
+            transport_type.change(
+                _transport_fields,
+                inputs=[transport_type],
+                outputs=[base_url_input, stdio_group, stdio_process],
+            )
 
             with gr.Accordion("Authentication", open=False):
                 header_name = gr.Textbox(label="Header Name",value="Authorization")
@@ -100,12 +191,12 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
 
             initial_connect_btn.click(
                 connect,
-                inputs=[transport_type, base_url_input, header_name, bearer_token, request_timeout, reset_timeout_on_progress, max_total_timeout, roots_state],
+                inputs=[transport_type, base_url_input, header_name, bearer_token, request_timeout, reset_timeout_on_progress, max_total_timeout, roots_state, stdio_command, stdio_args, stdio_env, stdio_pool],
                 outputs=[server_url_state, status_badge, initial_connect_btn, reconnect_btn, disconnect_btn],
             )
             reconnect_btn.click(
                 connect,
-                inputs=[transport_type, base_url_input, header_name, bearer_token, request_timeout, reset_timeout_on_progress, max_total_timeout, roots_state],
+                inputs=[transport_type, base_url_input, header_name, bearer_token, request_timeout, reset_timeout_on_progress, max_total_timeout, roots_state, stdio_command, stdio_args, stdio_env, stdio_pool],
                 outputs=[server_url_state, status_badge, initial_connect_btn, reconnect_btn, disconnect_btn],
             )
             disconnect_btn.click(
@@ -158,58 +249,63 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                                             gr.Markdown(f"### {tmpl.get('name', 'Template')}")
                                             gr.Markdown(tmpl.get("description", "No description provided."))
                                             
-                                            # Parse URI template to extract parameters
+                                            # Template is parsed once and cached by uri_template
                                             uri_template = tmpl.get("uriTemplate", "")
-                                            import re
-                                            path_params = re.findall(r'/\{([^}]+)\}', uri_template)
-                                            query_match = re.search(r'\{\?([^}]+)\}', uri_template)
-                                            query_params = query_match.group(1).split(',') if query_match else []
-                                            
+                                            try:
+                                                template_vars = uri_template_variables(uri_template)
+                                            except TemplateError as exc:
+                                                gr.Markdown(f"⚠️ {exc}")
+                                                template_vars = []
+
                                             inputs = {}
-                                            
+
                                             with gr.Group():
-                                                # Path parameters
-                                                for param in path_params:
-                                                    inputs[param] = gr.Textbox(
-                                                        label=param,
-                                                        placeholder=f"Enter {param}"
-                                                    )
-                                                
-                                                # Query parameters
-                                                for param in query_params:
-                                                    inputs[param] = gr.Textbox(
-                                                        label=param,
-                                                        placeholder=f"Enter {param} (optional)"
-                                                    )
-                                                
+                                                completions = supports_completions()
+                                                for var in template_vars:
+                                                    optional = var["operator"] in ("?", "&")
+                                                    hint = "comma separated values" if var["explode"] else f"Enter {var['name']}"
+                                                    if completions:
+                                                        inputs[var["name"]] = gr.Dropdown(
+                                                            label=var["name"],
+                                                            info=hint + (" (optional)" if optional else ""),
+                                                            choices=[],
+                                                            value=None,
+                                                            allow_custom_value=True,
+                                                        )
+                                                    else:
+                                                        inputs[var["name"]] = gr.Textbox(
+                                                            label=var["name"],
+                                                            placeholder=hint + (" (optional)" if optional else ""),
+                                                        )
+
+                                                if completions:
+                                                    names = list(inputs)
+                                                    for name, field in inputs.items():
+                                                        field.key_up(
+                                                            argument_completer("template", uri_template, name, names),
+                                                            inputs=list(inputs.values()),
+                                                            outputs=field,
+                                                            trigger_mode="always_last",
+                                                            show_progress="hidden",
+                                                        )
+
                                                 read_btn = gr.Button("Read Resource", variant="primary")
-                                            
+
                                             async def wrapper(base_url, timeout, history, *form_values):
-                                                # Build the URI from template and parameters
-                                                uri = uri_template
-                                                keys = list(inputs.keys())
-                                                
-                                                # Replace path parameters
-                                                for i, key in enumerate(keys):
-                                                    val = form_values[i]
-                                                    if key in path_params and val:
-                                                        uri = uri.replace(f"{{{key}}}", val)
-                                                
-                                                # Build query string from query parameters
-                                                query_parts = []
-                                                for i, key in enumerate(keys):
-                                                    val = form_values[i]
-                                                    if key in query_params and val:
-                                                        query_parts.append(f"{key}={val}")
-                                                
-                                                if query_parts:
-                                                    uri = uri.replace(f"{{?{','.join(query_params)}}}", f"?{'&'.join(query_parts)}")
-                                                else:
-                                                    uri = uri.replace(f"{{?{','.join(query_params)}}}", "")
-                                                
+                                                # Empty fields are undefined and drop out of the expansion
+                                                values = {}
+                                                for var, val in zip(template_vars, form_values):
+                                                    if val:
+                                                        values[var["name"]] = [v.strip() for v in val.split(",")] if var["explode"] else val
+                                                try:
+                                                    uri = expand_uri_template(uri_template, values)
+                                                except TemplateError as exc:
+                                                    message = f"⚠️ {exc}"
+                                                    return gr.update(visible=False), gr.update(value=message, visible=True), message, gr.skip()
+
                                                 timeout_sec = float(timeout) / 1000.0 if timeout else 30.0
                                                 from handlers import read_resource_with_history
-                                                request, response, history, rendered = await read_resource_with_history(base_url, timeout_sec, uri, history)
+                                                request, response, rendered = await read_resource_with_history(base_url, timeout_sec, uri, history)
                                                 
                                                 # Parse response to extract text
                                                 display_text = response
@@ -233,14 +329,14 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                                                     gr.update(value=request, visible=True),
                                                     gr.update(value=response, visible=True),
                                                     display_text,
-                                                    history,
                                                     rendered
                                                 )
                                             
                                             read_btn.click(
                                                 wrapper,
                                                 inputs=[server_url_state, request_timeout, history_state] + list(inputs.values()),
-                                                outputs=[template_read_request, template_read_response, content_display_state, history_state, history_panel]
+                                                outputs=[template_read_request, template_read_response, content_display_state, history_panel],
+                                                **LONG_CALL_LANE,
                                             )
                                     
                                     # Show resource header if a resource is selected
@@ -273,6 +369,29 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                                                 pass
                                             gr.Markdown(f"```json\n{display_text}\n```")
 
+                    with gr.Accordion("Sweep", open=False):
+                        gr.Markdown(
+                            "Read many resources concurrently. Parameter sets are JSON lines or CSV with a header row, "
+                            "one set per line. Results are written to a JSONL file as they complete."
+                        )
+                        with gr.Row():
+                            sweep_source = gr.Radio(list(SWEEP_SOURCES), value=SWEEP_SOURCES[0], label="Source", scale=2)
+                            sweep_concurrency = gr.Slider(1, 64, value=8, step=1, label="Concurrency", scale=1)
+                        sweep_template = gr.Dropdown(
+                            [], label="URI Template", allow_custom_value=True,
+                            info="Pick a listed template or type one",
+                        )
+                        sweep_params = gr.Code(label="Parameter Sets (JSONL or CSV)", language=None, lines=5)
+                        sweep_btn = gr.Button("Run Sweep", variant="primary")
+                        sweep_summary = gr.Markdown("")
+                        sweep_results = gr.Dataframe(
+                            headers=SWEEP_COLUMNS,
+                            datatype=["str", "str", "number", "str", "str"],
+                            interactive=False,
+                            wrap=True,
+                        )
+                        sweep_file = gr.File(label="Results (JSONL)")
+
                     with gr.Accordion("Debug Info", open=False):
                         resource_list_request = gr.Code(label="List Request", language="json")
                         resource_list_response = gr.Code(label="List Response", language="json")
@@ -310,12 +429,28 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                                 inputs = {}
                                 
                                 with gr.Group():
+                                    completions = supports_completions()
                                     for arg in arguments:
                                         arg_name = arg["name"]
                                         label = arg_name + (" *" if arg.get("required") else "")
                                         desc = arg.get("description", "")
                                         # Prompts usually take string arguments
-                                        inputs[arg_name] = gr.Textbox(label=label, placeholder=desc)
+                                        if completions:
+                                            inputs[arg_name] = gr.Dropdown(
+                                                label=label, info=desc or None, choices=[], value=None, allow_custom_value=True
+                                            )
+                                        else:
+                                            inputs[arg_name] = gr.Textbox(label=label, placeholder=desc)
+
+                                    if completions:
+                                        for arg_name, field in inputs.items():
+                                            field.key_up(
+                                                argument_completer("prompt", prompt_name, arg_name, list(inputs)),
+                                                inputs=list(inputs.values()),
+                                                outputs=field,
+                                                trigger_mode="always_last",
+                                                show_progress="hidden",
+                                            )
 
                                     run_btn = gr.Button("Get Prompt", variant="primary")
                                 
@@ -328,17 +463,17 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                                             args[key] = val
                                     # Convert timeout (ms) to seconds for the handler
                                     timeout_sec = float(timeout) / 1000.0 if timeout else 30.0
-                                    request, response, history, rendered = await invoke_prompt_with_history(base_url, timeout_sec, prompt_name, json.dumps(args), history)
+                                    request, response, rendered = await invoke_prompt_with_history(base_url, timeout_sec, prompt_name, json.dumps(args), history)
                                     return (
                                         gr.update(value=response, visible=True),
-                                        history,
                                         rendered
                                     )
 
                                 run_btn.click(
                                     wrapper,
                                     inputs=[server_url_state, request_timeout, history_state] + list(inputs.values()),
-                                    outputs=[prompt_call_response, history_state, history_panel]
+                                    outputs=[prompt_call_response, history_panel],
+                                    **LONG_CALL_LANE,
                                 )
 
                             prompt_call_response = gr.Markdown(label="Result", visible=False)
@@ -364,81 +499,34 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                                     gr.Markdown("Select a tool from the list to view its details and run it")
                                     return
                                 
-                                tool = next((t for t in tools if t["name"] == tool_name), None)
+                                tool = tools.get(tool_name)
                                 if not tool:
                                     return
 
                                 gr.Markdown(f"### {tool['name']}")
                                 gr.Markdown(tool.get("description", "No description provided."))
                                 
-                                schema = tool.get("inputSchema", {})
-                                properties = schema.get("properties", {})
-                                required = schema.get("required", [])
-                                
-                                inputs = {}
-                                
+                                spec = get_tool_spec(tool)
                                 with gr.Group():
-                                    for prop_name, prop_schema in properties.items():
-                                        label = prop_name + (" *" if prop_name in required else "")
-                                        prop_type = prop_schema.get("type", "string")
-                                        desc = prop_schema.get("description", "")
-                                        default_val = prop_schema.get("default", None)
-                                        enum_vals = prop_schema.get("enum", None)
-                                        
-                                        if enum_vals:
-                                            inputs[prop_name] = gr.Dropdown(
-                                                label=label, 
-                                                choices=enum_vals, 
-                                                value=default_val, 
-                                                info=desc
-                                            )
-                                        elif prop_type == "string":
-                                            inputs[prop_name] = gr.Textbox(
-                                                label=label, 
-                                                placeholder=desc, 
-                                                value=default_val if default_val is not None else ""
-                                            )
-                                        elif prop_type == "integer" or prop_type == "number":
-                                            inputs[prop_name] = gr.Number(
-                                                label=label, 
-                                                info=desc, 
-                                                value=default_val
-                                            )
-                                        elif prop_type == "boolean":
-                                            inputs[prop_name] = gr.Checkbox(
-                                                label=label, 
-                                                info=desc, 
-                                                value=default_val if default_val is not None else False
-                                            )
-                                        else:
-                                            # For arrays/objects, try to show default as JSON if exists
-                                            def_json = json.dumps(default_val) if default_val is not None else "{}"
-                                            inputs[prop_name] = gr.Code(
-                                                label=label + " (JSON)", 
-                                                language="json", 
-                                                value=def_json
-                                            )
-
+                                    inputs = build_tool_inputs(spec["fields"])
                                     run_btn = gr.Button("Run Tool", variant="primary")
                                 
                                 async def wrapper(base_url, timeout, history, *form_values):
-                                    args = {}
-                                    keys = list(inputs.keys())
-                                    for i, key in enumerate(keys):
-                                        val = form_values[i]
-                                        # Only include if it has a value or is required? 
-                                        # For now, include if not None/Empty string to avoid sending empty strings for optional fields
-                                        if val is not None and val != "":
-                                            args[key] = val
-                                    
+                                    args, errors = collect_arguments(spec["fields"], form_values)
+                                    # Unparseable JSON fields never reach the client; schema checks happen in invoke_tool
+                                    if errors:
+                                        message = "**Invalid arguments:**\n\n" + "\n".join(f"- `{e}`" for e in errors)
+                                        return json.dumps(args, indent=2), message, gr.update()
+
                                     # Convert timeout (ms) to seconds
                                     timeout_sec = float(timeout) / 1000.0 if timeout else 30.0
                                     return await invoke_tool_with_history(base_url, timeout_sec, tool_name, json.dumps(args), history)
 
                                 run_btn.click(
                                     wrapper,
-                                    inputs=[server_url_state, request_timeout, history_state] + list(inputs.values()),
-                                    outputs=[tool_call_request, tool_call_response, history_state, history_panel]
+                                    inputs=[server_url_state, request_timeout, history_state] + inputs,
+                                    outputs=[tool_call_request, tool_call_response, history_panel],
+                                    **LONG_CALL_LANE,
                                 )
                             tool_call_response = gr.Markdown(label="Tool Result")
                     with gr.Accordion("Debug Info", open=False):
@@ -452,6 +540,21 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                         with gr.Column(scale=0, min_width=150):
                             ping_btn = gr.Button("Ping Server", variant="primary")
                         gr.Column(scale=1)
+                with gr.Tab("Raw Request"):
+                    gr.Markdown(
+                        "Send any JSON-RPC method. A JSON array in Params sends many requests: "
+                        "entries with a `method` key are full requests, other entries are params for the method above."
+                    )
+                    with gr.Row():
+                        raw_method = gr.Textbox(label="Method", placeholder="e.g. tools/list", scale=2)
+                        raw_route = gr.Dropdown(list(RAW_REQUEST_ROUTES), value="Live session", label="Send Via", scale=1)
+                        raw_send_btn = gr.Button("Send", variant="primary", scale=0, min_width=120)
+                    raw_params = gr.Code(label="Params (JSON)", language="json", value="{}")
+                    raw_timing = gr.Markdown("")
+                    with gr.Row():
+                        raw_request = gr.Code(label="Request", language="json")
+                        raw_response = gr.Code(label="Response", language="json")
+
                 with gr.Tab("Sampling"):
                     gr.Markdown("When the server requests LLM sampling, requests will appear here for approval.")
                     
@@ -488,7 +591,8 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                     
                     sampling_timer.tick(
                         get_pending_sampling_requests,
-                        outputs=[pending_requests_state]
+                        outputs=[pending_requests_state],
+                        **POLL_LANE,
                     )
 
                 with gr.Tab("Roots"):
@@ -574,14 +678,7 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                         gr.Markdown("Follow these steps to complete OAuth authentication with the server.")
                         
                         oauth_progress = gr.CheckboxGroup(
-                            choices=[
-                                "Metadata Discovery",
-                                "Client Registration",
-                                "Preparing Authorization",
-                                "Request Authorization and acquire authorization code",
-                                "Token Request",
-                                "Authentication Complete"
-                            ],
+                            choices=OAUTH_GUIDED_STEPS,
                             value=[],
                             label="Progress",
                             show_label=False,
@@ -590,6 +687,8 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                         )
                         
                         continue_btn = gr.Button("Continue", variant="primary")
+                        oauth_step_timings = gr.Markdown("_Press **Guided OAuth Flow** to start._")
+                        oauth_flow_state = gr.State(None)
 
                     gr.HTML("<div style='margin-top: 1.5em;'></div>")
 
@@ -604,6 +703,7 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                         )
                         oauth_authorization_code = gr.Textbox(
                             label="Authorization Code",
+                            placeholder="Filled in from the local callback, or paste the code or redirected URL",
                             interactive=False,
                             visible=False
                         )
@@ -618,19 +718,144 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
                             visible=False
                         )
 
+                with gr.Tab("Fleet"):
+                    gr.Markdown(
+                        "Run the same operation against many MCP servers at once. "
+                        "One server per line as `URL [bearer-token]`, or a JSON list of "
+                        "`{\"url\", \"transport\", \"token\", \"headers\"}` objects."
+                    )
+                    fleet_servers = gr.Textbox(
+                        label="Servers",
+                        lines=6,
+                        placeholder="https://eu.example.com/mcp\nhttps://us.example.com/mcp my-token",
+                    )
+                    with gr.Row():
+                        fleet_transport = gr.Dropdown(["Streamable HTTP", "SSE"], value="Streamable HTTP", label="Default Transport")
+                        fleet_connect_btn = gr.Button("Connect Fleet", variant="primary")
+                        fleet_disconnect_btn = gr.Button("Disconnect Fleet", variant="stop")
+                    with gr.Row():
+                        fleet_ping_btn = gr.Button("Ping All")
+                        fleet_list_tools_btn = gr.Button("List Tools on All")
+                    with gr.Row():
+                        fleet_tool_name = gr.Textbox(label="Tool Name", scale=1)
+                        fleet_tool_args = gr.Code(label="Arguments (JSON)", language="json", value="{}", scale=2)
+                        fleet_call_btn = gr.Button("Call Tool on All", scale=0, min_width=160)
+                    fleet_summary = gr.Markdown("")
+                    fleet_results = gr.Dataframe(
+                        headers=FLEET_COLUMNS,
+                        datatype=["str", "str", "number", "str"],
+                        interactive=False,
+                        wrap=True,
+                    )
+
+                with gr.Tab("Catalog Diff"):
+                    gr.Markdown(
+                        "Compare tools, resources, templates and prompts between the connected server, "
+                        "fleet members and saved snapshots."
+                    )
+                    with gr.Row():
+                        diff_source_a = gr.Dropdown(catalog_sources(), value=CONNECTED_SOURCE, label="Before", scale=2)
+                        diff_source_b = gr.Dropdown(catalog_sources(), value=CONNECTED_SOURCE, label="After", scale=2)
+                        diff_refresh_btn = gr.Button("🔄 Refresh Sources", scale=0, min_width=160)
+                    with gr.Row():
+                        snapshot_name = gr.Textbox(label="Snapshot Name", placeholder="e.g. release-1.4", scale=2)
+                        snapshot_btn = gr.Button("💾 Save 'Before' as Snapshot", scale=1)
+                        diff_btn = gr.Button("Compare", variant="primary", scale=1)
+                    diff_output = gr.Markdown("")
+
+                with gr.Tab("Monitor"):
+                    gr.Markdown(
+                        "Run pings, tool listings or tool calls on a schedule against the connected server "
+                        "and fleet members, and alert when latency or errors cross a threshold."
+                    )
+                    with gr.Row():
+                        monitor_kind = gr.Dropdown(list(MONITOR_JOB_KINDS), value="Ping", label="Job", scale=1)
+                        monitor_targets_input = gr.Dropdown(
+                            monitor_targets(), value=[MONITOR_CONNECTED_TARGET], multiselect=True, label="Servers", scale=3
+                        )
+                        monitor_refresh_btn = gr.Button("🔄 Refresh Servers", scale=0, min_width=160)
+                    with gr.Row():
+                        monitor_interval = gr.Number(label="Every (seconds)", value=10, minimum=1, scale=1)
+                        monitor_p95 = gr.Number(label="Alert if p95 above (ms)", value=None, scale=1)
+                        monitor_error_pct = gr.Number(label="Alert if errors above (%)", value=None, minimum=0, maximum=100, scale=1)
+                    with gr.Row(visible=False) as monitor_tool_row:
+                        monitor_tool_name = gr.Textbox(label="Tool Name", scale=1)
+                        monitor_tool_args = gr.Code(label="Arguments (JSON)", language="json", value="{}", scale=2)
+                    with gr.Row():
+                        monitor_add_btn = gr.Button("Schedule", variant="primary", scale=1)
+                        monitor_job_select = gr.Dropdown([], label="Scheduled Jobs", scale=2)
+                        monitor_remove_btn = gr.Button("Remove Job", variant="stop", scale=1)
+                    monitor_status = gr.Markdown("")
+                    monitor_table = gr.Dataframe(
+                        headers=MONITOR_COLUMNS,
+                        datatype=["str", "str", "str", "number", "str", "number", "number", "number", "str", "str"],
+                        interactive=False,
+                        wrap=True,
+                    )
+                    monitor_plot = gr.LinePlot(
+                        x="time", y="latency_ms", color="server", label="Latency of the selected job (ms)", height=280
+                    )
+                    monitor_alerts = gr.Markdown("_No alerts._")
+                    monitor_key_state = gr.State(None)
+                    monitor_timer = gr.Timer(2.0)
+
+                with gr.Tab("Logs"):
+                    with gr.Row():
+                        server_log_level = gr.Dropdown(list(LOG_LEVELS), value="info", label="Server Log Level", scale=1)
+                        set_log_level_btn = gr.Button("Set Level", scale=0, min_width=120)
+                        log_min_level = gr.Dropdown(list(LOG_LEVELS), value="debug", label="Show From", scale=1)
+                        log_logger_filter = gr.Textbox(label="Logger", placeholder="filter by logger name", scale=1)
+                        clear_logs_btn = gr.Button("Clear", scale=0, min_width=100)
+                    log_level_status = gr.Markdown("")
+                    log_status = gr.Markdown("")
+                    log_panel = gr.HTML("<p><em>No log messages</em></p>")
+                    log_key_state = gr.State(None)
+                    log_timer = gr.Timer(0.5)
+
+                with gr.Tab("Search"):
+                    gr.Markdown("Search tools, resources, prompts, call history and notifications seen in this session.")
+                    with gr.Row():
+                        search_query = gr.Textbox(label="Query", placeholder="e.g. weather forecast", scale=3)
+                        search_btn = gr.Button("Search", variant="primary", scale=0, min_width=120)
+                    with gr.Row():
+                        search_kinds = gr.CheckboxGroup(
+                            ["Tool", "Resource", "Template", "Prompt", "History", "Notification"],
+                            label="Kinds",
+                            value=[],
+                            scale=3,
+                        )
+                        search_method = gr.Textbox(label="Method contains", placeholder="tools/call", scale=1)
+                        search_status = gr.Dropdown(["Any", "ok", "error"], value="Any", label="Status", scale=1)
+                        search_time_range = gr.Dropdown(
+                            ["Any time", "Last 5 minutes", "Last hour", "Last 24 hours"],
+                            value="Any time",
+                            label="Time range",
+                            scale=1,
+                        )
+                    search_summary = gr.Markdown("")
+                    search_results = gr.HTML("")
+
             with gr.Row():
                 with gr.Column():
                     gr.Markdown("### History")
                     history_panel = gr.HTML(value="<p><em>No calls yet</em></p>")
+                    with gr.Row():
+                        history_newer_btn = gr.Button("◀ Newer", size="sm")
+                        history_older_btn = gr.Button("Older ▶", size="sm")
+                        history_clear_btn = gr.Button("Clear History", size="sm")
                 with gr.Column():
                     gr.Markdown("### Server Notifications")
                     notifications_panel = gr.HTML(value="<p><em>No notifications yet</em></p>")
                     
                     # Auto-refresh every 1 second
+                    notifications_version_state = gr.State(None)
                     notification_timer = gr.Timer(1.0)
                     notification_timer.tick(
                         get_server_notifications_handler,
-                        outputs=[notifications_panel]
+                        inputs=[notifications_version_state],
+                        outputs=[notifications_panel, notifications_version_state],
+                        show_progress="hidden",
+                        **POLL_LANE,
                     )
 
     # Wiring (done after layout so every component is defined)
@@ -643,7 +868,6 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
             resource_list,
             resource_empty_msg,
             resources_state,
-            history_state,
             history_panel,
         ],
     )
@@ -657,7 +881,6 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
             template_list,
             template_empty_msg,
             templates_state,
-            history_state,
             history_panel,
         ],
     )
@@ -681,9 +904,9 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
             resource_read_request,
             resource_read_response,
             content_display_state,
-            history_state,
             history_panel,
         ],
+        **LONG_CALL_LANE,
     )
 
     clear_resources_btn.click(
@@ -705,7 +928,6 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
             prompt_list,
             prompt_empty_msg,
             prompts_state,
-            history_state,
             history_panel,
         ],
     )
@@ -724,7 +946,6 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
             tool_list,
             tool_empty_msg,
             tools_state,
-            history_state,
             history_panel,
         ],
     )
@@ -737,7 +958,7 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
     ping_btn.click(
         ping_with_history,
         inputs=[server_url_state, request_timeout, history_state],
-        outputs=[history_state, history_panel],
+        outputs=[history_panel],
     )
 
     quick_flow_btn.click(
@@ -749,7 +970,6 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
             oauth_authorization_code,
             oauth_token_endpoint,
             oauth_token_payload,
-            history_state,
             history_panel,
             server_url_state,
             status_badge,
@@ -757,18 +977,45 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
             reconnect_btn,
             disconnect_btn
         ],
+        **LONG_CALL_LANE,
+    )
+
+    guided_outputs = [
+        oauth_progress,
+        oauth_authorization_url,
+        oauth_authorization_code,
+        oauth_token_endpoint,
+        oauth_token_payload,
+        oauth_step_timings,
+        oauth_flow_state,
+        history_panel,
+        server_url_state,
+        status_badge,
+        initial_connect_btn,
+        reconnect_btn,
+        disconnect_btn,
+    ]
+    guided_flow_btn.click(
+        guided_oauth_start,
+        inputs=[base_url_input, oauth_flow_state, history_state],
+        outputs=guided_outputs,
+    )
+    continue_btn.click(
+        guided_oauth_continue,
+        inputs=[oauth_flow_state, oauth_authorization_code, request_timeout, transport_type, history_state, roots_state],
+        outputs=guided_outputs,
+        **LONG_CALL_LANE,
     )
 
     clear_state_btn.click(
         clear_oauth_state,
-        inputs=[history_state],
+        inputs=[base_url_input, history_state],
         outputs=[
             oauth_progress,
             oauth_authorization_url,
             oauth_authorization_code,
             oauth_token_endpoint,
             oauth_token_payload,
-            history_state,
             history_panel,
             status_badge,
             initial_connect_btn,
@@ -777,6 +1024,118 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
         ],
     )
 
+    fleet_connect_btn.click(
+        fleet_connect_handler,
+        inputs=[fleet_servers, fleet_transport, request_timeout],
+        outputs=[fleet_results, fleet_summary],
+    )
+    fleet_disconnect_btn.click(
+        fleet_disconnect_handler,
+        outputs=[fleet_results, fleet_summary],
+    )
+    for btn, operation in ((fleet_ping_btn, "Ping"), (fleet_list_tools_btn, "List Tools"), (fleet_call_btn, "Call Tool")):
+        btn.click(
+            functools.partial(fleet_operation_handler, operation),
+            inputs=[fleet_tool_name, fleet_tool_args, request_timeout],
+            outputs=[fleet_results, fleet_summary],
+            **LONG_CALL_LANE,
+        )
+
+    monitor_kind.change(
+        lambda kind: gr.update(visible=kind == "Call Tool"),
+        inputs=[monitor_kind],
+        outputs=[monitor_tool_row],
+    )
+    monitor_refresh_btn.click(refresh_monitor_targets, outputs=[monitor_targets_input])
+    monitor_add_btn.click(
+        add_monitor_job_handler,
+        inputs=[
+            monitor_kind, monitor_targets_input, monitor_interval, monitor_tool_name, monitor_tool_args,
+            monitor_p95, monitor_error_pct, request_timeout,
+        ],
+        outputs=[monitor_status, monitor_job_select],
+    )
+    monitor_remove_btn.click(remove_monitor_job_handler, inputs=[monitor_job_select], outputs=[monitor_status, monitor_job_select])
+    gr.on(
+        [monitor_timer.tick, monitor_job_select.change],
+        monitor_dashboard_handler,
+        inputs=[monitor_job_select, monitor_key_state],
+        outputs=[monitor_table, monitor_plot, monitor_alerts, monitor_key_state],
+        trigger_mode="always_last",
+        show_progress="hidden",
+        **POLL_LANE,
+    )
+
+    diff_refresh_btn.click(refresh_catalog_sources, outputs=[diff_source_a, diff_source_b])
+    snapshot_btn.click(
+        save_catalog_snapshot_handler,
+        inputs=[diff_source_a, snapshot_name],
+        outputs=[diff_output, diff_source_a, diff_source_b],
+    )
+    diff_btn.click(catalog_diff_handler, inputs=[diff_source_a, diff_source_b], outputs=[diff_output])
+
+    raw_send_btn.click(
+        custom_request_with_history,
+        inputs=[server_url_state, raw_method, raw_params, request_timeout, raw_route, history_state],
+        outputs=[raw_request, raw_response, raw_timing, history_panel],
+        **LONG_CALL_LANE,
+    )
+
+    set_log_level_btn.click(set_log_level_handler, inputs=[server_log_level], outputs=[log_level_status])
+    gr.on(
+        [log_timer.tick, log_min_level.change, log_logger_filter.change],
+        log_tail_handler,
+        inputs=[log_min_level, log_logger_filter, log_key_state],
+        outputs=[log_panel, log_status, log_key_state],
+        trigger_mode="always_last",
+        show_progress="hidden",
+        **POLL_LANE,
+    )
+    clear_logs_btn.click(clear_logs_handler, outputs=[log_panel, log_status, log_key_state])
+
+    templates_state.change(
+        lambda templates: gr.update(choices=[t["uriTemplate"] for t in templates or []]),
+        inputs=[templates_state],
+        outputs=[sweep_template],
+    )
+    sweep_btn.click(
+        sweep_handler,
+        inputs=[sweep_source, sweep_template, sweep_params, sweep_concurrency, request_timeout, resources_state],
+        outputs=[sweep_summary, sweep_results, sweep_file],
+        **LONG_CALL_LANE,
+    )
+
+    search_inputs = [search_query, search_kinds, search_method, search_status, search_time_range, history_state]
+    gr.on(
+        triggers=[search_btn.click, search_query.submit, search_query.change, search_kinds.change, search_status.change, search_time_range.change],
+        fn=search_handler,
+        inputs=search_inputs,
+        outputs=[search_summary, search_results],
+        trigger_mode="always_last",
+        show_progress="hidden",
+    )
+
+    history_newer_btn.click(
+        lambda h: page_history(h, -1),
+        inputs=[history_state],
+        outputs=[history_panel],
+    )
+    history_older_btn.click(
+        lambda h: page_history(h, 1),
+        inputs=[history_state],
+        outputs=[history_panel],
+    )
+    history_clear_btn.click(
+        clear_history,
+        inputs=[history_state],
+        outputs=[history_panel],
+    )
+    app.load(
+        load_history,
+        inputs=[history_state],
+        outputs=[history_state, history_panel],
+    )
+
     theme_selector.change(
         None,
         inputs=theme_selector,
@@ -801,5 +1160,34 @@ with gr.Blocks(title="Gradio MCP Inspector") as app:
         }"""
     )
 
+configure_queue(app)
+
 if __name__ == "__main__":
-    app.launch(theme=CustomTheme(),css=css)
\ No newline at end of file
+    tracing.setup()
+    if os.environ.get("MCP_INSPECTOR_METRICS", "0") == "1":
+        # Serve Gradio inside our own FastAPI app so /metrics can sit next to it
+        import uvicorn
+        from fastapi import FastAPI
+        from fastapi.responses import PlainTextResponse
+
+        server = FastAPI(lifespan=stdio_servers.lifespan)
+
+        @server.get("/metrics", response_class=PlainTextResponse)
+        def metrics_endpoint():
+            return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+        server = gr.mount_gradio_app(
+            server, app, path="/", theme=CustomTheme(), css=css, allowed_paths=[str(BLOB_DIR), str(SWEEP_DIR)]
+        )
+        uvicorn.run(
+            server,
+            host=os.environ.get("GRADIO_SERVER_NAME", "127.0.0.1"),
+            port=int(os.environ.get("GRADIO_SERVER_PORT", 7860)),
+        )
+    else:
+        app.launch(
+            theme=CustomTheme(),
+            css=css,
+            allowed_paths=[str(BLOB_DIR), str(SWEEP_DIR)],
+            app_kwargs={"lifespan": stdio_servers.lifespan},
+        )
\ No newline at end of file
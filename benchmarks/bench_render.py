@@ -0,0 +1,247 @@
+"""Benchmarks for the rendering hot paths.
+
+Drives the paged history panel (as the UI renders it, from stored rows,
+with a cold and a warm fragment cache), the notification renderer and the
+tool form builder with synthetic data and records wall time and peak
+memory per case.
+
+    python benchmarks/bench_render.py                      # run and print
+    python benchmarks/bench_render.py --save baseline.json # record a baseline
+    python benchmarks/bench_render.py --compare baseline.json
+
+With --compare the script exits non-zero when a case is slower (or uses more
+memory) than the baseline by more than --tolerance.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Benchmark sessions go to a throwaway database, never the real history
+os.environ["MCP_INSPECTOR_HISTORY_DB"] = str(Path(tempfile.mkdtemp(prefix="bench-history-")) / "history.db")
+
+import gradio as gr  # noqa: E402
+
+import history_store  # noqa: E402
+from formatting import dumps  # noqa: E402
+from handlers import _entry_html_cache, _render_history_page, _render_notifications, build_tool_inputs  # noqa: E402
+from schema_forms import compile_form, get_tool_spec  # noqa: E402
+from uri_template import expand, match  # noqa: E402
+
+KB = 1024
+MB = 1024 * KB
+
+ENTRY_COUNTS = [10, 100, 1_000, 10_000, 100_000]
+PAYLOAD_SIZES = [1 * KB, 100 * KB, 1 * MB, 10 * MB]
+PROPERTY_COUNTS = [10, 100, 1_000]
+ROW_COUNTS = [1_000, 100_000]
+
+QUICK_ENTRY_COUNTS = [10, 1_000]
+QUICK_PAYLOAD_SIZES = [1 * KB, 1 * MB]
+QUICK_PROPERTY_COUNTS = [10, 100]
+QUICK_ROW_COUNTS = [1_000]
+
+# URIs expanded/matched per batch in the URI template cases
+URI_BATCH = 1_000
+
+
+def _payload(size: int) -> str:
+    return ("x" * 63 + "\n") * (size // 64) + "x" * (size % 64)
+
+
+def make_history(count: int, payload_size: int) -> str:
+    """A stored history session of `count` calls; rows get real ids as in the UI."""
+    session = history_store.new_session()
+    payload = _payload(payload_size)
+    for i in range(count):
+        history_store.append(session, {
+            "method": "tools/call",
+            "request": f"call_tool(tool_{i})",
+            "response": payload,
+            "status": "ok",
+            "timestamp": time.time(),
+        })
+    history_store.flush()
+    return session
+
+
+def history_cases(name: str, session: str) -> list[tuple]:
+    """Cold (every fragment rendered) and warm (cached fragments re-joined) page renders."""
+    def warm_up():
+        _entry_html_cache.clear()
+        _render_history_page(session)
+
+    render = lambda: _render_history_page(session)  # noqa: E731
+    return [
+        (f"{name},cold]", render, _entry_html_cache.clear),
+        (f"{name},warm]", render, warm_up),
+    ]
+
+
+def make_notifications(count: int, payload_size: int) -> list[dict]:
+    payload = _payload(payload_size)
+    return [
+        {
+            "method": "notifications/message",
+            "params": {"level": "info", "logger": "bench", "data": payload},
+        }
+        for _ in range(count)
+    ]
+
+
+def make_tool_schema(count: int) -> dict:
+    kinds = [
+        {"type": "string", "description": "A string"},
+        {"type": "integer", "default": 3},
+        {"type": "number"},
+        {"type": "boolean", "default": True},
+        {"type": "string", "enum": ["a", "b", "c"]},
+        {"type": "object", "properties": {"x": {"type": "string"}}},
+        {"type": "array", "items": {"type": "integer"}},
+    ]
+    properties = {f"prop_{i}": kinds[i % len(kinds)] for i in range(count)}
+    return {"type": "object", "properties": properties, "required": list(properties)[::2]}
+
+
+def make_rows(count: int) -> dict:
+    return {"rows": [{"id": i, "name": f"item-{i}", "tags": ["a", "b"], "score": i * 0.5} for i in range(count)]}
+
+
+def render_tool_form(tool: dict):
+    with gr.Blocks():
+        build_tool_inputs(get_tool_spec(tool)["fields"])
+
+
+def build_cases(quick: bool) -> list[tuple]:
+    """(name, fn) or (name, fn, setup) where setup runs untimed before every round."""
+    counts = QUICK_ENTRY_COUNTS if quick else ENTRY_COUNTS
+    sizes = QUICK_PAYLOAD_SIZES if quick else PAYLOAD_SIZES
+    props = QUICK_PROPERTY_COUNTS if quick else PROPERTY_COUNTS
+    rows = QUICK_ROW_COUNTS if quick else ROW_COUNTS
+
+    cases = []
+    # Entry-count sweep at a small payload, payload sweep at a small count.
+    for count in counts:
+        notes = make_notifications(count, 1 * KB)
+        cases.extend(history_cases(f"history_page[n={count},1KB", make_history(count, 1 * KB)))
+        cases.append((f"notifications[n={count},1KB]", lambda n=notes: _render_notifications(n)))
+    for size in sizes:
+        if size == 1 * KB and 10 in counts:
+            continue
+        label = f"{size // MB}MB" if size >= MB else f"{size // KB}KB"
+        notes = make_notifications(10, size)
+        cases.extend(history_cases(f"history_page[n=10,{label}", make_history(10, size)))
+        cases.append((f"notifications[n=10,{label}]", lambda n=notes: _render_notifications(n)))
+    for count in props:
+        schema = make_tool_schema(count)
+        tool = {"name": f"tool_{count}", "inputSchema": schema}
+        cases.append((f"schema_compile[props={count}]", lambda s=schema: compile_form(s)))
+        cases.append((f"tool_form[props={count}]", lambda t=tool: render_tool_form(t)))
+
+    for count in rows:
+        data = make_rows(count)
+        cases.append((f"json_format[rows={count}]", lambda d=data: dumps(d)))
+
+    template = "data://users/{user_id}/files{/path*}{?fields*,lang}"
+    values = [
+        {"user_id": f"user {i}", "path": ["a b", str(i)], "fields": ["name", "size"], "lang": "en"}
+        for i in range(URI_BATCH)
+    ]
+    uris = [expand(template, v) for v in values]
+    cases.append((f"uri_expand[n={URI_BATCH}]", lambda: [expand(template, v) for v in values]))
+    cases.append((f"uri_match[n={URI_BATCH}]", lambda: [match(template, u) for u in uris]))
+    return cases
+
+
+def measure(fn: Callable[[], object], rounds: int, setup: Callable[[], object] | None = None) -> dict:
+    timings = []
+    for _ in range(rounds):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    # Peak memory is measured in a separate run so tracing does not skew timings.
+    if setup is not None:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "peak_bytes": peak,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_s: float) -> list[str]:
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        # Ignore sub-threshold differences; tiny cases are dominated by timer noise.
+        slower = current["median_s"] - base["median_s"] > min_delta_s
+        if slower and current["median_s"] > base["median_s"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: time {current['median_s'] * 1000:.2f}ms > baseline {base['median_s'] * 1000:.2f}ms"
+            )
+        if current["peak_bytes"] > base["peak_bytes"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: peak {current['peak_bytes'] / MB:.2f}MB > baseline {base['peak_bytes'] / MB:.2f}MB"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per case (default: 5)")
+    parser.add_argument("--quick", action="store_true", help="Run a reduced size grid")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this string")
+    parser.add_argument("--save", type=Path, help="Write results to this baseline file")
+    parser.add_argument("--compare", type=Path, help="Compare results against this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown ratio (default: 0.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this (default: 1.0)")
+    args = parser.parse_args()
+
+    results = {}
+    for name, fn, *setup in build_cases(args.quick):
+        if args.filter not in name:
+            continue
+        stats = measure(fn, args.rounds, *setup)
+        results[name] = stats
+        print(f"{name:<36} median {stats['median_s'] * 1000:>10.2f} ms   peak {stats['peak_bytes'] / MB:>9.2f} MB")
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2))
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms / 1000.0)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import mimetypes
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+# Binary tool/resource payloads are decoded once and written here, so results
+# and history only carry a short file reference instead of base64 text.
+BLOB_DIR = Path(os.environ.get("MCP_INSPECTOR_BLOB_DIR", Path(tempfile.gettempdir()) / "gradio-mcp-inspector-blobs"))
+MAX_BLOB_BYTES = int(os.environ.get("MCP_INSPECTOR_BLOB_MAX_BYTES", 512 * 1024 * 1024))
+
+# sha256 -> (path, size), least recently used first
+_blobs: OrderedDict[str, tuple[Path, int]] = OrderedDict()
+_total_bytes = 0
+# Guards _blobs and _total_bytes; puts can come from worker threads
+_lock = threading.Lock()
+
+
+def put_bytes(data: bytes | memoryview, mime_type: str | None = None) -> dict:
+    """Store a binary payload (deduplicated by content hash) and return a reference.
+
+    Safe to call from worker threads: large resource reads store their blobs
+    off the event loop.
+    """
+    global _total_bytes
+    view = memoryview(data)
+    digest = hashlib.sha256(view).hexdigest()
+
+    with _lock:
+        entry = _blobs.get(digest)
+        if entry is not None and entry[0].exists():
+            _blobs.move_to_end(digest)
+            return _reference(*entry, mime_type)
+
+    BLOB_DIR.mkdir(parents=True, exist_ok=True)
+    ext = mimetypes.guess_extension(mime_type or "") or ".bin"
+    path = BLOB_DIR / f"{digest[:32]}{ext}"
+    with open(path, "wb") as f:
+        f.write(view)
+    size = view.nbytes
+
+    with _lock:
+        if digest in _blobs:
+            # Indexed meanwhile, or indexed but its file was deleted: don't count it twice
+            _total_bytes -= _blobs[digest][1]
+        _blobs[digest] = (path, size)
+        _total_bytes += size
+        _evict()
+    return _reference(path, size, mime_type)
+
+
+def _reference(path: Path, size: int, mime_type: str | None) -> dict:
+    return {
+        "path": str(path),
+        "url": file_url(path),
+        "mime_type": mime_type or "application/octet-stream",
+        "size": size,
+    }
+
+
+def put_base64(data: str, mime_type: str | None = None) -> dict:
+    """Decode a base64 payload once and store it."""
+    return put_bytes(base64.b64decode(data), mime_type)
+
+
+def file_url(path: Path | str) -> str:
+    """URL under which Gradio serves a stored blob (BLOB_DIR must be in allowed_paths)."""
+    return f"/gradio_api/file={path}"
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def clear_blobs():
+    global _total_bytes
+    with _lock:
+        for path, _ in _blobs.values():
+            path.unlink(missing_ok=True)
+        _blobs.clear()
+        _total_bytes = 0
+
+
+def _evict():
+    # Called with _lock held
+    global _total_bytes
+    # Keep at least the newest blob even if it alone exceeds the budget
+    while _total_bytes > MAX_BLOB_BYTES and len(_blobs) > 1:
+        _, (path, size) = _blobs.popitem(last=False)
+        path.unlink(missing_ok=True)
+        _total_bytes -= size
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Any
+
+from fastmcp import Client
+from mcp.shared.exceptions import McpError
+from mcp.types import METHOD_NOT_FOUND
+
+from history_store import DATA_DIR
+
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
+
+# Catalog kind -> field that identifies an item across snapshots
+CATALOG_KEYS = {
+    "tools": "name",
+    "resources": "uri",
+    "resourceTemplates": "uriTemplate",
+    "prompts": "name",
+}
+# Catalog kind -> server capability that advertises it
+CATALOG_CAPABILITIES = {
+    "tools": "tools",
+    "resources": "resources",
+    "resourceTemplates": "resources",
+    "prompts": "prompts",
+}
+
+# Nested changes beyond this many per item are summarized instead of listed.
+MAX_CHANGES_PER_ITEM = 50
+
+
+def item_hash(item: Any) -> str:
+    return hashlib.sha256(json.dumps(item, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+async def fetch_catalogs(client: Client) -> dict[str, list[dict]]:
+    """List every catalog of a connected server.
+
+    Kinds the server does not support come back as empty lists; any other
+    failure is raised, since an empty list would read as everything removed.
+    """
+    fetchers = {
+        "tools": client.list_tools,
+        "resources": client.list_resources,
+        "resourceTemplates": client.list_resource_templates,
+        "prompts": client.list_prompts,
+    }
+    capabilities = client.initialize_result.capabilities if client.initialize_result else None
+    results = await asyncio.gather(*(_fetch(fetch, kind, capabilities) for kind, fetch in fetchers.items()))
+    return dict(zip(fetchers, results))
+
+
+async def _fetch(fetch, kind: str, capabilities) -> list[dict]:
+    if capabilities is not None and getattr(capabilities, CATALOG_CAPABILITIES[kind]) is None:
+        return []
+    try:
+        items = await fetch()
+    except McpError as exc:
+        if exc.error.code == METHOD_NOT_FOUND:
+            return []
+        raise
+    return [item.model_dump(mode="json", exclude_none=True) for item in items]
+
+
+def make_snapshot(source: str, catalogs: dict[str, list[dict]]) -> dict:
+    """Index catalogs by identity key and hash every item once."""
+    indexed = {}
+    for kind, items in catalogs.items():
+        key = CATALOG_KEYS.get(kind, "name")
+        indexed[kind] = {
+            str(item.get(key)): {"hash": item_hash(item), "item": item}
+            for item in items
+        }
+    return {"source": source, "taken_at": time.time(), "catalogs": indexed}
+
+
+def save_snapshot(snapshot: dict, name: str) -> Path:
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", name.strip()) or time.strftime("%Y%m%d-%H%M%S")
+    path = SNAPSHOT_DIR / f"{safe}.json"
+    path.write_text(json.dumps(snapshot))
+    return path
+
+
+def list_snapshots() -> list[str]:
+    if not SNAPSHOT_DIR.exists():
+        return []
+    return sorted(p.stem for p in SNAPSHOT_DIR.glob("*.json"))
+
+
+def load_snapshot(name: str) -> dict:
+    path = SNAPSHOT_DIR / f"{name}.json"
+    if not path.exists():
+        raise ValueError(f"Snapshot not found: {name}")
+    return json.loads(path.read_text())
+
+
+def diff_snapshots(old: dict, new: dict) -> dict[str, dict]:
+    """Diff two snapshots kind by kind.
+
+    Items are matched by key and compared by hash, so identical items cost a
+    dict lookup and a string compare; only changed items are walked.
+    """
+    result = {}
+    for kind in dict.fromkeys(list(old["catalogs"]) + list(new["catalogs"])):
+        before = old["catalogs"].get(kind, {})
+        after = new["catalogs"].get(kind, {})
+        changed = []
+        for key, entry in after.items():
+            previous = before.get(key)
+            if previous is not None and previous["hash"] != entry["hash"]:
+                changed.append({"key": key, "changes": diff_values(previous["item"], entry["item"])})
+        result[kind] = {
+            "added": sorted(k for k in after if k not in before),
+            "removed": sorted(k for k in before if k not in after),
+            "changed": sorted(changed, key=lambda c: c["key"]),
+            "unchanged": sum(1 for k, e in after.items() if k in before and before[k]["hash"] == e["hash"]),
+        }
+    return result
+
+
+def diff_values(old: Any, new: Any, path: str = "") -> list[dict]:
+    """Structural diff of two JSON values as a list of {path, op, old, new}."""
+    changes: list[dict] = []
+    _diff_into(old, new, path, changes)
+    return changes
+
+
+def _diff_into(old: Any, new: Any, path: str, changes: list[dict]):
+    if len(changes) >= MAX_CHANGES_PER_ITEM or old == new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                changes.append({"path": f"{path}/{key}", "op": "removed", "old": old[key], "new": None})
+        for key in new:
+            if key not in old:
+                changes.append({"path": f"{path}/{key}", "op": "added", "old": None, "new": new[key]})
+        for key in old:
+            if key in new:
+                _diff_into(old[key], new[key], f"{path}/{key}", changes)
+        return
+    if isinstance(old, list) and isinstance(new, list):
+        if all(isinstance(v, (str, int, float, bool)) for v in old + new):
+            # Scalar lists such as "required" or "enum" are compared as sets
+            for v in old:
+                if v not in new:
+                    changes.append({"path": path, "op": "removed", "old": v, "new": None})
+            for v in new:
+                if v not in old:
+                    changes.append({"path": path, "op": "added", "old": None, "new": v})
+            if not changes or changes[-1]["path"] != path:
+                changes.append({"path": path, "op": "reordered", "old": old, "new": new})
+            return
+        if len(old) == len(new):
+            for i, (a, b) in enumerate(zip(old, new)):
+                _diff_into(a, b, f"{path}/{i}", changes)
+            return
+    changes.append({"path": path or "/", "op": "changed", "old": old, "new": new})
+
+
+def render_diff_markdown(diff: dict[str, dict], old_label: str, new_label: str) -> str:
+    lines = [f"### `{old_label}` → `{new_label}`", ""]
+    if not any(d["added"] or d["removed"] or d["changed"] for d in diff.values()):
+        lines.append("✅ No differences.")
+        return "\n".join(lines)
+
+    for kind, d in diff.items():
+        if not (d["added"] or d["removed"] or d["changed"]):
+            continue
+        lines.append(
+            f"#### {kind}: +{len(d['added'])} / -{len(d['removed'])} / ~{len(d['changed'])} "
+            f"({d['unchanged']} unchanged)"
+        )
+        for key in d["added"]:
+            lines.append(f"- ➕ `{key}`")
+        for key in d["removed"]:
+            lines.append(f"- ➖ `{key}`")
+        for change in d["changed"]:
+            lines.append(f"- ✏️ `{change['key']}`")
+            for c in change["changes"]:
+                lines.append(f"    - `{c['path']}` {_describe(c)}")
+            if len(change["changes"]) >= MAX_CHANGES_PER_ITEM:
+                lines.append("    - … more changes omitted")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _describe(change: dict) -> str:
+    if change["op"] == "added":
+        return f"added {_short(change['new'])}"
+    if change["op"] == "removed":
+        return f"removed {_short(change['old'])}"
+    if change["op"] == "reordered":
+        return "reordered"
+    return f"{_short(change['old'])} → {_short(change['new'])}"
+
+
+def _short(value: Any, limit: int = 80) -> str:
+    text = json.dumps(value)
+    return f"`{text[:limit]}…`" if len(text) > limit else f"`{text}`"
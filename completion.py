@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, defaultdict
+from typing import Awaitable, Callable
+
+# Keystrokes closer together than this only send the last one.
+DEBOUNCE_SECONDS = 0.25
+# Slow servers must not hold up typing; late answers are dropped.
+COMPLETION_TIMEOUT = 5.0
+CACHE_SIZE = 2048
+
+# (ref_type, ref_name, argument, context, prefix) -> (values, complete)
+_cache: OrderedDict[tuple, tuple[list[str], bool]] = OrderedDict()
+# (ref_type, ref_name, argument) -> generation of the newest keystroke
+_generations: defaultdict[tuple, int] = defaultdict(int)
+_inflight: dict[tuple, asyncio.Task] = {}
+
+Fetcher = Callable[[str, str, str, str, dict], Awaitable[tuple[list[str], bool]]]
+
+
+def _cached(key: tuple, prefix: str) -> list[str] | None:
+    hit = _cache.get(key + (prefix,))
+    if hit is not None:
+        _cache.move_to_end(key + (prefix,))
+        return hit[0]
+    # A complete answer for a shorter prefix already contains every match
+    # for this one, so narrow it locally instead of asking the server.
+    for end in range(len(prefix) - 1, -1, -1):
+        hit = _cache.get(key + (prefix[:end],))
+        if hit is not None and hit[1]:
+            lowered = prefix.lower()
+            return [v for v in hit[0] if v.lower().startswith(lowered)]
+    return None
+
+
+def _store(key: tuple, prefix: str, values: list[str], complete: bool):
+    _cache[key + (prefix,)] = (values, complete)
+    _cache.move_to_end(key + (prefix,))
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+async def suggest(
+    fetch: Fetcher, ref_type: str, ref_name: str, argument: str, prefix: str, context: dict | None = None
+) -> list[str] | None:
+    """Completion values for one keystroke, or None if a newer keystroke superseded it.
+
+    Cached and locally narrowed answers return immediately. Otherwise the
+    lookup waits DEBOUNCE_SECONDS and gives up if another keystroke for the
+    same field arrived meanwhile; a request still in flight for the field
+    is cancelled when a newer one is sent.
+    """
+    key = (ref_type, ref_name, argument)
+    # Other arguments can change the answer, so they are part of the cache key
+    cache_key = key + (tuple(sorted((context or {}).items())),)
+    prefix = prefix or ""
+    _generations[key] += 1
+    generation = _generations[key]
+
+    cached = _cached(cache_key, prefix)
+    if cached is not None:
+        return cached
+
+    await asyncio.sleep(DEBOUNCE_SECONDS)
+    if _generations[key] != generation:
+        return None
+
+    previous = _inflight.pop(key, None)
+    if previous is not None and not previous.done():
+        previous.cancel()
+    task = asyncio.ensure_future(
+        asyncio.wait_for(fetch(ref_type, ref_name, argument, prefix, context or {}), COMPLETION_TIMEOUT)
+    )
+    _inflight[key] = task
+    try:
+        values, complete = await task
+    except asyncio.CancelledError:
+        if _generations[key] != generation:
+            return None
+        raise
+    except Exception:
+        return []
+    finally:
+        if _inflight.get(key) is task:
+            del _inflight[key]
+
+    _store(cache_key, prefix, values, complete)
+    return values if _generations[key] == generation else None
+
+
+def clear_cache():
+    _cache.clear()
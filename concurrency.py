@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import os
+
+import gradio as gr
+from gradio import route_utils
+
+import metrics
+
+# Handlers are async and mostly wait on the server, so many can share the
+# event loop; Gradio's default of one at a time per event serializes users.
+DEFAULT_CONCURRENCY = int(os.environ.get("MCP_INSPECTOR_CONCURRENCY", 16))
+# Events waiting across all lanes before new ones are turned away (0 = unbounded)
+QUEUE_MAX = int(os.environ.get("MCP_INSPECTOR_QUEUE_MAX", 256))
+
+LONG_CALLS = "long-calls"
+POLLS = "polls"
+
+# Tool and prompt runs, reads, sweeps, fleet fan-outs, raw requests and OAuth
+# waits share one lane so they can't starve pings, lists and connects, which
+# keep a lane per event at DEFAULT_CONCURRENCY.
+LONG_CALL_LANE = {
+    "concurrency_id": LONG_CALLS,
+    "concurrency_limit": int(os.environ.get("MCP_INSPECTOR_LONG_CALL_CONCURRENCY", 8)),
+}
+# Timer ticks from every open tab share a small lane of their own
+POLL_LANE = {
+    "concurrency_id": POLLS,
+    "concurrency_limit": int(os.environ.get("MCP_INSPECTOR_POLL_CONCURRENCY", 4)),
+}
+
+
+def _lane(concurrency_id: str) -> str:
+    return concurrency_id if concurrency_id in (LONG_CALLS, POLLS) else "default"
+
+
+def configure(blocks: gr.Blocks) -> gr.Blocks:
+    """Apply the queue settings to `blocks` and count events rejected because it is full."""
+    blocks.queue(default_concurrency_limit=DEFAULT_CONCURRENCY, max_size=QUEUE_MAX or None)
+    queue = blocks._queue
+    push = queue.push
+
+    async def counted_push(body, request, username):
+        accepted, detail, outcome = await push(body, request, username)
+        if outcome == "queue_full":
+            try:
+                lane = _lane(route_utils.get_fn(blocks, None, body).concurrency_id)
+            except Exception:
+                lane = "default"
+            metrics.inc(
+                "mcp_inspector_queue_rejected_total",
+                "UI events turned away because the queue was full.",
+                {"lane": lane},
+            )
+        return accepted, detail, outcome
+
+    queue.push = counted_push
+
+    def collect():
+        waiting = {"default": 0, LONG_CALLS: 0, POLLS: 0}
+        active = dict(waiting)
+        for concurrency_id, event_queue in list(queue.event_queue_per_concurrency_id.items()):
+            lane = _lane(concurrency_id)
+            waiting[lane] += len(event_queue.queue)
+            active[lane] += event_queue.current_concurrency
+        yield ("mcp_inspector_queue_waiting", "gauge", "UI events waiting in the queue.",
+               [({"lane": lane}, float(n)) for lane, n in waiting.items()])
+        yield ("mcp_inspector_queue_active", "gauge", "UI events currently running.",
+               [({"lane": lane}, float(n)) for lane, n in active.items()])
+
+    metrics.register_collector(collect)
+    return blocks
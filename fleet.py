@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Awaitable, Callable
+
+from fastmcp import Client
+
+from catalog_diff import diff_snapshots, make_snapshot
+from mcp_client import build_transport, roots_handler
+
+# Connected fleet members keyed by server URL
+_members: dict[str, dict] = {}
+
+
+def parse_fleet_spec(text: str, default_transport: str = "Streamable HTTP") -> list[dict]:
+    """Parse the fleet definition.
+
+    Accepts either a JSON list of {"url", "transport", "token", "headers"}
+    objects (or bare URL strings), or one server per line as ``URL [bearer-token]``.
+    """
+    text = (text or "").strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        specs = json.loads(text)
+    else:
+        specs = []
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            url, _, token = line.partition(" ")
+            specs.append({"url": url, "token": token.strip() or None})
+
+    seen = set()
+    for i, spec in enumerate(specs):
+        if isinstance(spec, str):
+            spec = specs[i] = {"url": spec}
+        if not isinstance(spec, dict):
+            raise ValueError(f"Fleet entry must be an object or a URL string: {spec!r}")
+        if not spec.get("url"):
+            raise ValueError(f"Fleet entry without url: {spec}")
+        if spec["url"] in seen:
+            raise ValueError(f"Duplicate fleet entry: {spec['url']}")
+        seen.add(spec["url"])
+        spec.setdefault("transport", default_transport)
+        spec.setdefault("token", None)
+        spec.setdefault("headers", None)
+    return specs
+
+
+async def connect_fleet(specs: list[dict], timeout_seconds: float) -> list[dict]:
+    """(Re)connect to every server in parallel."""
+    await disconnect_fleet()
+    # One member per URL; a second client for the same URL would never be closed
+    specs = list({spec["url"]: spec for spec in reversed(specs)}.values())[::-1]
+
+    async def _connect(spec: dict) -> dict:
+        stack = AsyncExitStack()
+        started = time.perf_counter()
+        try:
+            client = Client(
+                transport=build_transport(spec["url"], spec["transport"], spec.get("headers")),
+                timeout=timeout_seconds,
+                auth=spec.get("token"),
+                roots=roots_handler,
+            )
+            await asyncio.wait_for(stack.enter_async_context(client), timeout_seconds)
+        except Exception as e:
+            await stack.aclose()
+            return _result(spec["url"], started, error=e)
+        _members[spec["url"]] = {"client": client, "exit_stack": stack, "spec": spec}
+        return _result(spec["url"], started, summary=f"connected via {spec['transport']}")
+
+    return list(await asyncio.gather(*(_connect(s) for s in specs)))
+
+
+async def disconnect_fleet():
+    members = list(_members.values())
+    _members.clear()
+    for member in members:
+        try:
+            await member["exit_stack"].aclose()
+        except Exception:
+            pass
+
+
+def fleet_size() -> int:
+    return len(_members)
+
+
+def member_urls() -> list[str]:
+    return list(_members)
+
+
+def get_member_client(url: str) -> Client:
+    if url not in _members:
+        raise RuntimeError(f"{url} is not connected in the fleet.")
+    return _members[url]["client"]
+
+
+async def _run_all(op: Callable[[Client], Awaitable[Any]], summarize: Callable[[Any], str], timeout_seconds: float) -> list[dict]:
+    if not _members:
+        raise RuntimeError("No fleet connected. Connect the fleet first.")
+
+    async def _run(url: str, member: dict) -> dict:
+        started = time.perf_counter()
+        try:
+            data = await asyncio.wait_for(op(member["client"]), timeout_seconds)
+        except Exception as e:
+            return _result(url, started, error=e)
+        return _result(url, started, summary=summarize(data), data=data)
+
+    return list(await asyncio.gather(*(_run(url, m) for url, m in _members.items())))
+
+
+async def fleet_ping(timeout_seconds: float) -> list[dict]:
+    return await _run_all(lambda c: c.ping(), lambda _: "pong", timeout_seconds)
+
+
+async def fleet_list_tools(timeout_seconds: float) -> list[dict]:
+    async def _list(client: Client):
+        return [t.model_dump(mode="json", exclude_none=True) for t in await client.list_tools()]
+
+    return await _run_all(_list, lambda tools: f"{len(tools)} tools", timeout_seconds)
+
+
+async def fleet_call_tool(tool_name: str, arguments: dict, timeout_seconds: float) -> list[dict]:
+    async def _call(client: Client):
+        result = await client.call_tool(tool_name, arguments=arguments, raise_on_error=False)
+        text = "\n".join(getattr(item, "text", f"<{getattr(item, 'type', 'content')}>") for item in result.content)
+        return {"is_error": result.is_error, "text": text, "structured": result.structured_content}
+
+    def _summarize(data: dict) -> str:
+        prefix = "tool error: " if data["is_error"] else ""
+        text = data["text"].replace("\n", " ")
+        return prefix + (text[:120] + "…" if len(text) > 120 else text)
+
+    return await _run_all(_call, _summarize, timeout_seconds)
+
+
+def tool_catalog_diff(results: list[dict]) -> dict[str, dict]:
+    """Compare each server's tool catalog against the first reachable server."""
+    snapshots = {r["server"]: make_snapshot(r["server"], {"tools": r["data"]}) for r in results if r["ok"]}
+    if len(snapshots) < 2:
+        return {}
+    baseline_url, baseline = next(iter(snapshots.items()))
+    diffs = {}
+    for url, snapshot in snapshots.items():
+        if url == baseline_url:
+            continue
+        tools = diff_snapshots(baseline, snapshot)["tools"]
+        diffs[url] = {
+            "baseline": baseline_url,
+            "added": tools["added"],
+            "removed": tools["removed"],
+            "changed": [c["key"] for c in tools["changed"]],
+        }
+    return diffs
+
+
+def _result(url: str, started: float, summary: str = "", data: Any = None, error: Exception | None = None) -> dict:
+    return {
+        "server": url,
+        "ok": error is None,
+        "latency_ms": (time.perf_counter() - started) * 1000,
+        "summary": f"{type(error).__name__}: {error}" if error is not None else summary,
+        "data": data,
+    }
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is the fallback
+    orjson = None
+
+# Payloads estimated above this are formatted in a worker thread, off the event loop
+OFFLOAD_BYTES = int(os.environ.get("MCP_INSPECTOR_OFFLOAD_BYTES", 256 * 1024))
+
+
+def dumps(value: Any, indent: bool = True) -> str:
+    """JSON text for display, pretty-printed with two spaces like json.dumps(indent=2)."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(value, option=option).decode()
+        except TypeError:
+            # Integers beyond 64 bits or types orjson doesn't know
+            pass
+    return json.dumps(value, indent=2 if indent else None)
+
+
+def approx_size(value: Any, limit: int = OFFLOAD_BYTES) -> int:
+    """Rough serialized size, walking only until it passes `limit`."""
+    size = 0
+    stack = [value]
+    while stack and size <= limit:
+        item = stack.pop()
+        if isinstance(item, (str, bytes)):
+            size += len(item) + 2
+        elif isinstance(item, dict):
+            size += 2 + 4 * len(item)
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            size += 2 + 2 * len(item)
+            stack.extend(item)
+        else:
+            size += 8
+    return size
+
+
+async def offload(func: Callable, *args, size: int):
+    """Run a CPU-bound formatter inline when small, in a worker thread when `size` is large.
+
+    A thread (not a process) because the inputs are large: pickling them to
+    another process would cost about as much as formatting them.
+    """
+    if size > OFFLOAD_BYTES:
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
+async def dumps_async(value: Any, indent: bool = True) -> str:
+    return await offload(dumps, value, indent, size=approx_size(value))
@@ -2,13 +2,61 @@ from __future__ import annotations
 
 import gradio as gr
 import json
+import pandas as pd
 import asyncio
 import uuid
 import time
+from collections import OrderedDict
+from html import escape as html_escape
 from typing import Any
 from fastmcp.client.sampling import SamplingMessage, SamplingParams, RequestContext
 
+import completion
+import formatting
+import history_store
+import log_stream
+import metrics
+import monitor
+import search_index
+import stdio_servers
+
+from catalog_diff import (
+    diff_snapshots,
+    fetch_catalogs,
+    list_snapshots,
+    load_snapshot,
+    make_snapshot,
+    render_diff_markdown,
+    save_snapshot,
+)
+from blob_store import format_size
+from fleet import (
+    connect_fleet,
+    disconnect_fleet,
+    fleet_call_tool,
+    fleet_list_tools,
+    fleet_ping,
+    get_member_client,
+    member_urls,
+    parse_fleet_spec,
+    tool_catalog_diff,
+)
+from oauth import (
+    GUIDED_STEPS as OAUTH_GUIDED_STEPS,
+    InspectableOAuth,
+    advance_guided_flow,
+    cancel_guided_flow,
+    new_guided_flow,
+    record_step as record_oauth_step,
+    cache_summary as oauth_cache_summary,
+    clear_cache as clear_oauth_cache,
+    start_refresh as start_oauth_refresh,
+    stop_refresh as stop_oauth_refresh,
+)
+from sweep import parse_parameter_sets, run_sweep, template_uris
+from uri_template import TemplateError
 from mcp_client import (
+    complete_argument,
     connect as mcp_connect,
     disconnect as mcp_disconnect,
     invoke_prompt,
@@ -19,48 +67,75 @@ from mcp_client import (
     list_tools,
     ping_server,
     read_resource,
+    read_resource_contents,
     send_custom_request,
+    send_session_request,
     get_notifications,
     clear_notifications,
+    index_pending_notifications,
+    notification_stats,
+    notifications_version,
     set_roots,
+    set_logging_level,
+    supports_completions,
+    active_stdio_spec,
+    _get_client,
 )
 
 
-def _render_history(history: list[dict]) -> str:
+def _render_history(history: list[dict], total: int | None = None, offset: int = 0) -> str:
     if not history:
         return "_No calls yet_"
 
     html_parts = []
-    total_items = len(history)
+    total_items = total if total is not None else len(history)
     for idx, entry in enumerate(history):
-        display_num = total_items - idx
+        display_num = total_items - offset - idx
+
+        # Stored entries render once; re-rendering a page only re-joins cached fragments
+        entry_id = entry.get("id")
+        html = _entry_html_cache.get(entry_id) if entry_id is not None else None
+        if html is None:
+            html = _render_history_entry(entry)
+            if entry_id is not None:
+                _entry_html_cache[entry_id] = html
+                if len(_entry_html_cache) > ENTRY_HTML_CACHE_SIZE:
+                    _entry_html_cache.popitem(last=False)
+        html_parts.append(html.replace(_NUM_PLACEHOLDER, str(display_num), 1))
+    
+    return "\n".join(html_parts)
+
+
+_NUM_PLACEHOLDER = "\x00num\x00"
+ENTRY_HTML_CACHE_SIZE = 2048
+_entry_html_cache: OrderedDict[int, str] = OrderedDict()
+
+
+def _render_history_entry(entry: dict) -> str:
+    if "role" in entry:
+        # Render chat message (e.g. from OAuth flow)
+        role = entry["role"]
+        content = entry["content"]
+        # Simple styling for chat messages
+        bg_color = "#2b2b2b" if role == "assistant" else "#333333"
+        border_color = "#444444"
+        icon = "🤖" if role == "assistant" else "👤"
         
-        if "role" in entry:
-            # Render chat message (e.g. from OAuth flow)
-            role = entry["role"]
-            content = entry["content"]
-            # Simple styling for chat messages
-            bg_color = "#2b2b2b" if role == "assistant" else "#333333"
-            border_color = "#444444"
-            icon = "🤖" if role == "assistant" else "👤"
-            
-            html = f"""
+        return f"""
             <div style="margin-bottom: 10px; padding: 10px; border-radius: 4px; background: {bg_color}; border: 1px solid {border_color}; color: #fff;">
                 <strong>{icon} {role.title()}:</strong> {content}
             </div>
             """
-            html_parts.append(html)
-            continue
-            
-        method = entry.get("method", "Unknown")
-        request = entry.get("request", "")
-        response = entry.get("response", "")
         
-        # Create an accordion-style HTML using details/summary
-        html = f"""
+    method = entry.get("method", "Unknown")
+    request = _preview(entry.get("request", ""), entry.get("request_length"))
+    response = _preview(entry.get("response", ""), entry.get("response_length"))
+    
+    # Create an accordion-style HTML using details/summary
+    return f"""
                 <details style="margin-bottom: 10px; border: 1px solid #ddd; border-radius: 4px; padding: 10px;">
                     <summary style="cursor: pointer; font-weight: bold; user-select: none;">
-                        {display_num}. {method}
+                        {_NUM_PLACEHOLDER}. {method}
                     </summary>
                     <div style="margin-top: 10px;">
                         <div style="margin-bottom: 10px;">
@@ -74,25 +149,178 @@ def _render_history(history: list[dict]) -> str:
                     </div>
                 </details>
                 """
-        html_parts.append(html)
-    
-    return "\n".join(html_parts)
 
 
-def _update_history(history: list[dict] | None, method: str, request: str, response: str):
-    history = history or []
-    history.insert(
-        0,
+def _preview(text: str, full_length: int | None) -> str:
+    if full_length is not None and full_length > len(text):
+        return f"{text}\n… ({full_length - len(text)} more characters not shown)"
+    return text
+
+
+# Each history page is bounded (entries x preview size), so a click costs the
+# same regardless of how long the session has been running.
+HISTORY_PAGE_SIZE = 25
+HISTORY_PREVIEW_CHARS = 4_000
+
+# Page cursor per session; the browser only holds the session key.
+_history_cursors: dict[str, int] = {}
+
+
+def _history_session(history: dict | None) -> str:
+    """Return the session key from the per-tab history handle, or "" until load_history has minted one."""
+    if isinstance(history, dict) and history.get("session"):
+        return history["session"]
+    return ""
+
+
+def _render_history_page(session: str) -> str:
+    if not session:
+        return _render_history([], total=0)
+    cursor = _history_cursors.get(session, 0)
+    entries = history_store.page(session, cursor, HISTORY_PAGE_SIZE, preview_chars=HISTORY_PREVIEW_CHARS)
+    total = history_store.count(session)
+    rendered = _render_history(entries, total=total, offset=cursor)
+    if total > HISTORY_PAGE_SIZE:
+        last = min(cursor + HISTORY_PAGE_SIZE, total)
+        rendered = f'<div style="color: #888; margin-bottom: 8px;">Showing {cursor + 1}–{last} of {total}</div>\n' + rendered
+    return rendered
+
+
+def _update_history(history: dict | None, method: str, request: str, response: str) -> str:
+    """Store a call in the session's history and return the refreshed first page."""
+    session = _history_session(history)
+    timestamp = time.time()
+    status = "error" if request == "Error" or response.startswith("Error") else "ok"
+    if not session:
+        # Nothing handed back to the browser yet; storing under a fresh key would orphan the entry
+        return _render_history_page(session)
+    search_index.add_document(
+        "history", method, f"{request}\n{response}", method=method, status=status, timestamp=timestamp, session=session
+    )
+    _history_cursors[session] = 0
+    history_store.append(
+        session,
         {
             "method": method,
             "request": request,
             "response": response,
+            "status": status,
+            "timestamp": timestamp,
         },
     )
-    return history, _render_history(history)
-
+    return _render_history_page(session)
+
+
+def _log_chat(history: dict | None, role: str, content: str) -> str:
+    """Record a chat-style message (e.g. OAuth flow progress) and return the first page."""
+    session = _history_session(history)
+    if not session:
+        return _render_history_page(session)
+    _history_cursors[session] = 0
+    history_store.append(session, {"role": role, "content": content, "timestamp": time.time()})
+    return _render_history_page(session)
+
+
+def load_history(history):
+    # The only handler that writes the handle back: it mints the session key on first visit
+    session = _history_session(history) or history_store.new_session()
+    _history_cursors[session] = 0
+    return {"session": session}, _render_history_page(session)
+
+
+def page_history(history, direction: int):
+    session = _history_session(history)
+    if not session:
+        return _render_history_page(session)
+    total = history_store.count(session)
+    cursor = _history_cursors.get(session, 0) + direction * HISTORY_PAGE_SIZE
+    _history_cursors[session] = max(0, min(cursor, max(total - 1, 0) // HISTORY_PAGE_SIZE * HISTORY_PAGE_SIZE))
+    return _render_history_page(session)
+
+
+def clear_history(history):
+    session = _history_session(history)
+    if not session:
+        return _render_history_page(session)
+    history_store.clear(session)
+    search_index.clear(("history",), session=session)
+    _history_cursors[session] = 0
+    return _render_history_page(session)
+
+
+def build_tool_inputs(fields: list[dict]) -> list:
+    """Create one input component per compiled form field."""
+    inputs = []
+    for field in fields:
+        label = field["label"]
+        desc = field["description"]
+        default_val = field["default"]
+        kind = field["kind"]
+
+        if kind == "dropdown":
+            component = gr.Dropdown(
+                label=label,
+                choices=field["choices"],
+                value=default_val,
+                info=desc
+            )
+        elif kind == "multiselect":
+            component = gr.Dropdown(
+                label=label,
+                choices=field["choices"],
+                value=default_val or [],
+                multiselect=True,
+                info=desc
+            )
+        elif kind == "text":
+            component = gr.Textbox(
+                label=label,
+                placeholder=desc,
+                value=default_val if default_val is not None else ""
+            )
+        elif kind == "number":
+            component = gr.Number(
+                label=label,
+                info=desc,
+                value=default_val,
+                precision=0 if field["type"] == "integer" else None
+            )
+        elif kind == "checkbox":
+            component = gr.Checkbox(
+                label=label,
+                info=desc,
+                value=default_val if default_val is not None else False
+            )
+        else:
+            # For arrays/objects/unions, show default as JSON if exists
+            def_json = json.dumps(default_val, indent=2) if default_val is not None else field["empty"]
+            component = gr.Code(
+                label=label + " (JSON)",
+                language="json",
+                value=def_json
+            )
+        inputs.append(component)
+    return inputs
+
+
+async def connect(
+    transport: str,
+    url: str,
+    header_name: str,
+    token: str,
+    request_timeout: float,
+    reset_timeout: str,
+    max_timeout: float,
+    roots: list[str] | None = None,
+    stdio_command: str = "",
+    stdio_args: str = "",
+    stdio_env: str = "",
+    stdio_pool: float | None = None,
+):
+    stop_oauth_refresh()
+    if transport == stdio_servers.STDIO_TRANSPORT:
+        return await _connect_stdio(stdio_command, stdio_args, stdio_env, stdio_pool, request_timeout, roots)
 
-async def connect(transport: str, url: str, header_name: str, token: str, request_timeout: float, reset_timeout: str, max_timeout: float, roots: list[str] | None = None):
     cleaned_url = url.strip()
     if not cleaned_url:
         return (
@@ -147,8 +375,66 @@ async def connect(transport: str, url: str, header_name: str, token: str, reques
     )
 
 
+async def _connect_stdio(command: str, args: str, env: str, pool: float | None, request_timeout: float, roots: list[str] | None):
+    try:
+        stdio_servers.check_local_servers_allowed("Stdio")
+        spec = stdio_servers.parse_server_spec(command, args, env)
+    except (PermissionError, ValueError) as e:
+        return "", f"**Status:** ⚠️ {e}", gr.update(visible=True), gr.update(visible=False), gr.update(visible=False)
+
+    label = f"stdio: {stdio_servers.describe(spec)}"
+    try:
+        timeout_sec = float(request_timeout) / 1000.0 if request_timeout else 10.0
+        if roots is not None:
+            set_roots([r for r in roots if r and r.strip()])
+        pool_size = int(pool) if pool is not None else stdio_servers.POOL_SIZE
+        await mcp_connect(label, timeout_sec, stdio_servers.STDIO_TRANSPORT, sampling_handler,
+                          stdio_spec=spec, pool_size=pool_size)
+    except Exception as e:
+        tail = stdio_servers.stderr_tail(spec, 5)
+        detail = f"\n\n```\n{tail}\n```" if tail else ""
+        return (
+            label,
+            f"**Status:** 🔴 Could not start server: {e}{detail}",
+            gr.update(visible=True),
+            gr.update(visible=False),
+            gr.update(visible=False),
+        )
+
+    return (
+        label,
+        f"**Status:** 🟢 Connected via stdio to `{stdio_servers.describe(spec)}`.",
+        gr.update(visible=False),
+        gr.update(visible=True),
+        gr.update(visible=True),
+    )
+
+
+def stdio_status_handler(last_key: tuple | None):
+    """Process status and stderr tail of the connected stdio server; skipped when unchanged."""
+    spec = active_stdio_spec()
+    key = spec and (stdio_servers.spec_key(spec), stdio_servers.status_version(), stdio_servers.stderr_size(spec))
+    if key == last_key:
+        return gr.skip(), gr.skip(), last_key
+    if spec is None:
+        return "_No stdio server connected._", "", key
+
+    status = stdio_servers.status(spec) or {}
+    icons = {"running": "🟢", "starting": "🟡", "restarting": "🟡", "crashed": "🔴", "stopped": "⚪"}
+    state = status.get("state", "starting")
+    summary = (
+        f"{icons.get(state, '')} **{state}** · `{status.get('command', '')}` · "
+        f"{status.get('restarts', 0)} restarts · {status.get('idle', 0)} prewarmed"
+    )
+    if status.get("last_crash"):
+        summary += f" · last crash {time.strftime('%H:%M:%S', time.localtime(status['last_crash']))}"
+    return summary, stdio_servers.stderr_tail(spec), key
+
+
 async def disconnect():
+    stop_oauth_refresh()
     await mcp_disconnect()
+    await stdio_servers.drain_pool()
     return (
         "",
         "**Status:** 🔴 Disconnected.",
@@ -158,25 +444,44 @@ async def disconnect():
     )
 
 
-async def custom_request_with_history(base_url, method, params, timeout, history):
-    request, response = await send_custom_request(base_url, method, params, timeout)
-    history, rendered = _update_history(history, method or "custom", request, response)
-    return request, response, history, rendered
+RAW_REQUEST_ROUTES = {
+    "Live session": None,
+    "Direct HTTP (batch)": "batch",
+    "Direct HTTP (pipelined)": "pipelined",
+}
+
+
+async def custom_request_with_history(base_url, method, params, timeout, route, history):
+    timeout_sec = float(timeout) / 1000.0 if timeout else 10.0
+    mode = RAW_REQUEST_ROUTES.get(route)
+    started = time.perf_counter()
+    if mode is None:
+        try:
+            request, response, _ = await send_session_request(method, params, timeout_sec)
+        except RuntimeError as e:
+            return "", str(e), "", gr.update()
+    else:
+        request, response = await send_custom_request(base_url, method, params, timeout_sec, mode)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    rendered = _update_history(history, method or "custom", request, response)
+    return request, response, f"⏱️ {elapsed_ms:.1f} ms via {route}", rendered
 
 
 async def list_tools_with_history(base_url, timeout, history):
     request, response, tools_data = await list_tools(base_url, timeout, sampling_handler)
-    names = [t["name"] for t in tools_data]
+    # list_tools already attached the schema cache keys; just index by name
+    tools_index = {t["name"]: t for t in tools_data}
+    names = list(tools_index)
     update = gr.update(choices=names, value=None, visible=bool(names))
     empty_msg_update = gr.update(visible=not names)
-    history, rendered = _update_history(history, "tools/list", request, response)
-    return request, response, update, empty_msg_update, tools_data, history, rendered
+    rendered = _update_history(history, "tools/list", request, response)
+    return request, response, update, empty_msg_update, tools_index, rendered
 
 
 async def invoke_tool_with_history(base_url, timeout, tool_name, args, history):
     request, response = await invoke_tool(base_url, timeout, tool_name, args, sampling_handler)
-    history, rendered = _update_history(history, "tools/call", request, response)
-    return request, response, history, rendered
+    rendered = _update_history(history, "tools/call", request, response)
+    return request, response, rendered
 
 
 async def list_prompts_with_history(base_url, timeout, history):
@@ -184,14 +489,14 @@ async def list_prompts_with_history(base_url, timeout, history):
     names = [p["name"] for p in prompts_data]
     update = gr.update(choices=names, value=None, visible=bool(names))
     empty_msg_update = gr.update(visible=not names)
-    history, rendered = _update_history(history, "prompts/list", request, response)
-    return request, response, update, empty_msg_update, prompts_data, history, rendered
+    rendered = _update_history(history, "prompts/list", request, response)
+    return request, response, update, empty_msg_update, prompts_data, rendered
 
 
 async def invoke_prompt_with_history(base_url, timeout, prompt_name, args, history):
     request, response = await invoke_prompt(base_url, timeout, prompt_name, args, sampling_handler)
-    history, rendered = _update_history(history, "prompts/invoke", request, response)
-    return request, response, history, rendered
+    rendered = _update_history(history, "prompts/invoke", request, response)
+    return request, response, rendered
 
 
 async def list_resources_with_history(base_url, timeout, history):
@@ -200,8 +505,8 @@ async def list_resources_with_history(base_url, timeout, history):
     names = [r.get("name", r.get("uri", "Unknown")) for r in resources_data]
     update = gr.update(choices=names, value=None, visible=bool(names))
     empty_msg_update = gr.update(visible=not names)
-    history, rendered = _update_history(history, "resources/list", request, response)
-    return request, response, update, empty_msg_update, resources_data, history, rendered
+    rendered = _update_history(history, "resources/list", request, response)
+    return request, response, update, empty_msg_update, resources_data, rendered
 
 
 async def list_resource_templates_with_history(base_url, timeout, history):
@@ -209,20 +514,19 @@ async def list_resource_templates_with_history(base_url, timeout, history):
     names = [t.get("name", t.get("uriTemplate", "Unknown")) for t in templates_data]
     update = gr.update(choices=names, value=None, visible=bool(names))
     empty_msg_update = gr.update(visible=not names)
-    history, rendered = _update_history(history, "resources/templates/list", request, response)
-    return request, response, update, empty_msg_update, templates_data, history, rendered
+    rendered = _update_history(history, "resources/templates/list", request, response)
+    return request, response, update, empty_msg_update, templates_data, rendered
 
 
 async def read_resource_with_history(base_url, timeout, resource_uri, history):
     request, response = await read_resource(base_url, timeout, resource_uri, sampling_handler)
-    history, rendered = _update_history(history, "resources/list", request, response)
-    return request, response, history, rendered
+    rendered = _update_history(history, "resources/list", request, response)
+    return request, response, rendered
 
 
 async def ping_with_history(base_url, timeout, history):
     request, response = await ping_server(base_url, timeout, sampling_handler)
-    history, rendered = _update_history(history, "ping", request, response)
-    return history, rendered
+    return _update_history(history, "ping", request, response)
 
 
 # Sampling handler that will be set dynamically
@@ -275,6 +579,16 @@ async def sampling_handler(
             del pending_sampling_requests[request_id]
 
 
+def _collect_metrics():
+    yield ("mcp_inspector_pending_sampling_requests", "gauge", "Sampling requests waiting for a response.",
+           [({}, len(pending_sampling_requests))])
+    yield ("mcp_inspector_history_entries", "gauge", "Entries in the persistent call history.",
+           [({}, history_store.total_count())])
+
+
+metrics.register_collector(_collect_metrics)
+
+
 def get_pending_sampling_requests():
     """Get list of pending sampling requests for the UI."""
     # Return serializable data (exclude future object)
@@ -318,10 +632,8 @@ async def on_resource_select(base_url, timeout, resource_name, resources, histor
         return (
             gr.update(visible=False),
             gr.update(visible=False),
-            gr.update(visible=False),
-            gr.update(visible=False),
-            history,
-            _render_history(history)
+            "",
+            gr.update(),
         )
     
     # Find the resource by name and get its URI
@@ -330,10 +642,8 @@ async def on_resource_select(base_url, timeout, resource_name, resources, histor
         return (
             gr.update(visible=False),
             gr.update(visible=False),
-            gr.update(visible=False),
-            gr.update(visible=False),
-            history,
-            _render_history(history)
+            "",
+            gr.update(),
         )
     
     resource_uri = resource["uri"]
@@ -349,84 +659,28 @@ async def on_resource_select(base_url, timeout, resource_name, resources, histor
     except Exception:
         pass
 
-    history, rendered = _update_history(history, "resources/read", request, response)
+    rendered = _update_history(history, "resources/read", request, response)
 
     print(f"DEBUG: on_resource_select finishing. Response length: {len(response)}")
-    # Return 5 outputs: read_request, read_response, content_display_state, history, history_panel
+    # Return 4 outputs: read_request, read_response, content_display_state, history_panel
     return (
         gr.update(value=request, visible=True),
         gr.update(value=response, visible=True),
         display_text,
-        history,
         rendered
     )
 
 
 async def start_oauth_flow(base_url, timeout, transport_type, history, roots=None):
-    try:
-        from fastmcp.client.auth import OAuth
-    except ImportError:
-        history.append({"role": "assistant", "content": "Error: fastmcp not installed or OAuth not available."})
-        return (
-            [],
-            gr.update(value="", visible=False),
-            gr.update(value="", visible=False),
-            gr.update(value="", visible=False),
-            gr.update(value="", visible=False),
-            history,
-            _render_history(history),
-            gr.update(),
-            "**Status:** 🔴 Error: fastmcp missing.",
-            gr.update(),
-            gr.update(),
-            gr.update()
-        )
-
-    class InspectableOAuth(OAuth):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, **kwargs)
-            self._flow_artifacts: dict[str, Any] = {
-                "authorization_url": None,
-                "authorization_code": None,
-                "state": None,
-            }
-
-        async def redirect_handler(self, authorization_url: str) -> None:
-            self._flow_artifacts["authorization_url"] = authorization_url
-            await super().redirect_handler(authorization_url)
-
-        async def callback_handler(self) -> tuple[str, str | None]:
-            code, state = await super().callback_handler()
-            self._flow_artifacts["authorization_code"] = code
-            self._flow_artifacts["state"] = state
-            return code, state
-
-        def get_summary(self) -> dict[str, Any]:
-            token_endpoint = None
-            if (
-                self.context.oauth_metadata
-                and self.context.oauth_metadata.token_endpoint
-            ):
-                token_endpoint = str(self.context.oauth_metadata.token_endpoint)
-            else:
-                token_endpoint = f"{self.server_base_url}/token"
-
-            tokens = None
-            if self.context.current_tokens:
-                tokens = self.context.current_tokens.model_dump(mode="json")
-
-            return {
-                "authorization_url": self._flow_artifacts.get("authorization_url"),
-                "authorization_code": self._flow_artifacts.get("authorization_code"),
-                "token_endpoint": token_endpoint,
-                "tokens": tokens,
-            }
-
     # Update history
-    history.append({"role": "user", "content": f"Starting OAuth flow for {base_url}..."})
-    
+    _log_chat(history, "user", f"Starting OAuth flow for {base_url}...")
+    stop_oauth_refresh()
+    cached = oauth_cache_summary(base_url)
+    if cached and cached["has_tokens"]:
+        _log_chat(history, "assistant", "Using the cached OAuth token for this server.")
+
     try:
-        # Create OAuth instance
+        # Create OAuth instance; tokens and client registration come from the encrypted cache
         # Note: mcp_url is required.
         oauth = InspectableOAuth(mcp_url=base_url)
         
@@ -442,8 +696,10 @@ async def start_oauth_flow(base_url, timeout, transport_type, history, roots=Non
         
         # Connect
         await mcp_connect(base_url, timeout_sec, transport_type, auth=oauth)
-        
-        history.append({"role": "assistant", "content": "OAuth Authentication Successful! Connected."})
+        await oauth.persist_metadata()
+        start_oauth_refresh(oauth)
+
+        rendered = _log_chat(history, "assistant", "OAuth Authentication Successful! Connected.")
         
         # Return progress update and history
         all_steps = [
@@ -474,8 +730,7 @@ async def start_oauth_flow(base_url, timeout, transport_type, history, roots=Non
             gr.update(value=auth_code, visible=True),
             gr.update(value=token_endpoint, visible=True),
             gr.update(value=token_text, visible=True),
-            history,
-            _render_history(history),
+            rendered,
             base_url,
             badge,
             gr.update(visible=False), # initial_connect_btn
@@ -484,15 +739,14 @@ async def start_oauth_flow(base_url, timeout, transport_type, history, roots=Non
         )
         
     except Exception as e:
-        history.append({"role": "assistant", "content": f"OAuth Failed: {str(e)}"})
+        rendered = _log_chat(history, "assistant", f"OAuth Failed: {str(e)}")
         return (
             [],
             gr.update(value="", visible=False),
             gr.update(value="", visible=False),
             gr.update(value="", visible=False),
             gr.update(value=str(e), visible=True),
-            history,
-            _render_history(history),
+            rendered,
             gr.update(),
             f"**Status:** 🔴 OAuth Failed: {str(e)}",
             gr.update(visible=True),
@@ -501,9 +755,102 @@ async def start_oauth_flow(base_url, timeout, transport_type, history, roots=Non
         )
 
 
-async def clear_oauth_state(history):
+def _render_oauth_timings(flow: dict | None, error: str | None = None) -> str:
+    if not flow:
+        return f"⚠️ {error}" if error else "_Press **Guided OAuth Flow** to start._"
+    lines = []
+    if flow["timings"]:
+        lines += ["| Step | Latency | Detail |", "| --- | ---: | --- |"]
+        lines += [f"| {t['step']} | {t['ms']:,.1f} ms | {t['detail']} |" for t in flow["timings"]]
+    if flow["step"] < len(OAUTH_GUIDED_STEPS):
+        lines.append(f"\nNext: **{OAUTH_GUIDED_STEPS[flow['step']]}** — press Continue.")
+    if error:
+        lines.append(f"\n⚠️ {error}")
+    return "\n".join(lines)
+
+
+def _guided_oauth_outputs(flow: dict | None, rendered, error: str | None = None, connection=None):
+    flow = flow or {}
+    metadata = flow.get("metadata") or {}
+    if flow.get("code"):
+        code_box = gr.update(value=flow["code"], visible=True, interactive=False)
+    elif flow.get("step") == 3:
+        # Waiting for the user: leave whatever they pasted in place
+        code_box = gr.update(visible=True, interactive=True)
+    else:
+        code_box = gr.update(value="", visible=False, interactive=False)
+    return (
+        OAUTH_GUIDED_STEPS[:flow.get("step", 0)],
+        gr.update(value=flow.get("authorization_url") or "", visible=bool(flow.get("authorization_url"))),
+        code_box,
+        gr.update(value=metadata.get("token_endpoint") or "", visible=bool(metadata)),
+        gr.update(value=json.dumps(flow["tokens"], indent=2) if flow.get("tokens") else "", visible=bool(flow.get("tokens"))),
+        _render_oauth_timings(flow or None, error),
+        flow or None,
+        rendered,
+    ) + (connection or (gr.update(),) * 5)
+
+
+async def guided_oauth_start(base_url, flow, history):
+    """Begin a step-by-step OAuth flow; each Continue runs one step."""
+    await cancel_guided_flow(flow)
+    base_url = (base_url or "").strip()
+    if not base_url:
+        return _guided_oauth_outputs(None, gr.update(), "Enter the server URL first.")
+    flow = new_guided_flow(base_url)
+    rendered = _log_chat(history, "user", f"Starting guided OAuth flow for {base_url}...")
+    return _guided_oauth_outputs(flow, rendered)
+
+
+async def guided_oauth_continue(flow, pasted_code, timeout, transport_type, history, roots=None):
+    if not flow:
+        return _guided_oauth_outputs(None, gr.update())
+    step = flow["step"]
+    if step >= len(OAUTH_GUIDED_STEPS):
+        return _guided_oauth_outputs(flow, gr.update())
+
+    timeout_sec = float(timeout) / 1000.0 if timeout else 30.0
+    if step < len(OAUTH_GUIDED_STEPS) - 1:
+        try:
+            flow = await advance_guided_flow(flow, pasted_code, timeout_sec)
+        except Exception as e:
+            rendered = _log_chat(history, "assistant", f"{OAUTH_GUIDED_STEPS[step]} failed: {e}")
+            return _guided_oauth_outputs(flow, rendered, str(e))
+        timing = flow["timings"][-1]
+        rendered = _log_chat(history, "assistant", f"{timing['step']}: {timing['detail']} ({timing['ms']:,.1f} ms)")
+        return _guided_oauth_outputs(flow, rendered)
+
+    # Final step: connect; the token is read back from the cache the token step wrote
+    if roots is not None:
+        set_roots([r for r in roots if r and r.strip()])
+    started = time.perf_counter()
+    try:
+        oauth = InspectableOAuth(mcp_url=flow["mcp_url"])
+        await mcp_connect(flow["mcp_url"], timeout_sec, transport_type, auth=oauth)
+        start_oauth_refresh(oauth)
+    except Exception as e:
+        rendered = _log_chat(history, "assistant", f"OAuth Failed: {e}")
+        return _guided_oauth_outputs(flow, rendered, str(e))
+    flow = dict(flow, timings=list(flow["timings"]))
+    record_oauth_step(flow, started, "Connected with the new token")
+    total = sum(t["ms"] for t in flow["timings"])
+    rendered = _log_chat(history, "assistant", f"OAuth Authentication Successful! Connected. Steps took {total:,.0f} ms in total.")
+    connection = (
+        flow["mcp_url"],
+        "**Status:** 🟢 Connected via OAuth.",
+        gr.update(visible=False),
+        gr.update(visible=True),
+        gr.update(visible=True),
+    )
+    return _guided_oauth_outputs(flow, rendered, connection=connection)
+
+
+async def clear_oauth_state(base_url, history):
+    stop_oauth_refresh()
     await mcp_disconnect()
-    history.append({"role": "assistant", "content": "OAuth state cleared (Disconnected)."})
+    if base_url and base_url.strip():
+        await clear_oauth_cache(base_url.strip())
+    rendered = _log_chat(history, "assistant", "OAuth state cleared (Disconnected, cached tokens removed).")
     hidden_box = gr.update(value="", visible=False)
     return (
         [],
@@ -511,8 +858,7 @@ async def clear_oauth_state(history):
         hidden_box,
         hidden_box,
         hidden_box,
-        history, 
-        _render_history(history),
+        rendered,
         "**Status:** 🔴 Disconnected.",
         gr.update(visible=True),  # initial_connect_btn
         gr.update(visible=False), # reconnect_btn
@@ -530,12 +876,14 @@ def _render_notifications(notifications: list[dict]) -> str:
         params = note.get("params", {})
         
         # Format params as JSON
-        params_json = json.dumps(params, indent=2)
+        params_json = formatting.dumps(params)
         
+        coalesced = f" <span style=\"color: #888; font-weight: normal;\">(latest of {note['coalesced']} updates)</span>" if note.get("coalesced") else ""
+
         # Use a badge for the method
         html = f"""
         <div style="margin-bottom: 10px; border: 1px solid #444; border-radius: 4px; padding: 10px; background: #1e1e1e;">
-            <div style="font-weight: bold; color: #66ccff; margin-bottom: 5px;">{method}</div>
+            <div style="font-weight: bold; color: #66ccff; margin-bottom: 5px;">{method}{coalesced}</div>
             <pre style="background: #000; color: #ccc; padding: 5px; border-radius: 4px; overflow-x: auto; font-size: 0.9em; margin: 0;">{params_json}</pre>
         </div>
         """
@@ -544,14 +892,397 @@ def _render_notifications(notifications: list[dict]) -> str:
     return "\n".join(html_parts)
 
 
-def get_server_notifications_handler():
-    notes = get_notifications()
-    return _render_notifications(notes)
+# Newest notifications rendered in the panel; older ones stay buffered.
+NOTIFICATIONS_SHOWN = 100
+
+
+def _render_notification_stats(stats: list[dict]) -> str:
+    if not stats:
+        return ""
+    rows = "".join(
+        f"<tr><td>{html_escape(s['method'])}</td><td style='text-align: right;'>{s['count']:,}</td>"
+        f"<td style='text-align: right;'>{s['rate']:.1f}/s</td></tr>"
+        for s in stats
+    )
+    return (
+        "<table style='width: 100%; font-size: 0.85em; margin-bottom: 10px;'>"
+        "<tr><th style='text-align: left;'>Method</th><th style='text-align: right;'>Total</th>"
+        f"<th style='text-align: right;'>Rate</th></tr>{rows}</table>"
+    )
+
+
+async def get_server_notifications_handler(last_version: int | None = None):
+    """Re-render only when a notification arrived since the last tick."""
+    version = notifications_version()
+    if version == last_version:
+        return gr.skip(), last_version
+    notifications = get_notifications(NOTIFICATIONS_SHOWN)
+    rendered = await formatting.offload(
+        _render_notifications, notifications, size=formatting.approx_size([n.get("params") for n in notifications])
+    )
+    return _render_notification_stats(notification_stats()) + rendered, version
 
 
 def clear_server_notifications_handler():
     clear_notifications()
-    return _render_notifications([])
+    return _render_notifications([]), notifications_version()
+
+
+SEARCH_TIME_RANGES = {
+    "Any time": None,
+    "Last 5 minutes": 5 * 60,
+    "Last hour": 60 * 60,
+    "Last 24 hours": 24 * 60 * 60,
+}
+
+
+def search_handler(query: str, kinds: list[str], method: str, status: str, time_range: str, history: dict | None = None):
+    started = time.perf_counter()
+    index_pending_notifications()
+    window = SEARCH_TIME_RANGES.get(time_range)
+    since = time.time() - window if window else None
+    results = search_index.search(
+        query,
+        kinds=[k.lower() for k in kinds] if kinds else None,
+        method=method,
+        status="" if status == "Any" else status,
+        since=since,
+        # Without a session only shared documents match, never another tab's history
+        session=_history_session(history),
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    summary = f"{len(results)} result(s) in {elapsed_ms:.1f} ms ({search_index.document_count()} documents indexed)"
+    return summary, _render_search_results(results)
+
+
+def _render_search_results(results: list[dict]) -> str:
+    if not results:
+        return "_No matches_"
+
+    html_parts = []
+    for doc in results:
+        ts = time.strftime("%H:%M:%S", time.localtime(doc["timestamp"]))
+        status_color = "#e06c75" if doc["status"] == "error" else "#98c379"
+        html = f"""
+        <div style="margin-bottom: 8px; border: 1px solid #444; border-radius: 4px; padding: 8px;">
+            <div>
+                <span style="font-size: 0.8em; padding: 1px 6px; border-radius: 3px; background: #444; color: #fff;">{doc['kind']}</span>
+                <strong>{html_escape(doc['title'])}</strong>
+                <span style="color: #888; font-size: 0.85em;">{html_escape(doc['method'])} · {ts}</span>
+                <span style="color: {status_color}; font-size: 0.85em;">{doc['status']}</span>
+            </div>
+            <div style="font-family: monospace; font-size: 0.85em; color: #aaa; margin-top: 4px;">{html_escape(doc['snippet'])}</div>
+        </div>
+        """
+        html_parts.append(html)
+    return "\n".join(html_parts)
+
+
+FLEET_COLUMNS = ["Server", "Status", "Latency (ms)", "Summary"]
+
+
+def _fleet_table(results: list[dict]) -> list[list]:
+    return [
+        [r["server"], "🟢 ok" if r["ok"] else "🔴 error", round(r["latency_ms"], 1), r["summary"]]
+        for r in results
+    ]
+
+
+def _fleet_summary(operation: str, results: list[dict], wall_ms: float) -> str:
+    ok = [r for r in results if r["ok"]]
+    lines = [f"**{operation}**: {len(ok)}/{len(results)} servers ok in {wall_ms:.0f} ms wall time."]
+    if ok:
+        latencies = sorted(r["latency_ms"] for r in ok)
+        median = latencies[len(latencies) // 2]
+        lines.append(f"Latency min {latencies[0]:.1f} ms · median {median:.1f} ms · max {latencies[-1]:.1f} ms")
+    return "\n\n".join(lines)
+
+
+def _render_tool_diffs(diffs: dict[str, dict]) -> str:
+    if not diffs:
+        return ""
+    lines = ["### Tool catalog diff", ""]
+    for url, diff in diffs.items():
+        if not (diff["added"] or diff["removed"] or diff["changed"]):
+            lines.append(f"- `{url}`: identical to `{diff['baseline']}`")
+            continue
+        parts = []
+        for label in ("added", "removed", "changed"):
+            if diff[label]:
+                parts.append(f"{label}: {', '.join(f'`{n}`' for n in diff[label])}")
+        lines.append(f"- `{url}` vs `{diff['baseline']}` — " + "; ".join(parts))
+    return "\n".join(lines)
+
+
+async def fleet_connect_handler(servers_text: str, transport: str, request_timeout: float):
+    try:
+        specs = parse_fleet_spec(servers_text, transport)
+    except ValueError as e:
+        return [], f"⚠️ Invalid fleet definition: {e}"
+    if not specs:
+        return [], "⚠️ Add at least one server URL."
+    timeout_sec = float(request_timeout) / 1000.0 if request_timeout else 10.0
+    started = time.perf_counter()
+    results = await connect_fleet(specs, timeout_sec)
+    return _fleet_table(results), _fleet_summary("Connect", results, (time.perf_counter() - started) * 1000)
+
+
+async def fleet_disconnect_handler():
+    await disconnect_fleet()
+    return [], "Fleet disconnected."
+
+
+async def fleet_operation_handler(operation: str, tool_name: str, args_text: str, request_timeout: float):
+    timeout_sec = float(request_timeout) / 1000.0 if request_timeout else 10.0
+    started = time.perf_counter()
+    try:
+        if operation == "Ping":
+            results = await fleet_ping(timeout_sec)
+        elif operation == "List Tools":
+            results = await fleet_list_tools(timeout_sec)
+        else:
+            if not tool_name:
+                return gr.update(), "⚠️ Enter a tool name."
+            args = json.loads(args_text) if (args_text or "").strip() else {}
+            results = await fleet_call_tool(tool_name, args, timeout_sec)
+    except (RuntimeError, ValueError) as e:
+        return gr.update(), f"⚠️ {e}"
+
+    summary = _fleet_summary(operation, results, (time.perf_counter() - started) * 1000)
+    if operation == "List Tools":
+        summary += "\n\n" + _render_tool_diffs(tool_catalog_diff(results))
+    return _fleet_table(results), summary
+
+
+CONNECTED_SOURCE = "Connected server"
+
+
+def catalog_sources() -> list[str]:
+    return (
+        [CONNECTED_SOURCE]
+        + [f"fleet: {url}" for url in member_urls()]
+        + [f"snapshot: {name}" for name in list_snapshots()]
+    )
+
+
+def refresh_catalog_sources():
+    choices = catalog_sources()
+    return gr.update(choices=choices), gr.update(choices=choices)
+
+
+async def _catalog_snapshot(source: str) -> dict:
+    if source.startswith("snapshot: "):
+        return load_snapshot(source.removeprefix("snapshot: "))
+    if source.startswith("fleet: "):
+        url = source.removeprefix("fleet: ")
+        return make_snapshot(url, await fetch_catalogs(get_member_client(url)))
+    return make_snapshot(CONNECTED_SOURCE, await fetch_catalogs(_get_client()))
+
+
+async def save_catalog_snapshot_handler(source: str, name: str):
+    try:
+        snapshot = await _catalog_snapshot(source or CONNECTED_SOURCE)
+        path = save_snapshot(snapshot, name or "")
+    except Exception as e:
+        return f"⚠️ {str(e) or type(e).__name__}", gr.update(), gr.update()
+    counts = ", ".join(f"{len(items)} {kind}" for kind, items in snapshot["catalogs"].items())
+    choices = catalog_sources()
+    return f"💾 Saved `{path.stem}` ({counts})", gr.update(choices=choices), gr.update(choices=choices)
+
+
+async def catalog_diff_handler(source_a: str, source_b: str):
+    if not source_a or not source_b:
+        return "⚠️ Pick two sources to compare."
+    try:
+        old, new = await asyncio.gather(_catalog_snapshot(source_a), _catalog_snapshot(source_b))
+    except Exception as e:
+        return f"⚠️ {str(e) or type(e).__name__}"
+    return render_diff_markdown(diff_snapshots(old, new), source_a, source_b)
+
+
+def argument_completer(ref_type: str, ref_name: str, argument: str, field_names: list[str]):
+    """key_up handler suggesting values for one prompt or template argument.
+
+    Wired with every field of the form as inputs, so the other filled-in
+    arguments go along as completion context.
+    """
+    async def _complete(evt: gr.KeyUpData, *form_values):
+        context = {
+            name: str(value) for name, value in zip(field_names, form_values)
+            if value and name != argument
+        }
+        values = await completion.suggest(
+            complete_argument, ref_type, ref_name, argument, evt.input_value, context
+        )
+        if values is None:
+            return gr.skip()
+        return gr.update(choices=values)
+
+    return _complete
+
+
+async def set_log_level_handler(level: str):
+    try:
+        await set_logging_level(level)
+    except Exception as e:
+        return f"⚠️ {e}"
+    return f"Server log level set to **{level}**."
+
+
+def log_tail_handler(min_level: str, logger: str, last_key: tuple | None):
+    """Re-render the log tail only when new lines arrived or the filters changed."""
+    key = (log_stream.version(), min_level, logger)
+    if key == last_key:
+        return gr.skip(), gr.skip(), last_key
+    s = log_stream.stats()
+    summary = (
+        f"{s['buffered']:,} buffered · {s['rate']:.0f} lines/s"
+        + (f" · {s['dropped']:,} oldest dropped" if s["dropped"] else "")
+    )
+    return log_stream.render_tail(log_stream.tail(min_level, logger)), summary, key
+
+
+def clear_logs_handler():
+    log_stream.clear()
+    return log_stream.render_tail([]), "", None
+
+
+SWEEP_SOURCES = ("All listed resources", "Template + parameter sets")
+SWEEP_COLUMNS = ["URI", "Status", "Latency (ms)", "Size", "Error"]
+# Rows shown in the sweep table (errors and slowest first); the file has all of them
+SWEEP_ROWS_SHOWN = 200
+
+
+async def sweep_handler(source: str, template: str, params_text: str, concurrency: float, timeout: float, resources: list[dict]):
+    try:
+        if source == SWEEP_SOURCES[0]:
+            uris = [r["uri"] for r in resources or []]
+        else:
+            if not template:
+                return "⚠️ Enter a URI template.", gr.update(), gr.update()
+            uris = template_uris(template, parse_parameter_sets(params_text))
+    except (ValueError, TemplateError) as e:
+        return f"⚠️ Invalid parameter sets: {e}", gr.update(), gr.update()
+    if not uris:
+        return "⚠️ Nothing to read. List resources or add parameter sets first.", gr.update(), gr.update()
+
+    timeout_sec = float(timeout) / 1000.0 if timeout else 30.0
+    path, summary = await run_sweep(uris, read_resource_contents, int(concurrency or 8), timeout_sec)
+
+    def _ms(value):
+        return "–" if value is None else f"{value:.1f} ms"
+
+    text = (
+        f"**{summary['requests']} reads** in {summary['wall_seconds']:.2f}s "
+        f"({summary['requests_per_second']} req/s) · {summary['ok']} ok · {summary['errors']} errors · "
+        f"{format_size(summary['bytes'])}\n\n"
+        f"p50 {_ms(summary['p50_ms'])} · p95 {_ms(summary['p95_ms'])} · "
+        f"p99 {_ms(summary['p99_ms'])} · max {_ms(summary['max_ms'])}"
+    )
+    ordered = sorted(summary["results"], key=lambda r: (r["ok"], -r["latency_ms"]))[:SWEEP_ROWS_SHOWN]
+    rows = [
+        [r["uri"], "🟢 ok" if r["ok"] else "🔴 error", r["latency_ms"], format_size(r["size"]), r.get("error", "")]
+        for r in ordered
+    ]
+    return text, rows, str(path)
+
+
+MONITOR_COLUMNS = ["Job", "Server", "Every", "Runs", "Errors", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Last Run", "Status"]
+
+
+def monitor_targets() -> list[str]:
+    return [monitor.CONNECTED_TARGET] + member_urls()
+
+
+def refresh_monitor_targets():
+    return gr.update(choices=monitor_targets())
+
+
+def _monitor_job_choices():
+    return gr.update(choices=[(f"{j['id']}: {j['label']} every {j['interval']:g}s", j["id"]) for j in monitor.jobs()])
+
+
+async def add_monitor_job_handler(
+    kind: str, targets: list[str], interval: float, tool_name: str, args_text: str,
+    max_p95_ms: float | None, max_error_pct: float | None, request_timeout: float,
+):
+    timeout_sec = float(request_timeout) / 1000.0 if request_timeout else 10.0
+    try:
+        args = json.loads(args_text) if kind == "Call Tool" and (args_text or "").strip() else {}
+        job = monitor.add_job(
+            kind,
+            targets or [],
+            float(interval or 0),
+            timeout_sec,
+            tool=(tool_name or "").strip() if kind == "Call Tool" else "",
+            arguments=args,
+            max_p95_ms=float(max_p95_ms) if max_p95_ms else None,
+            max_error_rate=float(max_error_pct) / 100.0 if max_error_pct is not None else None,
+        )
+    except ValueError as e:
+        return f"⚠️ {e}", gr.update()
+    return f"Scheduled **{job['label']}** every {job['interval']:g}s on {len(job['targets'])} server(s).", _monitor_job_choices()
+
+
+def remove_monitor_job_handler(job_id: str):
+    if not job_id or not monitor.remove_job(job_id):
+        return "⚠️ Select a job to remove.", _monitor_job_choices()
+    return f"Removed {job_id}.", _monitor_job_choices()
+
+
+def _ms_cell(value: float | None):
+    return None if value is None else round(value, 1)
+
+
+def monitor_dashboard_handler(job_id: str | None, last_key: tuple | None):
+    """Job table, latency series of the selected job and recent alerts; skipped when unchanged."""
+    key = (monitor.version(), job_id)
+    if key == last_key:
+        return gr.skip(), gr.skip(), gr.skip(), last_key
+
+    rows = []
+    for r in monitor.job_stats():
+        if r["last_time"] is None:
+            status = "⏳ waiting"
+        elif r["alerting"]:
+            status = "🔴 alert"
+        elif r["last_error"]:
+            status = f"🟠 {r['last_error'][:80]}"
+        else:
+            status = "🟢 ok"
+        rows.append([
+            f"{r['job']}: {r['label']}",
+            r["server"],
+            f"{r['interval']:g}s",
+            r["runs"],
+            f"{r['errors']} ({r['error_rate']:.0%})",
+            _ms_cell(r["p50"]),
+            _ms_cell(r["p95"]),
+            _ms_cell(r["p99"]),
+            time.strftime("%H:%M:%S", time.localtime(r["last_time"])) if r["last_time"] else "",
+            status,
+        ])
+
+    samples = [s for s in monitor.series(job_id) if s[3] is None] if job_id else []
+    plot = pd.DataFrame(
+        {
+            "time": pd.to_datetime([t for _, t, _, _ in samples], unit="s"),
+            "latency_ms": [latency * 1000 for _, _, latency, _ in samples],
+            "server": [server for server, _, _, _ in samples],
+        }
+    )
+
+    alerts = monitor.recent_alerts()
+    if alerts:
+        lines = [
+            f"- {time.strftime('%H:%M:%S', time.localtime(a['time']))} "
+            f"{'🔴' if a['firing'] else '🟢'} **{a['label']}** ({a['job']}) on `{a['server']}`: {a['message']}"
+            for a in alerts
+        ]
+        alerts_md = "### Alerts\n\n" + "\n".join(lines)
+    else:
+        alerts_md = "_No alerts._"
+    return rows, plot, alerts_md, key
 
 
 def update_roots_handler(roots_list: list[str]):
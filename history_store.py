@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import atexit
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+DATA_DIR = Path(os.environ.get("MCP_INSPECTOR_DATA_DIR", Path.home() / ".cache" / "gradio-mcp-inspector"))
+DB_PATH = Path(os.environ.get("MCP_INSPECTOR_HISTORY_DB", DATA_DIR / "history.db"))
+
+# Writes are buffered and flushed in batches; reads merge the buffer in.
+BATCH_SIZE = 50
+FLUSH_INTERVAL = 1.0
+
+_COLUMNS = ("timestamp", "method", "status", "request", "response", "role", "content")
+
+_lock = threading.RLock()
+_conn: sqlite3.Connection | None = None
+_pending: list[tuple] = []
+_last_flush = time.monotonic()
+_counts: dict[str, int] = {}
+_flusher: threading.Thread | None = None
+
+
+def _connection() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                method TEXT,
+                status TEXT,
+                request TEXT,
+                response TEXT,
+                role TEXT,
+                content TEXT
+            )
+            """
+        )
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_history_session ON history (session, id)")
+        _conn.commit()
+    return _conn
+
+
+def session_secret() -> str:
+    """Stable secret for encrypting the session key kept in the browser."""
+    secret = os.environ.get("MCP_INSPECTOR_SESSION_SECRET")
+    if secret:
+        return secret
+    path = DATA_DIR / "session_secret"
+    if path.exists():
+        return path.read_text().strip()
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    secret = secrets.token_urlsafe(32)
+    path.write_text(secret)
+    path.chmod(0o600)
+    return secret
+
+
+def new_session() -> str:
+    return uuid.uuid4().hex
+
+
+def append(session: str, entry: dict):
+    """Queue a history entry (call or chat message) for the session."""
+    row = (session,) + tuple(entry.get(c) for c in _COLUMNS)
+    with _lock:
+        _start_flusher()
+        _pending.append(row)
+        if session in _counts:
+            _counts[session] += 1
+        if len(_pending) >= BATCH_SIZE or time.monotonic() - _last_flush >= FLUSH_INTERVAL:
+            flush()
+
+
+def _start_flusher():
+    # A quiet session's last few rows would otherwise wait for the next append
+    global _flusher
+    if _flusher is None:
+        _flusher = threading.Thread(target=_flush_periodically, name="history-flush", daemon=True)
+        _flusher.start()
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            flush()
+        except sqlite3.Error:
+            # Keep the rows buffered and try again on the next tick
+            pass
+
+
+def flush():
+    global _last_flush
+    with _lock:
+        if _pending:
+            conn = _connection()
+            conn.executemany(
+                f"INSERT INTO history (session, {', '.join(_COLUMNS)}) VALUES (?, {', '.join('?' * len(_COLUMNS))})",
+                _pending,
+            )
+            conn.commit()
+            _pending.clear()
+        _last_flush = time.monotonic()
+
+
+def page(session: str, offset: int = 0, limit: int = 25, preview_chars: int | None = None) -> list[dict]:
+    """Entries for a session, newest first.
+
+    With preview_chars, request/response bodies are cut to that length in SQL
+    and their full lengths are returned as request_length/response_length.
+    """
+    with _lock:
+        # Buffered rows are always newer than anything already on disk
+        buffered = [_row_to_entry(r[1:], preview_chars=preview_chars) for r in reversed(_pending) if r[0] == session]
+        entries = buffered[offset:offset + limit]
+        remaining = limit - len(entries)
+        if remaining > 0:
+            db_offset = max(offset - len(buffered), 0)
+            if preview_chars is None:
+                columns = ", ".join(_COLUMNS)
+                params: tuple = (session, remaining, db_offset)
+            else:
+                columns = (
+                    "timestamp, method, status, substr(request, 1, ?), substr(response, 1, ?), role, content, "
+                    "length(request), length(response)"
+                )
+                params = (preview_chars, preview_chars, session, remaining, db_offset)
+            rows = _connection().execute(
+                f"SELECT id, {columns} FROM history WHERE session = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+                params,
+            ).fetchall()
+            for row in rows:
+                entry = _row_to_entry(row[1:8])
+                entry["id"] = row[0]
+                if preview_chars is not None:
+                    entry["request_length"], entry["response_length"] = row[8], row[9]
+                entries.append(entry)
+    return entries
+
+
+def count(session: str) -> int:
+    with _lock:
+        if session not in _counts:
+            stored = _connection().execute("SELECT COUNT(*) FROM history WHERE session = ?", (session,)).fetchone()[0]
+            _counts[session] = stored + sum(1 for r in _pending if r[0] == session)
+        return _counts[session]
+
+
+def total_count() -> int:
+    with _lock:
+        flush()
+        return _connection().execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+
+def clear(session: str):
+    with _lock:
+        _pending[:] = [r for r in _pending if r[0] != session]
+        conn = _connection()
+        conn.execute("DELETE FROM history WHERE session = ?", (session,))
+        conn.commit()
+        _counts[session] = 0
+
+
+def _row_to_entry(row: tuple, preview_chars: int | None = None) -> dict:
+    entry = {k: v for k, v in zip(_COLUMNS, row) if v is not None}
+    if preview_chars is not None:
+        for key in ("request", "response"):
+            if key in entry:
+                entry[f"{key}_length"] = len(entry[key])
+                entry[key] = entry[key][:preview_chars]
+    return entry
+
+
+atexit.register(flush)
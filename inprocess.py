@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import inspect
+import os
+import sys
+from pathlib import Path
+
+from fastmcp.client import FastMCPTransport
+
+from stdio_servers import check_local_servers_allowed
+
+IN_PROCESS_TRANSPORT = "In-process"
+# Attribute names tried when the target doesn't name one
+DEFAULT_ATTRS = ("mcp", "server", "app")
+
+# target -> server object; importing a module or calling a factory once per process
+_servers: dict[str, object] = {}
+
+
+def _import(module_ref: str):
+    if module_ref.endswith(".py") or os.sep in module_ref:
+        path = Path(module_ref).expanduser().resolve()
+        spec = importlib.util.spec_from_file_location(f"_inspected_{path.stem}", path)
+        if spec is None or spec.loader is None:
+            raise ValueError(f"Cannot import {module_ref}")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        return module
+    if os.getcwd() not in sys.path:
+        sys.path.append(os.getcwd())
+    return importlib.import_module(module_ref)
+
+
+def _split_target(target: str) -> tuple[str, str]:
+    # Only an identifier after the last ":" names an attribute, so Windows
+    # drive letters (C:\\servers\\server.py) stay part of the path
+    module_ref, _, attr = target.rpartition(":")
+    if module_ref and attr.isidentifier():
+        return module_ref, attr
+    return target, ""
+
+
+def _is_server(value) -> bool:
+    return hasattr(value, "_mcp_server")
+
+
+def load_server(target: str):
+    """The FastMCP server named by "package.module:attr" or "path/to/server.py:attr".
+
+    Without ":attr" the usual names (mcp, server, app) are tried. A plain
+    function is treated as a factory and called without arguments; other
+    callables such as ASGI apps are not.
+    """
+    check_local_servers_allowed("In-process")
+    target = target.strip()
+    if target in _servers:
+        return _servers[target]
+
+    module_ref, attr = _split_target(target)
+    module = _import(module_ref)
+    if attr and not hasattr(module, attr):
+        raise ValueError(f"{module_ref} has no attribute {attr!r}")
+    names = [attr] if attr else [
+        n for n in DEFAULT_ATTRS
+        if _is_server(getattr(module, n, None)) or inspect.isfunction(getattr(module, n, None))
+    ]
+    if not names:
+        raise ValueError(f"No server found in {module_ref}; use {module_ref}:<attribute>")
+    server = getattr(module, names[0])
+    if not _is_server(server) and inspect.isfunction(server):
+        server = server()
+    if not _is_server(server):
+        raise TypeError(f"{target} is a {type(server).__name__}, not a FastMCP server")
+
+    _servers[target] = server
+    return server
+
+
+def make_transport(target: str) -> FastMCPTransport:
+    # raise_exceptions=False so handler errors come back as MCP errors, as over HTTP
+    return FastMCPTransport(load_server(target), raise_exceptions=False)
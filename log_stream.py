@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from array import array
+from html import escape as html_escape
+from typing import Any
+
+# RFC 5424 severities as used by MCP logging/setLevel, lowest first
+LEVELS = ("debug", "info", "notice", "warning", "error", "critical", "alert", "emergency")
+_LEVEL_RANK = {level: rank for rank, level in enumerate(LEVELS)}
+
+MAX_LINES = int(os.environ.get("MCP_INSPECTOR_LOG_BUFFER", 50_000))
+# Lines the tail view renders at most, however many match.
+TAIL_LINES = 500
+
+# Columnar ring buffer: one preallocated column per field, written at
+# _total % MAX_LINES. Appends never allocate per-line dicts and old lines are
+# overwritten in place.
+_lock = threading.Lock()
+_timestamps = array("d", bytes(8 * MAX_LINES))
+_levels = bytearray(MAX_LINES)
+_loggers: list[str | None] = [None] * MAX_LINES
+_data: list[Any] = [None] * MAX_LINES
+_total = 0
+# Lines before this sequence number were cleared from view; _total itself
+# only grows, since it backs a Prometheus counter
+_cleared = 0
+
+
+def append(level: str, logger: str | None, data: Any, timestamp: float | None = None):
+    """Store one notifications/message; data is kept raw and formatted on display."""
+    global _total
+    with _lock:
+        slot = _total % MAX_LINES
+        _timestamps[slot] = timestamp if timestamp is not None else time.time()
+        _levels[slot] = _LEVEL_RANK.get(level, 0)
+        _loggers[slot] = logger
+        _data[slot] = data
+        _total += 1
+
+
+def version() -> tuple[int, int]:
+    """Changes whenever the visible buffer does, including on clear()."""
+    return _total, _cleared
+
+
+def received() -> int:
+    """Total lines ever appended; clear() doesn't reset it."""
+    return _total
+
+
+def clear():
+    global _cleared
+    with _lock:
+        _loggers[:] = [None] * MAX_LINES
+        _data[:] = [None] * MAX_LINES
+        _cleared = _total
+
+
+def tail(min_level: str = "debug", logger: str = "", limit: int = TAIL_LINES) -> list[dict]:
+    """Newest matching lines (oldest first), scanning back from the write head."""
+    min_rank = _LEVEL_RANK.get(min_level, 0)
+    logger = (logger or "").strip().lower()
+    lines = []
+    with _lock:
+        for seq in range(_total - 1, max(_total - MAX_LINES, _cleared) - 1, -1):
+            slot = seq % MAX_LINES
+            if _levels[slot] < min_rank:
+                continue
+            name = _loggers[slot] or ""
+            if logger and logger not in name.lower():
+                continue
+            lines.append({
+                "timestamp": _timestamps[slot],
+                "level": LEVELS[_levels[slot]],
+                "logger": name,
+                "data": _data[slot],
+            })
+            if len(lines) >= limit:
+                break
+    lines.reverse()
+    return lines
+
+
+def stats(window: float = 5.0) -> dict:
+    """Buffer occupancy and the arrival rate over the last `window` seconds."""
+    with _lock:
+        kept = _total - _cleared
+        buffered = min(kept, MAX_LINES)
+        cutoff = time.time() - window
+        recent = 0
+        for seq in range(_total - 1, _total - buffered - 1, -1):
+            if _timestamps[seq % MAX_LINES] < cutoff:
+                break
+            recent += 1
+    return {"total": kept, "buffered": buffered, "dropped": kept - buffered, "rate": recent / window}
+
+
+def format_line(line: dict) -> str:
+    data = line["data"]
+    message = data if isinstance(data, str) else json.dumps(data, separators=(",", ":"), default=str)
+    stamp = time.strftime("%H:%M:%S", time.localtime(line["timestamp"])) + f".{int(line['timestamp'] * 1000) % 1000:03d}"
+    logger = f" [{line['logger']}]" if line["logger"] else ""
+    return f"{stamp} {line['level'].upper():<9}{logger} {message}"
+
+
+_LEVEL_COLORS = {"debug": "#888", "info": "#ccc", "notice": "#66ccff", "warning": "#e5c07b"}
+
+
+def render_tail(lines: list[dict]) -> str:
+    """Render lines as a single pre block; only the tail window ever reaches the DOM."""
+    if not lines:
+        return "<p><em>No log messages</em></p>"
+    rows = []
+    for line in lines:
+        color = _LEVEL_COLORS.get(line["level"], "#ff6b6b")
+        rows.append(f'<span style="color: {color};">{html_escape(format_line(line))}</span>')
+    return (
+        '<pre style="background: #000; padding: 8px; border-radius: 4px; max-height: 480px; '
+        'overflow-y: auto; font-size: 0.85em; margin: 0; display: flex; flex-direction: column-reverse;">'
+        '<div>' + "\n".join(rows) + "</div></pre>"
+    )
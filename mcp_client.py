@@ -1,52 +1,177 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
 import json
-from typing import Tuple
-from contextlib import AsyncExitStack
+import os
+import time
+from collections import Counter, defaultdict, deque
+from typing import Any, Tuple
+from contextlib import AsyncExitStack, contextmanager
+from datetime import timedelta
 
 from fastmcp import Client
 from fastmcp.client import SSETransport, StreamableHttpTransport
 from fastmcp.client.messages import MessageHandler
 import mcp.types as types
+from mcp.shared.exceptions import McpError
 import httpx
 
+from blob_store import format_size, put_base64, put_bytes
+import completion
+import formatting
+import inprocess
+import log_stream
+import metrics
+import search_index
+import stdio_servers
+import tracing
+from schema_forms import get_input_validator, get_output_validator, index_tools, validate
+
 JsonStrPair = Tuple[str, str]
 
 # Global client state
 _client_session: Client | None = None
 _client_exit_stack: AsyncExitStack | None = None
-_notifications: list[dict] = []
 _roots: list[str] = []
 _active_headers: dict[str, str] = {}
+# Tools from the last tools/list, indexed by name, used for client-side validation
+_tools: dict[str, dict] = {}
+
+# Notifications are kept in a bounded buffer, oldest first.
+MAX_NOTIFICATIONS = int(os.environ.get("MCP_INSPECTOR_MAX_NOTIFICATIONS", 1000))
+# Progress updates for the same token replace each other instead of piling up.
+COALESCE_PROGRESS = os.environ.get("MCP_INSPECTOR_COALESCE_PROGRESS", "1") != "0"
+# Keep only every Nth notification of a method (counters still see all of them).
+NOTIFICATION_SAMPLE_EVERY = max(int(os.environ.get("MCP_INSPECTOR_NOTIFICATION_SAMPLE_EVERY", 1)), 1)
+# Rates are averaged over this many one-second buckets
+RATE_WINDOW_SECONDS = 10
+
+_notifications: deque[dict] = deque(maxlen=MAX_NOTIFICATIONS)
+_unindexed: deque[dict] = deque(maxlen=MAX_NOTIFICATIONS)
+_progress_entries: dict = {}
+_notification_counts: Counter[str] = Counter()
+# method -> [second, count] buckets covering the rate window
+_notification_buckets: defaultdict[str, deque[list]] = defaultdict(lambda: deque(maxlen=RATE_WINDOW_SECONDS + 1))
+_notification_seq = 0
+_notifications_version = 0
+_connects_ok = 0
+# Restarts the connected stdio server when its process dies
+_supervisor: asyncio.Task | None = None
+_stdio_spec: dict | None = None
+
+_DEDICATED_NOTIFICATIONS = (
+    types.ToolListChangedNotification,
+    types.ResourceListChangedNotification,
+    types.PromptListChangedNotification,
+    types.ProgressNotification,
+    types.LoggingMessageNotification,
+)
+
+
+@contextmanager
+def _instrument(method: str, tool: str = "", request_size: int | None = None):
+    """Metrics and an (optional) trace span around one MCP request."""
+    attributes = {
+        "rpc.system": "jsonrpc",
+        "mcp.method.name": method,
+        "mcp.tool.name": tool or None,
+        "mcp.request.size": request_size,
+    }
+    with metrics.track(method, tool), tracing.span(f"mcp {method}", attributes) as span:
+        yield span
+
+
+def _content_size(items) -> int:
+    """Payload size of tool/resource/prompt content without serializing it."""
+    size = 0
+    for item in items:
+        for attr in ("text", "data", "blob"):
+            value = getattr(item, attr, None)
+            if isinstance(value, str):
+                size += len(value)
+    return size
+
+
+def _dump_params(params) -> dict:
+    if params is None:
+        return {}
+    if isinstance(params, dict):
+        return params
+    return params.model_dump(mode="json", exclude_none=True)
+
+
+def _record_notification(method: str, params=None, progress_token=None):
+    """Count a notification and keep it (raw) unless it is sampled out.
+
+    This runs on the transport's receive path, so nothing is serialized
+    here; params are dumped only when displayed or indexed.
+    """
+    global _notification_seq, _notifications_version
+    now = time.time()
+    _notification_counts[method] += 1
+    buckets = _notification_buckets[method]
+    second = int(now)
+    if buckets and buckets[-1][0] == second:
+        buckets[-1][1] += 1
+    else:
+        buckets.append([second, 1])
 
-class InspectorMessageHandler(MessageHandler):
-    async def _add_notification(self, method: str, params: dict | None = None):
-        _notifications.insert(0, {
-            "method": method,
-            "params": params or {}
-        })
+    if progress_token is not None and COALESCE_PROGRESS:
+        entry = _progress_entries.get(progress_token)
+        if entry is not None and entry["seq"] > _notification_seq - len(_notifications):
+            # Still buffered: keep only the latest update for this token
+            entry["raw"], entry["dumped"], entry["timestamp"] = params, None, now
+            entry["updates"] += 1
+            _notifications_version += 1
+            return
+
+    if NOTIFICATION_SAMPLE_EVERY > 1 and (_notification_counts[method] - 1) % NOTIFICATION_SAMPLE_EVERY:
+        return
+
+    _notification_seq += 1
+    entry = {"seq": _notification_seq, "method": method, "raw": params, "dumped": None, "timestamp": now, "updates": 1}
+    _notifications.append(entry)
+    _unindexed.append(entry)
+    _notifications_version += 1
+    if progress_token is not None and COALESCE_PROGRESS:
+        if len(_progress_entries) > MAX_NOTIFICATIONS:
+            _progress_entries.clear()
+        _progress_entries[progress_token] = entry
 
+
+def _entry_params(entry: dict) -> dict:
+    if entry["dumped"] is None:
+        entry["dumped"] = _dump_params(entry["raw"])
+    return entry["dumped"]
+
+
+class InspectorMessageHandler(MessageHandler):
     async def on_notification(self, notification: types.ServerNotification) -> None:
-        # Generic notification handler
-        params = notification.params.model_dump(mode='json') if notification.params else {}
-        await self._add_notification(notification.method, params)
+        # Generic handler for notifications without a dedicated hook below
+        root = notification.root
+        if isinstance(root, _DEDICATED_NOTIFICATIONS):
+            return
+        _record_notification(root.method, root.params)
 
     async def on_tool_list_changed(self, notification: types.ToolListChangedNotification) -> None:
-        await self._add_notification("notifications/tools/list_changed")
+        _record_notification("notifications/tools/list_changed")
 
     async def on_resource_list_changed(self, notification: types.ResourceListChangedNotification) -> None:
-        await self._add_notification("notifications/resources/list_changed")
+        _record_notification("notifications/resources/list_changed")
 
     async def on_prompt_list_changed(self, notification: types.PromptListChangedNotification) -> None:
-        await self._add_notification("notifications/prompts/list_changed")
-        
+        _record_notification("notifications/prompts/list_changed")
+
     async def on_progress(self, notification: types.ProgressNotification) -> None:
-        params = notification.model_dump(mode='json')
-        await self._add_notification("notifications/progress", params)
-        
-    async def on_logging_message(self, notification: types.LoggingMessageNotification) -> None:
-        params = notification.model_dump(mode='json')
-        await self._add_notification("notifications/message", params)
+        params = notification.params
+        _record_notification("notifications/progress", params, progress_token=params.progressToken)
+
+
+async def log_handler(message: types.LoggingMessageNotificationParams) -> None:
+    # Server logs can arrive thousands a second; they get their own buffer
+    # instead of the notifications list (and fastmcp's default console echo).
+    log_stream.append(message.level, message.logger, message.data)
 
 
 
@@ -59,54 +184,184 @@ def set_roots(roots: list[str]):
     global _roots
     _roots = roots
 
-async def connect(base_url: str, timeout_seconds: float, transport_type: str, sampling_handler=None, auth=None, headers: dict[str, str] | None = None):
-    global _client_session, _client_exit_stack, _active_headers
-    await disconnect()
-    
-    _client_exit_stack = AsyncExitStack()
-    _active_headers = {}
-    if headers:
-        _active_headers = headers.copy()
-    if isinstance(auth, str) and "Authorization" not in _active_headers:
-        _active_headers["Authorization"] = f"Bearer {auth}"
-    
+def build_transport(base_url: str, transport_type: str, headers: dict[str, str] | None = None):
+    if transport_type == inprocess.IN_PROCESS_TRANSPORT:
+        # base_url names the server object; no HTTP involved
+        return inprocess.make_transport(base_url)
+
     transport_kwargs = {}
     if headers:
         transport_kwargs["headers"] = headers
+    if tracing.enabled():
+        transport_kwargs["httpx_client_factory"] = tracing.http_client_factory
     
     if transport_type == "Streamable HTTP":
-        transport = StreamableHttpTransport(base_url, **transport_kwargs)
-    else:
-        # Default to SSE
-        transport = SSETransport(base_url, **transport_kwargs)
-        
-    client = Client(
-        transport=transport, 
-        timeout=timeout_seconds, 
-        sampling_handler=sampling_handler, 
+        return StreamableHttpTransport(base_url, **transport_kwargs)
+    # Default to SSE
+    return SSETransport(base_url, **transport_kwargs)
+
+
+def _new_client(transport, timeout_seconds: float, sampling_handler=None, auth=None) -> Client:
+    return Client(
+        transport=transport,
+        timeout=timeout_seconds,
+        sampling_handler=sampling_handler,
         auth=auth,
         message_handler=InspectorMessageHandler(),
+        log_handler=log_handler,
         roots=roots_handler
     )
+
+
+async def connect(
+    base_url: str,
+    timeout_seconds: float,
+    transport_type: str,
+    sampling_handler=None,
+    auth=None,
+    headers: dict[str, str] | None = None,
+    stdio_spec: dict | None = None,
+    pool_size: int = stdio_servers.POOL_SIZE,
+):
+    global _client_session, _client_exit_stack, _active_headers, _connects_ok, _supervisor, _stdio_spec
+    await disconnect()
+    # Prewarmed processes for other servers would otherwise idle until exit
+    await stdio_servers.drain_pool(keep=stdio_spec)
+    
+    _client_exit_stack = AsyncExitStack()
+    _active_headers = {}
+    if headers:
+        _active_headers = headers.copy()
+    if isinstance(auth, str) and "Authorization" not in _active_headers:
+        _active_headers["Authorization"] = f"Bearer {auth}"
+
     # Enter the async context to establish connection
-    _client_session = await _client_exit_stack.enter_async_context(client)
+    if _connects_ok:
+        metrics.inc("mcp_inspector_reconnects_total", "Connections made after the first successful one.")
+
+    if transport_type == stdio_servers.STDIO_TRANSPORT:
+        def make_client(transport):
+            return _new_client(transport, timeout_seconds, sampling_handler)
+
+        with _instrument("initialize"):
+            client, stack = await stdio_servers.acquire(stdio_spec, make_client, pool_size)
+        _client_exit_stack.push_async_exit(stack)
+        _client_session = client
+        _stdio_spec = stdio_spec
+        _supervisor = asyncio.create_task(_supervise(stdio_spec, make_client, pool_size))
+        _connects_ok += 1
+        return _client_session
+
+    transport = build_transport(base_url, transport_type, headers)
+    client = _new_client(transport, timeout_seconds, sampling_handler, auth)
+    with _instrument("initialize"):
+        _client_session = await _client_exit_stack.enter_async_context(client)
+    _connects_ok += 1
     return _client_session
 
 
-def get_notifications() -> list[dict]:
-    return _notifications
+async def _supervise(spec: dict, make_client, pool_size: int):
+    """Ping the stdio server and start a fresh process when the old one died."""
+    global _client_session, _client_exit_stack
+    while True:
+        await asyncio.sleep(stdio_servers.SUPERVISE_INTERVAL)
+        client = _client_session
+        if client is None:
+            return
+        try:
+            await asyncio.wait_for(client.ping(), stdio_servers.SUPERVISE_INTERVAL * 5)
+            continue
+        except Exception as exc:
+            # A slow or erroring server is still alive; only a closed pipe means a crash
+            if not stdio_servers.connection_lost(exc):
+                continue
+
+        _client_session = None
+        try:
+            await _client_exit_stack.aclose()
+        except Exception:
+            pass
+        _client_exit_stack = AsyncExitStack()
+        while True:
+            if not stdio_servers.record_crash(spec):
+                return
+            await asyncio.sleep(stdio_servers.restart_delay(spec))
+            try:
+                client, stack = await stdio_servers.acquire(spec, make_client, pool_size)
+                break
+            except Exception:
+                continue
+        _client_exit_stack.push_async_exit(stack)
+        _client_session = client
+        _tools.clear()
+
+
+def get_notifications(limit: int | None = None) -> list[dict]:
+    """Buffered notifications, newest first, with params dumped on demand."""
+    entries = list(itertools.islice(reversed(_notifications), limit))
+    notes = []
+    for entry in entries:
+        note = {"method": entry["method"], "params": _entry_params(entry)}
+        if entry["updates"] > 1:
+            note["coalesced"] = entry["updates"]
+        notes.append(note)
+    return notes
+
+
+def notifications_version() -> int:
+    return _notifications_version
+
+
+def notification_stats() -> list[dict]:
+    """Per-method totals and arrival rate over the last RATE_WINDOW_SECONDS."""
+    cutoff = int(time.time()) - RATE_WINDOW_SECONDS
+    stats = []
+    for method, count in _notification_counts.most_common():
+        recent = sum(n for second, n in _notification_buckets[method] if second > cutoff)
+        stats.append({"method": method, "count": count, "rate": recent / RATE_WINDOW_SECONDS})
+    return stats
+
+
+def index_pending_notifications():
+    """Add notifications received since the last call to the search index."""
+    while _unindexed:
+        entry = _unindexed.popleft()
+        search_index.add_document(
+            "notification", entry["method"], json.dumps(_entry_params(entry)),
+            method=entry["method"], timestamp=entry["timestamp"],
+        )
+
 
 def clear_notifications():
-    global _notifications
-    _notifications = []
+    global _notifications_version
+    _notifications.clear()
+    _unindexed.clear()
+    _progress_entries.clear()
+    _notification_counts.clear()
+    _notification_buckets.clear()
+    _notifications_version += 1
+
 
 async def disconnect():
-    global _client_session, _client_exit_stack, _active_headers
+    global _client_session, _client_exit_stack, _active_headers, _supervisor, _stdio_spec
+    if _supervisor is not None:
+        _supervisor.cancel()
+        _supervisor = None
+    if _stdio_spec is not None:
+        stdio_servers.mark_stopped(_stdio_spec)
+        _stdio_spec = None
     if _client_exit_stack:
         await _client_exit_stack.aclose()
     _client_session = None
     _client_exit_stack = None
     _active_headers = {}
+    _tools.clear()
+    completion.clear_cache()
+
+
+def active_stdio_spec() -> dict | None:
+    """The stdio server the session was started from, if any."""
+    return _stdio_spec
 
 
 def _get_client() -> Client:
@@ -115,15 +370,61 @@ def _get_client() -> Client:
     return _client_session
 
 
+def get_client() -> Client:
+    """The connected client, for modules that send their own requests over the live session."""
+    return _get_client()
+
+
+async def set_logging_level(level: str) -> str:
+    client = _get_client()
+    with _instrument("logging/setLevel"):
+        await client.set_logging_level(level)
+    return level
+
+
+def supports_completions() -> bool:
+    if _client_session is None or _client_session.initialize_result is None:
+        return False
+    return _client_session.initialize_result.capabilities.completions is not None
+
+
+async def complete_argument(
+    ref_type: str, ref_name: str, argument: str, value: str, context: dict | None = None
+) -> tuple[list[str], bool]:
+    """completion/complete for one prompt or resource template argument.
+
+    Returns the suggested values and whether they are the full match set,
+    which lets the cache narrow longer prefixes without asking again.
+    """
+    client = _get_client()
+    if ref_type == "prompt":
+        ref = types.PromptReference(type="ref/prompt", name=ref_name)
+    else:
+        ref = types.ResourceTemplateReference(type="ref/resource", uri=ref_name)
+    with _instrument("completion/complete") as span:
+        result = await client.complete(
+            ref, {"name": argument, "value": value}, context_arguments=context or None
+        )
+        span.set_attribute("mcp.response.items", len(result.values))
+    values = list(result.values)
+    # Servers cap a response at 100 values; a full page may be truncated
+    return values, not result.hasMore and len(values) < 100
+
+
 async def list_resources(base_url: str, timeout_seconds: float, sampling_handler=None) -> tuple[str, str, list[str]]:
     try:
         client = _get_client()
-        result = await client.session.list_resources()
+        with _instrument("resources/list") as span:
+            result = await client.session.list_resources()
+            span.set_attribute("mcp.response.items", len(result.resources))
         resources = result.resources
         # Convert Pydantic models to list of dicts then to formatted JSON
         resources_data = [r.model_dump(mode='json') for r in resources]
+        search_index.replace_catalog("resource", [
+            (r.get("name") or r["uri"], f"{r['uri']} {r.get('description') or ''}") for r in resources_data
+        ])
         request_json = json.dumps({"method": "resources/list", "params": {}}, indent=2)
-        response_json = json.dumps(resources_data, indent=2)
+        response_json = await formatting.dumps_async(resources_data)
         return request_json, response_json, resources_data
     except Exception as e:
         return "Error", str(e), []
@@ -132,26 +433,40 @@ async def list_resources(base_url: str, timeout_seconds: float, sampling_handler
 async def list_resource_templates(base_url: str, timeout_seconds: float, sampling_handler=None) -> tuple[str, str, list[str]]:
     try:
         client = _get_client()
-        result = await client.session.list_resource_templates()
+        with _instrument("resources/templates/list") as span:
+            result = await client.session.list_resource_templates()
+            span.set_attribute("mcp.response.items", len(result.resourceTemplates))
         templates = result.resourceTemplates
         templates_data = [t.model_dump(mode='json') for t in templates]
+        search_index.replace_catalog("template", [
+            (t.get("name") or t["uriTemplate"], f"{t['uriTemplate']} {t.get('description') or ''}") for t in templates_data
+        ])
         request_json = json.dumps({"method": "resources/templates/list", "params": {}}, indent=2)
-        response_json = json.dumps(templates_data, indent=2)
+        response_json = await formatting.dumps_async(templates_data)
         return request_json, response_json, templates_data
     except Exception as e:
         return "Error", str(e), []
 
 
+async def read_resource_contents(uri: str) -> list:
+    """Read one resource over the live session and return its raw contents."""
+    client = _get_client()
+    with _instrument("resources/read", request_size=len(uri)) as span:
+        span.set_attribute("mcp.resource.uri", uri)
+        result = await client.session.read_resource(uri=uri)
+        span.set_attribute("mcp.response.size", _content_size(result.contents))
+    return result.contents
+
+
 async def read_resource(base_url: str, timeout_seconds: float, resource_uri: str, sampling_handler=None) -> JsonStrPair:
     if not resource_uri:
         return "", "Select a resource first."
     try:
-        client = _get_client()
-        result = await client.session.read_resource(uri=resource_uri)
+        contents = await read_resource_contents(resource_uri)
         # The result has a contents field which is a list
-        contents_data = [c.model_dump(mode='json') for c in result.contents]
+        contents_data = await formatting.offload(_dump_resource_contents, contents, size=_content_size(contents))
         request_json = json.dumps({"method": "resources/list", "params": {"uri": resource_uri}}, indent=2)
-        response_json = json.dumps({"contents": contents_data}, indent=2)
+        response_json = await formatting.dumps_async({"contents": contents_data})
         return request_json, response_json
     except Exception as e:
         return "Error", str(e)
@@ -160,9 +475,12 @@ async def read_resource(base_url: str, timeout_seconds: float, resource_uri: str
 async def list_prompts(base_url: str, timeout_seconds: float, sampling_handler=None) -> tuple[str, str, list[str]]:
     try:
         client = _get_client()
-        prompts = await client.list_prompts()
+        with _instrument("prompts/list") as span:
+            prompts = await client.list_prompts()
+            span.set_attribute("mcp.response.items", len(prompts))
         prompts_data = [p.model_dump() for p in prompts]
-        return "list_prompts()", json.dumps(prompts_data, indent=2), prompts_data
+        search_index.replace_catalog("prompt", [(p["name"], p.get("description") or "") for p in prompts_data])
+        return "list_prompts()", await formatting.dumps_async(prompts_data), prompts_data
     except Exception as e:
         return "Error", str(e), []
 
@@ -180,16 +498,19 @@ async def invoke_prompt(
     try:
         client = _get_client()
         # Use manual request to ensure empty arguments dict is sent (workaround for potential fastmcp/mcp issue)
-        result = await client.session.send_request(
-            types.GetPromptRequest(
-                method="prompts/get",
-                params=types.GetPromptRequestParams(
-                    name=prompt_name,
-                    arguments=args
-                )
-            ),
-            types.GetPromptResult
-        )
+        with _instrument("prompts/get", request_size=len(arguments_text)) as span:
+            span.set_attribute("mcp.prompt.name", prompt_name)
+            result = await client.session.send_request(
+                types.GetPromptRequest(
+                    method="prompts/get",
+                    params=types.GetPromptRequestParams(
+                        name=prompt_name,
+                        arguments=args
+                    )
+                ),
+                types.GetPromptResult
+            )
+            span.set_attribute("mcp.response.size", _content_size(m.content for m in result.messages))
         # Extract text from messages
         messages_text = []
         if hasattr(result, "messages"):
@@ -210,14 +531,34 @@ async def invoke_prompt(
 async def list_tools(base_url: str, timeout_seconds: float, sampling_handler=None) -> tuple[str, str, list[dict]]:
     try:
         client = _get_client()
-        tools = await client.list_tools()
+        with _instrument("tools/list") as span:
+            tools = await client.list_tools()
+            span.set_attribute("mcp.response.items", len(tools))
         # Return list of tool dictionaries (including schema)
         tools_data = [t.model_dump() for t in tools]
-        return "list_tools()", json.dumps(tools_data, indent=2), tools_data
+        response_json = await formatting.dumps_async(tools_data)
+        _tools.clear()
+        _tools.update(index_tools(tools_data))
+        search_index.replace_catalog("tool", [(t["name"], t.get("description") or "") for t in tools_data])
+        return "list_tools()", response_json, tools_data
     except Exception as e:
         return "Error", str(e), []
 
 
+async def _ignore_progress(progress: float, total: float | None, message: str | None):
+    # Registering a callback is what asks the server for progress; the
+    # notifications themselves reach the message handler
+    pass
+
+
+async def _call_tool_unchecked(client: Client, tool_name: str, args: dict) -> types.CallToolResult:
+    """tools/call without the SDK's outputSchema check, which raises before the result can be shown."""
+    request = types.ClientRequest(
+        types.CallToolRequest(params=types.CallToolRequestParams(name=tool_name, arguments=args))
+    )
+    return await client.session.send_request(request, types.CallToolResult, progress_callback=_ignore_progress)
+
+
 async def invoke_tool(
     base_url: str, timeout_seconds: float, tool_name: str, arguments_text: str, sampling_handler=None
 ) -> JsonStrPair:
@@ -228,57 +569,335 @@ async def invoke_tool(
     except ValueError as exc:
         return "", f"Invalid JSON arguments: {exc}"
 
+    timings = {}
+    started = time.perf_counter()
+    tool = _tools.get(tool_name)
+    schema_warning = ""
+    if tool:
+        try:
+            errors = validate(get_input_validator(tool), args)
+        except Exception as exc:
+            # A broken inputSchema (bad $ref, invalid keyword) shouldn't block the call; the server decides
+            errors = []
+            schema_warning = f"⚠️ **Input not validated locally, the inputSchema is unusable:** `{exc}`\n\n"
+        timings["validate input"] = time.perf_counter() - started
+        if errors:
+            # Short-circuit locally; the server would reject these anyway.
+            message = "❌ **Input rejected locally (inputSchema):**\n\n" + "\n".join(f"- `{e}`" for e in errors)
+            return f"call_tool({tool_name})", message + "\n\n" + _format_timings(timings)
+
     try:
         client = _get_client()
-        result = await client.call_tool(tool_name, arguments=args)
+        call_started = time.perf_counter()
+        with _instrument("tools/call", tool_name, request_size=len(arguments_text)) as span:
+            result = await _call_tool_unchecked(client, tool_name, args)
+            span.set_attribute("mcp.response.size", _content_size(result.content))
+        timings["call"] = time.perf_counter() - call_started
+        if result.isError:
+            return "Error", " ".join(getattr(item, "text", "") for item in result.content) or "Tool returned an error."
         
-        # Extract content from the result
+        # Extract content from the result; binary items are stored once and linked
         content = []
         if hasattr(result, "content"):
             for item in result.content:
-                if hasattr(item, "text"):
-                    content.append(item.text)
-                elif isinstance(item, dict) and "text" in item:
-                    content.append(item["text"])
-                else:
-                    content.append(str(item))
+                content.append(render_content_item(item))
         
-        final_result = "\n".join(content) if content else "No content returned."
-        return f"call_tool({tool_name})", final_result
+        final_result = schema_warning + ("\n".join(content) if content else "No content returned.")
+
+        structured = result.structuredContent
+        if structured is not None:
+            display = await formatting.offload(_structured_json, structured, size=formatting.approx_size(structured))
+            final_result += f"\n\n**Structured content:**\n```json\n{display}\n```"
+
+        output_validator = get_output_validator(tool) if tool else None
+        if output_validator is not None:
+            check_started = time.perf_counter()
+            unusable = None
+            if structured is None:
+                errors = ["(root): tool declares an outputSchema but returned no structuredContent"]
+            else:
+                try:
+                    errors = validate(output_validator, structured)
+                except Exception as exc:
+                    errors, unusable = [], exc
+            timings["validate output"] = time.perf_counter() - check_started
+            if unusable is not None:
+                final_result += f"\n\n⚠️ **Output not validated, the outputSchema is unusable:** `{unusable}`"
+            elif errors:
+                final_result += "\n\n❌ **Output schema: fail**\n\n" + "\n".join(f"- `{e}`" for e in errors)
+            else:
+                final_result += "\n\n✅ **Output schema: pass**"
+
+        return f"call_tool({tool_name})", final_result + "\n\n" + _format_timings(timings)
     except Exception as e:
         return "Error", str(e)
 
 
+# Embedded text resources up to this size are shown inline, larger ones are linked.
+INLINE_TEXT_LIMIT = 2048
+
+
+def render_content_item(item) -> str:
+    """Render one tool content item as Markdown without inlining binary data."""
+    item_type = getattr(item, "type", None)
+    if item_type == "text" or (item_type is None and hasattr(item, "text")):
+        return item.text
+    if isinstance(item, dict) and "text" in item:
+        return item["text"]
+
+    if item_type == "image":
+        ref = put_base64(item.data, item.mimeType)
+        return f"![image ({ref['mime_type']}, {format_size(ref['size'])})]({ref['url']})"
+    if item_type == "audio":
+        ref = put_base64(item.data, item.mimeType)
+        return f"🔊 [audio ({ref['mime_type']}, {format_size(ref['size'])})]({ref['url']})"
+    if item_type == "resource_link":
+        label = getattr(item, "name", None) or str(item.uri)
+        return f"🔗 [{label}]({item.uri})"
+    if item_type == "resource":
+        resource = item.resource
+        uri = str(resource.uri)
+        if getattr(resource, "blob", None) is not None:
+            ref = put_base64(resource.blob, resource.mimeType)
+            return f"📎 [{uri}]({ref['url']}) ({ref['mime_type']}, {format_size(ref['size'])})"
+        text = getattr(resource, "text", "") or ""
+        if len(text) <= INLINE_TEXT_LIMIT:
+            return f"📄 `{uri}`\n```\n{text}\n```"
+        ref = put_bytes(text.encode("utf-8"), resource.mimeType or "text/plain")
+        return f"📄 [{uri}]({ref['url']}) ({format_size(ref['size'])})"
+    return str(item)
+
+
+def _elide_large_strings(value, limit: int = INLINE_TEXT_LIMIT):
+    """Copy of a JSON value with very long strings (e.g. base64 payloads) shortened for display."""
+    if isinstance(value, str) and len(value) > limit:
+        return f"{value[:64]}… ({len(value)} chars elided)"
+    if isinstance(value, dict):
+        return {k: _elide_large_strings(v, limit) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_elide_large_strings(v, limit) for v in value]
+    return value
+
+
+def _structured_json(structured) -> str:
+    return formatting.dumps(_elide_large_strings(structured))
+
+
+def _dump_resource_contents(contents) -> list[dict]:
+    """Dump resource contents, replacing base64 blobs with stored file references."""
+    contents_data = []
+    for c in contents:
+        if getattr(c, "blob", None) is not None:
+            data = c.model_dump(mode="json", exclude={"blob"})
+            data["blobRef"] = put_base64(c.blob, c.mimeType)
+        else:
+            data = c.model_dump(mode="json")
+        contents_data.append(data)
+    return contents_data
+
+
+def _format_timings(timings: dict[str, float]) -> str:
+    parts = [f"{name} {seconds * 1000:.2f} ms" for name, seconds in timings.items()]
+    parts.append(f"total {sum(timings.values()) * 1000:.2f} ms")
+    return "⏱️ " + " · ".join(parts)
+
+
 async def ping_server(base_url: str, timeout_seconds: float, sampling_handler=None) -> JsonStrPair:
     try:
         client = _get_client()
-        await client.ping()
+        with _instrument("ping"):
+            await client.ping()
         return "ping()", json.dumps({"status": "Pong"}, indent=2)
     except Exception as e:
         return "Error", str(e)
 
 
+# Raw JSON-RPC posts reuse one pooled connection instead of a client per call.
+_http_client: httpx.AsyncClient | None = None
+_request_ids = itertools.count(1)
+
+CUSTOM_REQUEST_MODES = ("batch", "pipelined")
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = tracing.instrument_http_client(
+            httpx.AsyncClient(limits=httpx.Limits(max_connections=32, max_keepalive_connections=32))
+        )
+    return _http_client
+
+
+def _parse_requests(method: str, params: Any) -> list[tuple[str, Any]]:
+    """Split the custom request input into (method, params) pairs.
+
+    A list is treated as many requests: entries with a "method" key are full
+    requests, anything else is the params object for ``method``.
+    """
+    entries = params if isinstance(params, list) else [params]
+    if not entries:
+        raise ValueError("the array has no requests to send")
+    requests = []
+    for entry in entries:
+        if isinstance(entry, dict) and "method" in entry:
+            entry_method, entry_params = entry["method"], entry.get("params", {})
+        else:
+            entry_method, entry_params = method, entry
+        if not entry_method:
+            raise ValueError("Every request needs a method.")
+        requests.append((entry_method, entry_params))
+    return requests
+
+
+def _build_payloads(method: str, params: Any) -> list[dict]:
+    """JSON-RPC request bodies with unique ids for a raw HTTP post."""
+    return [
+        {"jsonrpc": "2.0", "id": next(_request_ids), "method": m, "params": p}
+        for m, p in _parse_requests(method, params)
+    ]
+
+
+def _parse_rpc_response(response: httpx.Response) -> Any:
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        # Streamable HTTP may answer with SSE; the JSON-RPC messages are in data lines
+        messages = [json.loads(line[5:]) for line in response.text.splitlines() if line.startswith("data:") and line[5:].strip()]
+        return messages[0] if len(messages) == 1 else messages
+    return response.json()
+
+
+async def _post_rpc(base_url: str, body: Any, timeout_seconds: float) -> Any:
+    headers = {"Accept": "application/json, text/event-stream", **_active_headers}
+    with _instrument(body["method"] if isinstance(body, dict) else "batch"):
+        response = await _get_http_client().post(base_url, json=body, headers=headers, timeout=timeout_seconds)
+    try:
+        return _parse_rpc_response(response)
+    except ValueError:
+        # Not JSON-RPC; surface the HTTP status instead
+        response.raise_for_status()
+        raise
+
+
 async def send_custom_request(
-    base_url: str, method: str, params_text: str, timeout_seconds: float
+    base_url: str, method: str, params_text: str, timeout_seconds: float, mode: str = "batch"
 ) -> JsonStrPair:
     # Fallback to manual httpx for custom requests since FastMCP Client is high-level
     try:
         params = json.loads(params_text) if params_text.strip() else {}
+        payloads = _build_payloads(method, params)
     except ValueError as exc:
         return "", f"Invalid JSON params: {exc}"
-    
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": method,
-        "params": params,
+
+    if not isinstance(params, list):
+        payload = payloads[0]
+        try:
+            return json.dumps(payload, indent=2), await formatting.dumps_async(await _post_rpc(base_url, payload, timeout_seconds))
+        except Exception as exc:
+            return json.dumps(payload, indent=2), f"Error: {exc}"
+
+    request_json = json.dumps(payloads, indent=2)
+    started = time.perf_counter()
+    if mode == "pipelined":
+        async def _timed(payload: dict) -> dict:
+            entry_started = time.perf_counter()
+            try:
+                response = await _post_rpc(base_url, payload, timeout_seconds)
+            except Exception as exc:
+                response = {"error": f"{type(exc).__name__}: {exc}"}
+            return {"elapsed_ms": round((time.perf_counter() - entry_started) * 1000, 2), "response": response}
+
+        timed = await asyncio.gather(*(_timed(p) for p in payloads))
+        results = [{"id": p["id"], "method": p["method"], **t} for p, t in zip(payloads, timed)]
+    else:
+        try:
+            responses = await _post_rpc(base_url, payloads, timeout_seconds)
+        except Exception as exc:
+            return request_json, f"Error: {exc}"
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        if isinstance(responses, list):
+            by_id = {r.get("id"): r for r in responses if isinstance(r, dict)}
+            missing = {"error": "no response for this id"}
+        else:
+            # Servers without batch support answer with a single error for the whole batch
+            by_id, missing = {}, responses
+        results = [
+            {"id": p["id"], "method": p["method"], "elapsed_ms": elapsed_ms, "response": by_id.get(p["id"], missing)}
+            for p in payloads
+        ]
+
+    total_ms = (time.perf_counter() - started) * 1000
+    summary = {
+        "mode": mode,
+        "requests": len(payloads),
+        "errors": sum(1 for r in results if isinstance(r["response"], dict) and "error" in r["response"]),
+        "total_ms": round(total_ms, 2),
+        "requests_per_second": round(len(payloads) / (total_ms / 1000), 1) if total_ms else None,
+        "results": results,
     }
-    
+    return request_json, await formatting.dumps_async(summary)
+
+
+async def send_session_request(method: str, params_text: str, timeout_seconds: float) -> tuple[str, str, float]:
+    """Send arbitrary JSON-RPC methods through the live session.
+
+    Unlike send_custom_request this reuses the connected transport, so it
+    works over SSE, carries the session id and auth, and needs no new
+    connection. Arrays are pipelined over the session concurrently.
+    Returns (request_json, response_json, total_ms).
+    """
     try:
-        headers = _active_headers.copy() if _active_headers else None
-        async with httpx.AsyncClient(timeout=timeout_seconds, headers=headers) as client:
-            response = await client.post(base_url, json=payload)
-            response.raise_for_status()
-            return json.dumps(payload, indent=2), json.dumps(response.json(), indent=2)
-    except Exception as exc:
-        return json.dumps(payload, indent=2), f"Error: {exc}"
+        params = json.loads(params_text) if params_text.strip() else {}
+        requests = _parse_requests(method, params)
+    except ValueError as exc:
+        return "", f"Invalid JSON params: {exc}", 0.0
+    for request_method, request_params in requests:
+        if request_params is not None and not isinstance(request_params, dict):
+            # The session only sends object params; Direct HTTP can send anything
+            return "", f"Invalid params for {request_method}: expected a JSON object, got {json.dumps(request_params)}", 0.0
+    client = _get_client()
+    timeout = timedelta(seconds=timeout_seconds)
+
+    async def _send(request_method: str, request_params: Any) -> dict:
+        started = time.perf_counter()
+        try:
+            request = types.Request[dict[str, Any] | None, str](method=request_method, params=request_params or None)
+            with _instrument(request_method):
+                result = await client.session.send_request(request, types.Result, request_read_timeout_seconds=timeout)
+            response = result.model_dump(by_alias=True, mode="json", exclude_none=True)
+        except McpError as exc:
+            response = {"error": exc.error.model_dump(mode="json", exclude_none=True)}
+        except Exception as exc:
+            response = {"error": f"{type(exc).__name__}: {exc}"}
+        return {"method": request_method, "elapsed_ms": round((time.perf_counter() - started) * 1000, 2), "response": response}
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(_send(m, p) for m, p in requests))
+    total_ms = (time.perf_counter() - started) * 1000
+
+    if not isinstance(params, list):
+        request_json = json.dumps({"method": requests[0][0], "params": requests[0][1]}, indent=2)
+        return request_json, await formatting.dumps_async(results[0]["response"]), total_ms
+
+    request_json = json.dumps([{"method": m, "params": p} for m, p in requests], indent=2)
+    summary = {
+        "mode": "session",
+        "requests": len(results),
+        "errors": sum(1 for r in results if isinstance(r["response"], dict) and "error" in r["response"]),
+        "total_ms": round(total_ms, 2),
+        "requests_per_second": round(len(results) / (total_ms / 1000), 1) if total_ms else None,
+        "results": results,
+    }
+    return request_json, await formatting.dumps_async(summary), total_ms
+
+
+def _collect_metrics():
+    yield ("mcp_inspector_connected", "gauge", "1 while the inspector holds a live session.",
+           [({}, 1.0 if _client_session is not None else 0.0)])
+    counts = list(_notification_counts.items())
+    yield ("mcp_inspector_notifications_total", "counter", "Server notifications received, by method.",
+           [({"method": m}, c) for m, c in counts])
+    yield ("mcp_inspector_notification_rate", "gauge", f"Notifications per second over the last {RATE_WINDOW_SECONDS}s.",
+           [({"method": s["method"]}, s["rate"]) for s in notification_stats()])
+    yield ("mcp_inspector_log_messages_total", "counter", "Server log messages received.", [({}, log_stream.received())])
+
+
+metrics.register_collector(_collect_metrics)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import math
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# A sample is (labels, value); a collector returns (name, type, help, samples) families
+Sample = tuple[dict[str, str], float]
+Family = tuple[str, str, str, list[Sample]]
+
+_lock = threading.Lock()
+_counters: dict[str, dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+# name -> labels -> [count per bucket..., +Inf count, sum]
+_histograms: dict[str, dict[tuple, list[float]]] = defaultdict(dict)
+_help: dict[str, tuple[str, str]] = {}
+_collectors: list[Callable[[], Iterable[Family]]] = []
+
+
+def _describe(name: str, kind: str, help_text: str):
+    if name not in _help:
+        _help[name] = (kind, help_text)
+
+
+def inc(name: str, help_text: str, labels: dict[str, str] | None = None, value: float = 1.0):
+    _describe(name, "counter", help_text)
+    with _lock:
+        _counters[name][tuple(sorted((labels or {}).items()))] += value
+
+
+def observe(name: str, help_text: str, seconds: float, labels: dict[str, str] | None = None):
+    _describe(name, "histogram", help_text)
+    key = tuple(sorted((labels or {}).items()))
+    with _lock:
+        counts = _histograms[name].get(key)
+        if counts is None:
+            counts = _histograms[name][key] = [0.0] * (len(LATENCY_BUCKETS) + 2)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                counts[i] += 1
+        counts[-2] += 1
+        counts[-1] += seconds
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile (0 < q <= 1) of already sorted values; None when empty."""
+    if not values:
+        return None
+    return values[max(math.ceil(q * len(values)) - 1, 0)]
+
+
+@contextmanager
+def track(method: str, tool: str = ""):
+    """Count and time one MCP request; an exception marks it as an error."""
+    labels = {"method": method, "tool": tool}
+    started = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        observe("mcp_inspector_request_duration_seconds", "MCP request latency as seen by the inspector.",
+                time.perf_counter() - started, labels)
+        inc("mcp_inspector_requests_total", "MCP requests sent by the inspector.", labels | {"status": status})
+
+
+def register_collector(collector: Callable[[], Iterable[Family]]):
+    """Add a callback evaluated on every scrape, for gauges owned by other modules."""
+    _collectors.append(collector)
+
+
+def _process_families() -> list[Family]:
+    families = []
+    try:
+        import resource  # Unix only
+    except ImportError:
+        pass
+    else:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        peak_bytes = peak if sys.platform == "darwin" else peak * 1024
+        families.append(("process_peak_resident_memory_bytes", "gauge", "Peak resident memory.", [({}, peak_bytes)]))
+    try:
+        with open("/proc/self/statm") as f:
+            rss_pages = int(f.read().split()[1])
+        families.append(("process_resident_memory_bytes", "gauge", "Resident memory.",
+                         [({}, rss_pages * os.sysconf("SC_PAGE_SIZE"))]))
+    except (OSError, ValueError):
+        pass
+    return families
+
+
+def _format_labels(labels: dict[str, str] | tuple) -> str:
+    items = labels.items() if isinstance(labels, dict) else labels
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render() -> str:
+    """Every metric in the Prometheus text format."""
+    lines = []
+    with _lock:
+        counters = {name: dict(series) for name, series in _counters.items()}
+        histograms = {name: {k: list(v) for k, v in series.items()} for name, series in _histograms.items()}
+
+    for name, series in counters.items():
+        kind, help_text = _help[name]
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f"{name}{_format_labels(labels)} {_format_value(v)}" for labels, v in series.items()]
+
+    for name, series in histograms.items():
+        kind, help_text = _help[name]
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for labels, counts in series.items():
+            for bound, count in zip(LATENCY_BUCKETS, counts):
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', str(bound)),))} {_format_value(count)}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {_format_value(counts[-2])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {_format_value(counts[-2])}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(counts[-1])}")
+
+    for collector in [_process_families] + _collectors:
+        try:
+            families = list(collector())
+        except Exception:
+            continue
+        for name, kind, help_text, samples in families:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [f"{name}{_format_labels(labels)} {_format_value(v)}" for labels, v in samples]
+
+    return "\n".join(lines) + "\n"
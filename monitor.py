@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+import time
+from collections import deque
+
+from fastmcp import Client
+
+import metrics
+from fleet import get_member_client
+from mcp_client import get_client
+
+JOB_KINDS = ("Ping", "List Tools", "Call Tool")
+CONNECTED_TARGET = "Connected server"
+MIN_INTERVAL_SECONDS = 1.0
+# Samples kept per job and server; the oldest are dropped first
+SERIES_SIZE = int(os.environ.get("MCP_INSPECTOR_MONITOR_SAMPLES", 1000))
+# Alert thresholds are checked against this many of the most recent samples
+ALERT_WINDOW = 20
+
+_jobs: dict[str, dict] = {}
+_job_ids = itertools.count(1)
+_alerts: deque[dict] = deque(maxlen=200)
+_version = 0
+
+
+def _changed():
+    global _version
+    _version += 1
+
+
+def version() -> int:
+    return _version
+
+
+def _client_for(target: str) -> Client:
+    # Probes reuse the sessions the inspector already holds instead of opening their own
+    if target == CONNECTED_TARGET:
+        return get_client()
+    return get_member_client(target)
+
+
+async def _ping(client: Client, job: dict):
+    await client.ping()
+
+
+async def _list_tools(client: Client, job: dict):
+    await client.list_tools()
+
+
+async def _call_tool(client: Client, job: dict):
+    result = await client.call_tool(job["tool"], arguments=job["arguments"], raise_on_error=False)
+    if result.is_error:
+        text = " ".join(getattr(item, "text", "") for item in result.content)
+        raise RuntimeError(f"tool error: {text[:200]}")
+
+
+_PROBES = {"Ping": _ping, "List Tools": _list_tools, "Call Tool": _call_tool}
+
+
+def add_job(
+    kind: str,
+    targets: list[str],
+    interval_seconds: float,
+    timeout_seconds: float,
+    tool: str = "",
+    arguments: dict | None = None,
+    max_p95_ms: float | None = None,
+    max_error_rate: float | None = None,
+) -> dict:
+    """Schedule `kind` against every target every `interval_seconds`; needs a running event loop.
+
+    `max_p95_ms` and `max_error_rate` (0-1) are alert thresholds over the
+    last ALERT_WINDOW samples of each target.
+    """
+    if kind not in _PROBES:
+        raise ValueError(f"Unknown job kind {kind!r}")
+    if not targets:
+        raise ValueError("Pick at least one server.")
+    if kind == "Call Tool" and not tool:
+        raise ValueError("Enter a tool name.")
+    if interval_seconds < MIN_INTERVAL_SECONDS:
+        raise ValueError(f"The interval must be at least {MIN_INTERVAL_SECONDS:g}s.")
+
+    job_id = f"job-{next(_job_ids)}"
+    job = {
+        "id": job_id,
+        "kind": kind,
+        "label": f"{kind} {tool}".strip(),
+        "targets": list(targets),
+        "interval": float(interval_seconds),
+        "timeout": min(float(timeout_seconds), float(interval_seconds)),
+        "tool": tool,
+        "arguments": arguments or {},
+        "max_p95_ms": max_p95_ms,
+        "max_error_rate": max_error_rate,
+        "series": {target: deque(maxlen=SERIES_SIZE) for target in targets},
+        "alerting": {target: False for target in targets},
+    }
+    job["task"] = asyncio.create_task(_run(job))
+    _jobs[job_id] = job
+    _changed()
+    return job
+
+
+def remove_job(job_id: str) -> bool:
+    job = _jobs.pop(job_id, None)
+    if job is None:
+        return False
+    job["task"].cancel()
+    _changed()
+    return True
+
+
+def jobs() -> list[dict]:
+    return list(_jobs.values())
+
+
+async def _run(job: dict):
+    next_run = time.monotonic()
+    while True:
+        await asyncio.gather(*(_probe(job, target) for target in job["targets"]))
+        # A round that overran the interval starts the next one right away
+        # instead of bursting through the missed slots
+        now = time.monotonic()
+        next_run = max(next_run + job["interval"], now)
+        await asyncio.sleep(next_run - now)
+
+
+async def _probe(job: dict, target: str):
+    started = time.perf_counter()
+    error = None
+    try:
+        await asyncio.wait_for(_PROBES[job["kind"]](_client_for(target), job), job["timeout"])
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    latency = time.perf_counter() - started
+    job["series"][target].append((time.time(), latency, error))
+    if error is None:
+        metrics.observe(
+            "mcp_inspector_monitor_latency_seconds",
+            "Latency of scheduled monitoring probes.",
+            latency,
+            {"job": job["id"], "server": target},
+        )
+    else:
+        metrics.inc(
+            "mcp_inspector_monitor_failures_total",
+            "Scheduled monitoring probes that failed or timed out.",
+            {"job": job["id"], "server": target},
+        )
+    _check_alert(job, target)
+    _changed()
+
+
+def _summarize(samples) -> dict:
+    latencies = sorted(latency for _, latency, error in samples if error is None)
+    errors = sum(1 for *_, error in samples if error is not None)
+    stats = {"runs": len(samples), "errors": errors, "error_rate": errors / len(samples) if samples else 0.0}
+    for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        value = metrics.percentile(latencies, q)
+        stats[name] = value * 1000 if value is not None else None
+    return stats
+
+
+def _check_alert(job: dict, target: str):
+    recent = list(job["series"][target])[-ALERT_WINDOW:]
+    stats = _summarize(recent)
+    reasons = []
+    if job["max_p95_ms"] is not None and stats["p95"] is not None and stats["p95"] > job["max_p95_ms"]:
+        reasons.append(f"p95 {stats['p95']:.0f} ms > {job['max_p95_ms']:g} ms")
+    if job["max_error_rate"] is not None and stats["error_rate"] > job["max_error_rate"]:
+        reasons.append(f"errors {stats['error_rate']:.0%} > {job['max_error_rate']:.0%}")
+
+    firing = bool(reasons)
+    if firing == job["alerting"][target]:
+        return
+    job["alerting"][target] = firing
+    if firing:
+        metrics.inc("mcp_inspector_monitor_alerts_total", "Monitoring alerts raised.", {"job": job["id"]})
+    _alerts.appendleft({
+        "time": time.time(),
+        "job": job["id"],
+        "label": job["label"],
+        "server": target,
+        "firing": firing,
+        "message": "; ".join(reasons) or "recovered",
+    })
+
+
+def job_stats() -> list[dict]:
+    """One row per job and server, over every kept sample."""
+    rows = []
+    for job in _jobs.values():
+        for target, samples in job["series"].items():
+            last = samples[-1] if samples else None
+            rows.append({
+                "job": job["id"],
+                "label": job["label"],
+                "server": target,
+                "interval": job["interval"],
+                "last_time": last[0] if last else None,
+                "last_error": last[2] if last else None,
+                "alerting": job["alerting"][target],
+                **_summarize(samples),
+            })
+    return rows
+
+
+def series(job_id: str) -> list[tuple[str, float, float, str | None]]:
+    """(server, time, latency seconds, error) for every kept sample of a job."""
+    job = _jobs.get(job_id)
+    if job is None:
+        return []
+    return [(target, t, latency, error) for target, samples in job["series"].items() for t, latency, error in samples]
+
+
+def recent_alerts(limit: int = 20) -> list[dict]:
+    return list(itertools.islice(_alerts, limit))
+
+
+def _collect_metrics():
+    yield ("mcp_inspector_monitor_alerting", "gauge", "1 while a monitoring job is over an alert threshold.",
+           [({"job": job["id"], "server": target}, 1.0 if firing else 0.0)
+            for job in _jobs.values() for target, firing in job["alerting"].items()])
+
+
+metrics.register_collector(_collect_metrics)
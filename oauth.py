@@ -0,0 +1,550 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import secrets
+import time
+import uuid
+from typing import Any
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import anyio
+import httpx
+from cryptography.fernet import Fernet, InvalidToken
+from fastmcp.client.auth import OAuth
+from fastmcp.client.oauth_callback import OAuthCallbackResult, create_oauth_callback_server
+from fastmcp.utilities.http import find_available_port
+from key_value.aio.stores.null import NullStore
+from mcp.client.auth import PKCEParameters
+from mcp.client.auth.utils import (
+    build_oauth_authorization_server_metadata_discovery_urls,
+    build_protected_resource_metadata_discovery_urls,
+    create_oauth_metadata_request,
+    extract_resource_metadata_from_www_auth,
+    get_client_metadata_scopes,
+    handle_auth_metadata_response,
+    handle_protected_resource_response,
+    handle_registration_response,
+)
+from mcp.shared.auth import (
+    OAuthClientInformationFull,
+    OAuthClientMetadata,
+    OAuthMetadata,
+    OAuthToken,
+    ProtectedResourceMetadata,
+)
+from mcp.shared.auth_utils import resource_url_from_server_url
+
+from history_store import DATA_DIR
+import metrics
+
+OAUTH_DIR = DATA_DIR / "oauth"
+# Access tokens are renewed this long before they expire (at most half their lifetime)
+REFRESH_MARGIN_SECONDS = 60.0
+# Upper bound on how long the refresh task sleeps between expiry checks
+REFRESH_CHECK_SECONDS = 300.0
+# The token cache key is kept away from the data dir it protects
+TOKEN_KEY_ENV = "MCP_INSPECTOR_TOKEN_KEY"
+KEYRING_SERVICE = "gradio-mcp-inspector"
+
+_refresh_task: asyncio.Task | None = None
+
+# Steps of the guided flow, in order; the last one connects with the new token
+GUIDED_STEPS = [
+    "Metadata Discovery",
+    "Client Registration",
+    "Preparing Authorization",
+    "Request Authorization and acquire authorization code",
+    "Token Request",
+    "Authentication Complete",
+]
+# flow id -> (serve task, server, callback result, ready event) for the guided flow's redirect listener
+_callback_servers: dict[str, tuple[asyncio.Task, Any, OAuthCallbackResult, anyio.Event]] = {}
+
+
+# "" once we know there is no key; the cache then stays in memory
+_token_key: str | None = None
+# server url -> cache entry, used when there is no key
+_memory_cache: dict[str, dict] = {}
+
+
+def _keyring_secret() -> str | None:
+    try:
+        import keyring
+
+        secret = keyring.get_password(KEYRING_SERVICE, "oauth-token-cache")
+        if secret is None:
+            secret = secrets.token_urlsafe(32)
+            keyring.set_password(KEYRING_SERVICE, "oauth-token-cache", secret)
+        return secret
+    except Exception:
+        # keyring not installed, or no usable backend (headless hosts)
+        return None
+
+
+def _cache_key() -> str | None:
+    """Secret for the token cache from the environment or the OS keyring, None without either."""
+    global _token_key
+    if _token_key is None:
+        _token_key = os.environ.get(TOKEN_KEY_ENV) or _keyring_secret() or ""
+        if not _token_key:
+            print(f"Neither {TOKEN_KEY_ENV} nor an OS keyring is available; OAuth tokens are kept in memory only.")
+    return _token_key or None
+
+
+def _fernet(key: str) -> Fernet:
+    digest = hashlib.sha256(b"oauth-token-cache:" + key.encode()).digest()
+    return Fernet(base64.urlsafe_b64encode(digest))
+
+
+class EncryptedTokenStorage:
+    """TokenStorage for one server URL, kept as a Fernet-encrypted file.
+
+    The key comes from MCP_INSPECTOR_TOKEN_KEY or the OS keyring, never
+    the data dir; without one, entries live in memory for this process.
+
+    Expiry is stored as an absolute time, so a token read back later
+    reports how long it actually has left rather than its original lifetime.
+    """
+
+    def __init__(self, server_url: str):
+        self.server_url = server_url
+        key = hashlib.sha256(server_url.encode()).hexdigest()[:16]
+        self.path = OAUTH_DIR / f"{key}.bin"
+
+    def _load(self) -> dict:
+        key = _cache_key()
+        if key is None:
+            return dict(_memory_cache.get(self.server_url, {}))
+        try:
+            return json.loads(_fernet(key).decrypt(self.path.read_bytes()))
+        except (OSError, InvalidToken, ValueError):
+            # Missing, or written under another key
+            return {}
+
+    def _save(self, data: dict):
+        data = data | {"server_url": self.server_url}
+        key = _cache_key()
+        if key is None:
+            # Fail closed: nothing reaches the disk without a key kept elsewhere
+            _memory_cache[self.server_url] = data
+            return
+        OAUTH_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_bytes(_fernet(key).encrypt(json.dumps(data).encode()))
+        tmp.chmod(0o600)
+        os.replace(tmp, self.path)
+
+    def _update(self, **fields):
+        data = self._load()
+        data.update(fields)
+        self._save(data)
+
+    async def get_tokens(self) -> OAuthToken | None:
+        data = self._load()
+        if not data.get("tokens"):
+            return None
+        tokens = OAuthToken.model_validate(data["tokens"])
+        if data.get("expires_at") is not None:
+            remaining = int(data["expires_at"] - time.time())
+            tokens.expires_in = remaining if remaining > 0 else -1
+        return tokens
+
+    async def set_tokens(self, tokens: OAuthToken) -> None:
+        expires_at = time.time() + int(tokens.expires_in) if tokens.expires_in else None
+        self._update(tokens=tokens.model_dump(mode="json"), expires_at=expires_at)
+
+    async def get_client_info(self) -> OAuthClientInformationFull | None:
+        data = self._load().get("client_info")
+        return OAuthClientInformationFull.model_validate(data) if data else None
+
+    async def set_client_info(self, client_info: OAuthClientInformationFull) -> None:
+        self._update(client_info=client_info.model_dump(mode="json"))
+
+    async def get_metadata(self) -> OAuthMetadata | None:
+        data = self._load().get("metadata")
+        return OAuthMetadata.model_validate(data) if data else None
+
+    async def set_metadata(self, metadata: OAuthMetadata) -> None:
+        self._update(metadata=metadata.model_dump(mode="json"))
+
+    async def clear(self) -> None:
+        _memory_cache.pop(self.server_url, None)
+        self.path.unlink(missing_ok=True)
+
+    def summary(self) -> dict[str, Any] | None:
+        """What is cached for this server, without secrets."""
+        data = self._load()
+        if not data:
+            return None
+        return {
+            "has_tokens": bool(data.get("tokens")),
+            "has_refresh_token": bool((data.get("tokens") or {}).get("refresh_token")),
+            "expires_at": data.get("expires_at"),
+            "client_id": (data.get("client_info") or {}).get("client_id"),
+        }
+
+
+def _cached_callback_port(storage: EncryptedTokenStorage) -> int | None:
+    # A registered client is only valid for the redirect URI it registered
+    client_info = storage._load().get("client_info") or {}
+    for uri in client_info.get("redirect_uris") or []:
+        port = urlparse(str(uri)).port
+        if port:
+            return port
+    return None
+
+
+class InspectableOAuth(OAuth):
+    """fastmcp OAuth with an encrypted on-disk cache and a record of each flow step."""
+
+    def __init__(self, mcp_url: str, *args, **kwargs):
+        storage = EncryptedTokenStorage(mcp_url)
+        kwargs.setdefault("callback_port", _cached_callback_port(storage))
+        # The key-value store is replaced below; NullStore avoids the in-memory warning
+        super().__init__(mcp_url, *args, token_storage=NullStore(), **kwargs)
+        self.token_storage_adapter = storage
+        self.context.storage = storage
+        self._flow_artifacts: dict[str, Any] = {
+            "authorization_url": None,
+            "authorization_code": None,
+            "state": None,
+        }
+
+    @property
+    def storage(self) -> EncryptedTokenStorage:
+        return self.token_storage_adapter
+
+    async def _initialize(self) -> None:
+        await super()._initialize()
+        # Without discovery (cached token) the token endpoint would otherwise be guessed
+        if self.context.oauth_metadata is None:
+            self.context.oauth_metadata = await self.storage.get_metadata()
+
+    async def redirect_handler(self, authorization_url: str) -> None:
+        self._flow_artifacts["authorization_url"] = authorization_url
+        await super().redirect_handler(authorization_url)
+
+    async def callback_handler(self) -> tuple[str, str | None]:
+        code, state = await super().callback_handler()
+        self._flow_artifacts["authorization_code"] = code
+        self._flow_artifacts["state"] = state
+        return code, state
+
+    async def persist_metadata(self):
+        if self.context.oauth_metadata is not None:
+            await self.storage.set_metadata(self.context.oauth_metadata)
+
+    async def refresh_if_expiring(self) -> bool:
+        """Use the refresh token now if the access token is about to expire."""
+        async with self.context.lock:
+            if not self._initialized:
+                await self._initialize()
+            expiry = self.context.token_expiry_time
+            if expiry is None or not self.context.can_refresh_token():
+                return False
+            if expiry - time.time() > _refresh_margin(self.context.current_tokens):
+                return False
+            request = await self._refresh_token()
+            async with self.httpx_client_factory() as client:
+                response = await client.send(request)
+            ok = await self._handle_refresh_response(response)
+        metrics.inc("mcp_inspector_oauth_refreshes_total", "Background OAuth token refreshes.",
+                    {"status": "ok" if ok else "error"})
+        return ok
+
+    def get_summary(self) -> dict[str, Any]:
+        token_endpoint = None
+        if (
+            self.context.oauth_metadata
+            and self.context.oauth_metadata.token_endpoint
+        ):
+            token_endpoint = str(self.context.oauth_metadata.token_endpoint)
+        else:
+            token_endpoint = f"{self.server_base_url}/token"
+
+        tokens = None
+        if self.context.current_tokens:
+            tokens = self.context.current_tokens.model_dump(mode="json")
+
+        return {
+            "authorization_url": self._flow_artifacts.get("authorization_url"),
+            "authorization_code": self._flow_artifacts.get("authorization_code"),
+            "token_endpoint": token_endpoint,
+            "tokens": tokens,
+        }
+
+
+def _refresh_margin(tokens: OAuthToken | None) -> float:
+    lifetime = (tokens.expires_in or 0) if tokens else 0
+    return min(REFRESH_MARGIN_SECONDS, max(lifetime, 0) / 2) if lifetime > 0 else REFRESH_MARGIN_SECONDS
+
+
+async def _keep_fresh(oauth: InspectableOAuth):
+    while True:
+        expiry = oauth.context.token_expiry_time
+        if expiry is None:
+            delay = REFRESH_CHECK_SECONDS
+        else:
+            delay = expiry - time.time() - _refresh_margin(oauth.context.current_tokens)
+        await asyncio.sleep(min(max(delay, 1.0), REFRESH_CHECK_SECONDS))
+        try:
+            await oauth.refresh_if_expiring()
+        except Exception:
+            # The next request falls back to the full flow; try again later
+            await asyncio.sleep(REFRESH_CHECK_SECONDS / 10)
+
+
+def start_refresh(oauth: InspectableOAuth):
+    """Keep the connected session's access token renewed ahead of expiry."""
+    global _refresh_task
+    stop_refresh()
+    _refresh_task = asyncio.create_task(_keep_fresh(oauth))
+
+
+def stop_refresh():
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        _refresh_task = None
+
+
+def cache_summary(mcp_url: str) -> dict[str, Any] | None:
+    return EncryptedTokenStorage(mcp_url).summary()
+
+
+async def clear_cache(mcp_url: str):
+    await EncryptedTokenStorage(mcp_url).clear()
+
+
+def new_guided_flow(mcp_url: str) -> dict:
+    """State for a step-by-step OAuth flow; kept in a gr.State between Continue clicks."""
+    storage = EncryptedTokenStorage(mcp_url)
+    port = _cached_callback_port(storage) or find_available_port()
+    return {
+        "id": uuid.uuid4().hex,
+        "mcp_url": mcp_url,
+        "step": 0,
+        "timings": [],
+        "redirect_uri": f"http://localhost:{port}/callback",
+        "resource_metadata": None,
+        "metadata": None,
+        "client_info": None,
+        "code_verifier": None,
+        "state": None,
+        "authorization_url": None,
+        "code": None,
+        "tokens": None,
+    }
+
+
+async def _discover(flow: dict, client: httpx.AsyncClient) -> str:
+    # An unauthenticated request may point at the resource metadata in WWW-Authenticate
+    probe = await client.post(flow["mcp_url"], json={}, headers={"Accept": "application/json, text/event-stream"})
+    resource_metadata = None
+    for url in build_protected_resource_metadata_discovery_urls(
+        extract_resource_metadata_from_www_auth(probe), flow["mcp_url"]
+    ):
+        resource_metadata = await handle_protected_resource_response(await client.send(create_oauth_metadata_request(url)))
+        if resource_metadata:
+            break
+    auth_server = str(resource_metadata.authorization_servers[0]) if resource_metadata else None
+
+    metadata = None
+    for url in build_oauth_authorization_server_metadata_discovery_urls(auth_server, flow["mcp_url"]):
+        keep_trying, metadata = await handle_auth_metadata_response(await client.send(create_oauth_metadata_request(url)))
+        if metadata or not keep_trying:
+            break
+    if metadata is None:
+        raise RuntimeError("No authorization server metadata found")
+
+    flow["resource_metadata"] = resource_metadata.model_dump(mode="json") if resource_metadata else None
+    flow["metadata"] = metadata.model_dump(mode="json")
+    return f"Authorization server {metadata.issuer}"
+
+
+async def _register(flow: dict, client: httpx.AsyncClient) -> str:
+    storage = EncryptedTokenStorage(flow["mcp_url"])
+    cached = await storage.get_client_info()
+    if cached and flow["redirect_uri"] in [str(u) for u in cached.redirect_uris or []]:
+        flow["client_info"] = cached.model_dump(mode="json")
+        return f"Reused cached client {cached.client_id}"
+
+    metadata = OAuthMetadata.model_validate(flow["metadata"])
+    if not metadata.registration_endpoint:
+        raise RuntimeError("The authorization server does not support dynamic client registration")
+    resource_metadata = flow["resource_metadata"] and ProtectedResourceMetadata.model_validate(flow["resource_metadata"])
+    client_metadata = OAuthClientMetadata(
+        client_name="Gradio MCP Inspector",
+        redirect_uris=[flow["redirect_uri"]],
+        grant_types=["authorization_code", "refresh_token"],
+        response_types=["code"],
+        scope=get_client_metadata_scopes(None, resource_metadata or None, metadata),
+    )
+    response = await client.post(
+        str(metadata.registration_endpoint),
+        json=client_metadata.model_dump(by_alias=True, mode="json", exclude_none=True),
+    )
+    client_info = await handle_registration_response(response)
+    flow["client_info"] = client_info.model_dump(mode="json")
+    return f"Registered client {client_info.client_id}"
+
+
+async def _prepare(flow: dict) -> str:
+    metadata = OAuthMetadata.model_validate(flow["metadata"])
+    client_info = OAuthClientInformationFull.model_validate(flow["client_info"])
+    pkce = PKCEParameters.generate()
+    flow["code_verifier"] = pkce.code_verifier
+    flow["state"] = secrets.token_urlsafe(32)
+    params = {
+        "response_type": "code",
+        "client_id": client_info.client_id,
+        "redirect_uri": flow["redirect_uri"],
+        "state": flow["state"],
+        "code_challenge": pkce.code_challenge,
+        "code_challenge_method": "S256",
+        "resource": _resource(flow),
+    }
+    if client_info.scope:
+        params["scope"] = client_info.scope
+    flow["authorization_url"] = f"{metadata.authorization_endpoint}?{urlencode(params)}"
+    flow["authorization_issued_at"] = time.time()
+    await _listen_for_callback(flow)
+    return "PKCE challenge and state generated; open the authorization URL"
+
+
+def _resource(flow: dict) -> str:
+    resource = resource_url_from_server_url(flow["mcp_url"])
+    if flow["resource_metadata"] and flow["resource_metadata"].get("resource"):
+        resource = str(flow["resource_metadata"]["resource"])
+    return resource
+
+
+async def _listen_for_callback(flow: dict):
+    await _stop_callback(flow["id"])
+    result = OAuthCallbackResult()
+    ready = anyio.Event()
+    server = create_oauth_callback_server(
+        port=urlparse(flow["redirect_uri"]).port,
+        server_url=flow["mcp_url"],
+        result_container=result,
+        result_ready=ready,
+    )
+    _callback_servers[flow["id"]] = (asyncio.create_task(server.serve()), server, result, ready)
+
+
+async def _stop_callback(flow_id: str):
+    entry = _callback_servers.pop(flow_id, None)
+    if entry is None:
+        return
+    task, server, _, _ = entry
+    server.should_exit = True
+    try:
+        await asyncio.wait_for(task, 2)
+    except (asyncio.TimeoutError, Exception):
+        task.cancel()
+
+
+def _pasted_code(flow: dict, pasted: str) -> str:
+    pasted = pasted.strip()
+    if "code=" not in pasted:
+        return pasted
+    query = parse_qs(urlparse(pasted).query or pasted.lstrip("?"))
+    if "state" in query and query["state"][0] != flow["state"]:
+        raise RuntimeError("The pasted URL belongs to a different authorization request (state mismatch)")
+    return query["code"][0]
+
+
+async def _authorize(flow: dict, pasted: str | None) -> str:
+    entry = _callback_servers.get(flow["id"])
+    if entry is not None and entry[3].is_set():
+        result = entry[2]
+        await _stop_callback(flow["id"])
+        if result.error:
+            raise result.error
+        if result.state != flow["state"]:
+            raise RuntimeError("Callback state does not match this authorization request")
+        flow["code"] = result.code
+        return "Code received on the local callback"
+    if pasted and pasted.strip():
+        flow["code"] = _pasted_code(flow, pasted)
+        await _stop_callback(flow["id"])
+        return "Code pasted"
+    raise RuntimeError("No authorization code yet: approve access at the authorization URL, "
+                       "or paste the code (or the redirected URL), then press Continue")
+
+
+async def _exchange(flow: dict, client: httpx.AsyncClient) -> str:
+    metadata = OAuthMetadata.model_validate(flow["metadata"])
+    client_info = OAuthClientInformationFull.model_validate(flow["client_info"])
+    data = {
+        "grant_type": "authorization_code",
+        "code": flow["code"],
+        "redirect_uri": flow["redirect_uri"],
+        "client_id": client_info.client_id,
+        "code_verifier": flow["code_verifier"],
+        "resource": _resource(flow),
+    }
+    if client_info.client_secret:
+        data["client_secret"] = client_info.client_secret
+    response = await client.post(str(metadata.token_endpoint), data=data)
+    if response.status_code != 200:
+        raise RuntimeError(f"Token request failed: {response.status_code} {response.text}")
+    tokens = OAuthToken.model_validate_json(response.content)
+    flow["tokens"] = tokens.model_dump(mode="json")
+
+    # The connect step (and later reconnects) pick the token up from the cache
+    storage = EncryptedTokenStorage(flow["mcp_url"])
+    await storage.set_client_info(client_info)
+    await storage.set_metadata(metadata)
+    await storage.set_tokens(tokens)
+    return f"Token issued, expires in {tokens.expires_in}s" if tokens.expires_in else "Token issued"
+
+
+def record_step(flow: dict, started: float, detail: str):
+    """Mark the current step done with its latency and move to the next one."""
+    seconds = time.perf_counter() - started
+    name = GUIDED_STEPS[flow["step"]]
+    metrics.observe("mcp_inspector_oauth_step_duration_seconds", "Latency of each guided OAuth step.",
+                    seconds, {"step": name})
+    flow["timings"].append({"step": name, "ms": round(seconds * 1000, 1), "detail": detail})
+    flow["step"] += 1
+
+
+async def advance_guided_flow(flow: dict, pasted_code: str | None = None, timeout_seconds: float = 30.0) -> dict:
+    """Run the next OAuth step (all but the final connect) and time it.
+
+    Returns an updated copy of the flow; on error the flow is left where it
+    was so Continue retries the same step.
+    """
+    flow = json.loads(json.dumps(flow))
+    step = flow["step"]
+    async with httpx.AsyncClient(timeout=timeout_seconds) as client:
+        # Timed from here: building the client (TLS context) is not the server's latency
+        started = time.perf_counter()
+        if step == 0:
+            detail = await _discover(flow, client)
+        elif step == 1:
+            detail = await _register(flow, client)
+        elif step == 2:
+            detail = await _prepare(flow)
+        elif step == 3:
+            detail = await _authorize(flow, pasted_code)
+        elif step == 4:
+            detail = await _exchange(flow, client)
+        else:
+            raise RuntimeError("Nothing left to run here; connect to finish the flow")
+    if step == 3 and flow.get("authorization_issued_at"):
+        # The step is timed from this Continue press, so the user's approval
+        # isn't in its latency; report that wait separately
+        detail += f"; user approval took {time.time() - flow['authorization_issued_at']:.1f}s (not counted)"
+    record_step(flow, started, detail)
+    return flow
+
+
+async def cancel_guided_flow(flow: dict | None):
+    if flow:
+        await _stop_callback(flow["id"])
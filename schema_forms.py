@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any
+
+from jsonschema import Draft202012Validator
+from jsonschema.validators import validator_for
+
+# Nested objects deeper than this are edited as raw JSON instead of being flattened.
+MAX_FORM_DEPTH = 3
+
+_SIMPLE_TYPES = ("string", "integer", "number", "boolean")
+
+
+def schema_key(schema: dict | None) -> str:
+    """Compact JSON for a schema, used as the compile cache key.
+
+    Keys are not sorted so the form keeps the schema's property order.
+    """
+    return json.dumps(schema or {}, separators=(",", ":"))
+
+
+def index_tools(tools_data: list[dict]) -> dict[str, dict]:
+    """Index tools by name and precompute their schema cache keys."""
+    index = {}
+    for tool in tools_data:
+        tool["_input_schema_key"] = schema_key(tool.get("inputSchema"))
+        if tool.get("outputSchema"):
+            tool["_output_schema_key"] = schema_key(tool["outputSchema"])
+        index[tool["name"]] = tool
+    return index
+
+
+def get_tool_spec(tool: dict) -> dict:
+    """Return the compiled form spec and argument validator for a tool."""
+    key = tool.get("_input_schema_key") or schema_key(tool.get("inputSchema"))
+    return _compile_cached(key)
+
+
+def get_input_validator(tool: dict):
+    key = tool.get("_input_schema_key") or schema_key(tool.get("inputSchema"))
+    return _validator_cached(key)
+
+
+def get_output_validator(tool: dict):
+    """Return the cached outputSchema validator, or None if the tool has none."""
+    if not tool.get("outputSchema"):
+        return None
+    key = tool.get("_output_schema_key") or schema_key(tool["outputSchema"])
+    return _validator_cached(key)
+
+
+@lru_cache(maxsize=1024)
+def _compile_cached(key: str) -> dict:
+    return {
+        "fields": compile_form(json.loads(key)),
+        "validator": _validator_cached(key),
+    }
+
+
+@lru_cache(maxsize=2048)
+def _validator_cached(key: str):
+    return compile_validator(json.loads(key))
+
+
+def compile_validator(schema: dict):
+    """Build a reusable jsonschema validator (draft picked from $schema)."""
+    cls = validator_for(schema, default=Draft202012Validator)
+    return cls(schema)
+
+
+def validate(validator, instance: Any) -> list[str]:
+    """Return human readable validation errors, empty when the instance is valid."""
+    errors = []
+    for error in sorted(validator.iter_errors(instance), key=lambda e: list(e.absolute_path)):
+        path = "/".join(str(p) for p in error.absolute_path) or "(root)"
+        errors.append(f"{path}: {error.message}")
+    return errors
+
+
+def _resolve_ref(node: dict, root: dict, seen: frozenset) -> tuple[dict, frozenset]:
+    ref = node.get("$ref")
+    if not isinstance(ref, str) or not ref.startswith("#"):
+        return node, seen
+    if ref in seen:
+        # Recursive definition; the caller falls back to a JSON field.
+        return {"description": node.get("description", "")}, seen
+
+    target: Any = root
+    for part in ref.lstrip("#").strip("/").split("/"):
+        if not part:
+            continue
+        part = part.replace("~1", "/").replace("~0", "~")
+        if not isinstance(target, dict) or part not in target:
+            return {k: v for k, v in node.items() if k != "$ref"}, seen
+        target = target[part]
+
+    merged = dict(target) if isinstance(target, dict) else {}
+    merged.update({k: v for k, v in node.items() if k != "$ref"})
+    return _resolve_ref(merged, root, seen | {ref})
+
+
+def _normalize(node: dict, root: dict, seen: frozenset = frozenset()) -> tuple[dict, frozenset]:
+    node, seen = _resolve_ref(node, root, seen)
+
+    if "allOf" in node:
+        merged = {k: v for k, v in node.items() if k != "allOf"}
+        for sub in node["allOf"]:
+            sub, seen = _normalize(sub, root, seen)
+            for k, v in sub.items():
+                if k == "properties":
+                    merged.setdefault("properties", {}).update(v)
+                elif k == "required":
+                    merged["required"] = list(merged.get("required", [])) + list(v)
+                else:
+                    merged.setdefault(k, v)
+        node = merged
+
+    for key in ("anyOf", "oneOf"):
+        options = node.get(key)
+        if not options:
+            continue
+        resolved = [_normalize(o, root, seen)[0] for o in options]
+        non_null = [o for o in resolved if o.get("type") != "null"]
+        base = {k: v for k, v in node.items() if k != key}
+        if len(non_null) == 1:
+            # Optional[X] style unions collapse to X.
+            merged = dict(non_null[0])
+            merged.update(base)
+            return merged, seen
+        if non_null and all("const" in o for o in non_null):
+            base["enum"] = [o["const"] for o in non_null]
+            return base, seen
+        base["_union"] = key
+        return base, seen
+
+    return node, seen
+
+
+def _field_type(node: dict) -> str | None:
+    node_type = node.get("type")
+    if isinstance(node_type, list):
+        node_type = next((t for t in node_type if t != "null"), None)
+    if node_type is None and "properties" in node:
+        return "object"
+    return node_type
+
+
+def compile_form(schema: dict) -> list[dict]:
+    """Flatten an object schema into a list of form field specs.
+
+    Nested objects become dotted fields (``parent.child``) up to
+    MAX_FORM_DEPTH; anything that cannot be represented by a single widget is
+    edited as JSON.
+    """
+    root = schema or {}
+    node, seen = _normalize(root, root)
+    fields: list[dict] = []
+    _compile_object(node, root, seen, (), True, node.get("default") or {}, fields)
+    return fields
+
+
+def _compile_object(node: dict, root: dict, seen: frozenset, path: tuple, required: bool, defaults: dict, fields: list):
+    required_names = set(node.get("required", []))
+    for name, prop in (node.get("properties") or {}).items():
+        prop, prop_seen = _normalize(prop if isinstance(prop, dict) else {}, root, seen)
+        prop_path = path + (name,)
+        prop_required = required and name in required_names
+        default = prop.get("default", defaults.get(name) if isinstance(defaults, dict) else None)
+        prop_type = _field_type(prop)
+
+        if prop_type == "object" and prop.get("properties") and len(prop_path) < MAX_FORM_DEPTH and "_union" not in prop:
+            _compile_object(prop, root, prop_seen, prop_path, prop_required, default or {}, fields)
+            continue
+
+        fields.append(_compile_field(prop, prop_path, prop_required, default, prop_type))
+
+
+def _compile_field(prop: dict, path: tuple, required: bool, default: Any, prop_type: str | None) -> dict:
+    field = {
+        "path": path,
+        "name": ".".join(path),
+        "label": ".".join(path) + (" *" if required else ""),
+        "description": prop.get("description", ""),
+        "required": required,
+        "default": default,
+        "type": prop_type,
+    }
+
+    enum_vals = prop.get("enum")
+    if enum_vals is None and "const" in prop:
+        enum_vals = [prop["const"]]
+    items = prop.get("items") if isinstance(prop.get("items"), dict) else {}
+
+    if enum_vals and "_union" not in prop:
+        field["kind"] = "dropdown"
+        field["choices"] = enum_vals
+    elif prop_type == "array" and items.get("enum"):
+        field["kind"] = "multiselect"
+        field["choices"] = items["enum"]
+    elif prop_type in _SIMPLE_TYPES and "_union" not in prop:
+        field["kind"] = {"string": "text", "boolean": "checkbox"}.get(prop_type, "number")
+    else:
+        field["kind"] = "json"
+        field["empty"] = "[]" if prop_type == "array" else "{}"
+    return field
+
+
+def collect_arguments(fields: list[dict], values: list[Any]) -> tuple[dict, list[str]]:
+    """Turn raw form values back into a (possibly nested) arguments dict."""
+    args: dict = {}
+    errors = []
+    for field, val in zip(fields, values):
+        if field["kind"] == "json":
+            text = (val or "").strip()
+            if not text or (text == field["empty"] and not field["required"] and field["default"] is None):
+                continue
+            try:
+                val = json.loads(text)
+            except ValueError as exc:
+                errors.append(f"{field['name']}: invalid JSON ({exc})")
+                continue
+        elif field["kind"] == "number" and val is not None:
+            if field["type"] == "integer" and float(val).is_integer():
+                val = int(val)
+        elif field["kind"] == "multiselect" and not val and not field["required"]:
+            continue
+
+        # Skip empty optional values rather than sending empty strings.
+        if val is None or val == "":
+            continue
+
+        target = args
+        for part in field["path"][:-1]:
+            target = target.setdefault(part, {})
+        target[field["path"][-1]] = val
+    return args, errors
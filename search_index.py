@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import bisect
+import itertools
+import re
+import threading
+import time
+from collections import defaultdict
+
+# Only the head of very large bodies is indexed to keep memory bounded.
+MAX_INDEXED_CHARS = 64 * 1024
+# Oldest history/notification documents are evicted beyond this count.
+MAX_DOCUMENTS = 200_000
+
+CATALOG_KINDS = ("tool", "resource", "template", "prompt")
+ALL_KINDS = CATALOG_KINDS + ("history", "notification")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_docs: dict[int, dict] = {}
+_postings: dict[str, set[int]] = {}
+_catalog_ids: dict[str, list[int]] = defaultdict(list)
+# Sorted vocabulary for prefix lookups; new tokens are merged in lazily on search.
+_vocab: list[str] = []
+_new_tokens: list[str] = []
+# Every token in _vocab or _new_tokens, so each is queued only once
+_vocab_set: set[str] = set()
+
+
+def tokenize(text: str) -> set[str]:
+    return set(_TOKEN_RE.findall(text[:MAX_INDEXED_CHARS].lower()))
+
+
+def add_document(
+    kind: str,
+    title: str,
+    text: str,
+    method: str = "",
+    status: str = "ok",
+    timestamp: float | None = None,
+    session: str = "",
+) -> int:
+    """Index one document and return its id.
+
+    Documents with a session (history) are only found by searches from that
+    session; catalogs and notifications belong to the shared connection.
+    """
+    tokens = tokenize(f"{title} {text}")
+    doc = {
+        "kind": kind,
+        "session": session,
+        "title": title,
+        "text": text[:MAX_INDEXED_CHARS],
+        "method": method,
+        "status": status,
+        "timestamp": timestamp if timestamp is not None else time.time(),
+        "tokens": tokens,
+    }
+    with _lock:
+        doc_id = next(_ids)
+        _docs[doc_id] = doc
+        for token in tokens:
+            ids = _postings.get(token)
+            if ids is None:
+                ids = _postings[token] = set()
+                if token not in _vocab_set:
+                    _vocab_set.add(token)
+                    _new_tokens.append(token)
+            ids.add(doc_id)
+        if kind in CATALOG_KINDS:
+            _catalog_ids[kind].append(doc_id)
+        elif len(_docs) > MAX_DOCUMENTS:
+            _evict_oldest()
+    return doc_id
+
+
+def replace_catalog(kind: str, items: list[tuple[str, str]]):
+    """Replace every indexed item of a catalog kind with (title, text) pairs."""
+    with _lock:
+        for doc_id in _catalog_ids.pop(kind, []):
+            _remove(doc_id)
+    for title, text in items:
+        add_document(kind, title, text, method=f"{kind}s/list")
+
+
+def clear(kinds: tuple[str, ...] | None = None, session: str | None = None):
+    """Drop documents of `kinds` (all by default), only those of `session` when given."""
+    with _lock:
+        for doc_id in [
+            d for d, doc in _docs.items()
+            if (kinds is None or doc["kind"] in kinds) and (session is None or doc["session"] == session)
+        ]:
+            _remove(doc_id)
+        if session is None:
+            for kind in kinds or CATALOG_KINDS:
+                _catalog_ids.pop(kind, None)
+
+
+def search(
+    query: str,
+    kinds: list[str] | None = None,
+    method: str = "",
+    status: str = "",
+    since: float | None = None,
+    until: float | None = None,
+    limit: int = 50,
+    session: str = "",
+) -> list[dict]:
+    """AND-match the query terms (last term as a prefix), newest first.
+
+    Only shared documents and those of `session` are returned.
+    """
+    terms = _TOKEN_RE.findall((query or "").lower())
+    method = (method or "").strip().lower()
+    with _lock:
+        # Ids grow with insertion time, so walking them in reverse yields newest
+        # first and lets us stop as soon as the page is full. Without terms
+        # the dict's own order is already by id, so nothing is sorted.
+        candidates = sorted(_match(terms), reverse=True) if terms else reversed(_docs)
+        results = []
+        for doc_id in candidates:
+            if len(results) >= limit:
+                break
+            doc = _docs[doc_id]
+            if doc["session"] and doc["session"] != session:
+                continue
+            if kinds and doc["kind"] not in kinds:
+                continue
+            if method and method not in doc["method"].lower():
+                continue
+            if status and doc["status"] != status:
+                continue
+            if since is not None and doc["timestamp"] < since:
+                continue
+            if until is not None and doc["timestamp"] > until:
+                continue
+            results.append((doc_id, doc))
+
+    return [
+        {k: v for k, v in doc.items() if k != "tokens"} | {"id": doc_id, "snippet": _snippet(doc["text"], terms)}
+        for doc_id, doc in results
+    ]
+
+
+def document_count() -> int:
+    return len(_docs)
+
+
+def _match(terms: list[str]) -> set[int]:
+    *exact, last = terms
+    sets = [_postings.get(t, set()) for t in exact]
+    if _new_tokens:
+        # Timsort merges the appended run cheaply into the already sorted list
+        _vocab.extend(_new_tokens)
+        _new_tokens.clear()
+        _vocab.sort()
+    if len(_vocab) > 2 * len(_postings) + 1024:
+        # Mostly tokens whose documents are gone; drop them so prefix scans stay short
+        _vocab[:] = [t for t in _vocab if t in _postings]
+        _vocab_set.intersection_update(_postings)
+    prefix_ids: set[int] = set()
+    start = bisect.bisect_left(_vocab, last)
+    end = bisect.bisect_left(_vocab, last + "{")  # "{" sorts right after "z"
+    for token in _vocab[start:end]:
+        ids = _postings.get(token)
+        if ids:
+            prefix_ids |= ids
+    sets.append(prefix_ids)
+    sets.sort(key=len)
+    result = set(sets[0])
+    for s in sets[1:]:
+        result &= s
+        if not result:
+            break
+    return result
+
+
+def _snippet(text: str, terms: list[str], width: int = 160) -> str:
+    lowered = text.lower()
+    pos = min((p for p in (lowered.find(t) for t in terms) if p >= 0), default=0)
+    start = max(pos - width // 4, 0)
+    snippet = text[start:start + width].replace("\n", " ")
+    return ("…" if start else "") + snippet + ("…" if start + width < len(text) else "")
+
+
+def _remove(doc_id: int):
+    doc = _docs.pop(doc_id, None)
+    if not doc:
+        return
+    for token in doc["tokens"]:
+        ids = _postings.get(token)
+        if ids is not None:
+            ids.discard(doc_id)
+            if not ids:
+                # The token stays in _vocab until the next compaction; lookups skip it.
+                del _postings[token]
+
+
+def _evict_oldest():
+    # Ids are increasing, so the dict's insertion order is oldest first.
+    for doc_id in list(itertools.islice(_docs, len(_docs) // 10 or 1)):
+        if _docs[doc_id]["kind"] not in CATALOG_KINDS:
+            _remove(doc_id)
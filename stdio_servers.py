@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import shlex
+import time
+from collections import defaultdict, deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from pathlib import Path
+from typing import Callable
+
+import anyio
+import mcp.types as types
+from fastmcp import Client
+from fastmcp.client import StdioTransport
+from mcp.shared.exceptions import McpError
+
+from history_store import DATA_DIR
+import metrics
+
+STDIO_TRANSPORT = "STDIO"
+# Stdio and in-process servers run code on this host, so any UI user could
+# run anything; they stay off unless the operator opts in
+ALLOW_LOCAL_SERVERS = os.environ.get("MCP_INSPECTOR_ALLOW_LOCAL_SERVERS", "0") == "1"
+STDIO_DIR = DATA_DIR / "stdio"
+# Prewarmed processes kept per server command; the connect panel can override it
+POOL_SIZE = int(os.environ.get("MCP_INSPECTOR_STDIO_POOL", 0))
+STDERR_MAX_BYTES = 1024 * 1024
+STDERR_TAIL_LINES = 200
+# How often the supervisor pings the connected process to notice a crash
+SUPERVISE_INTERVAL = 2.0
+# A server that crashes more often than this is left down instead of restarted
+MAX_RESTARTS = 5
+RESTART_WINDOW_SECONDS = 60.0
+
+# spec key -> idle (client, exit stack) pairs, initialized and ready to use
+_pool: defaultdict[str, deque[tuple[Client, AsyncExitStack]]] = defaultdict(deque)
+_refills: dict[str, asyncio.Task] = {}
+_status: dict[str, dict] = {}
+_status_version = 0
+
+
+def parse_server_spec(command: str, args_text: str = "", env_text: str = "") -> dict:
+    """Command, args and env from the connect panel.
+
+    The command may carry its own arguments; env is KEY=VALUE lines or a
+    JSON object.
+    """
+    argv = shlex.split(command or "") + shlex.split(args_text or "")
+    if not argv:
+        raise ValueError("Provide a command to start the server.")
+    env_text = (env_text or "").strip()
+    if env_text.startswith("{"):
+        env = {str(k): str(v) for k, v in json.loads(env_text).items()}
+    else:
+        env = {}
+        for line in env_text.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name, sep, value = line.partition("=")
+            if not sep:
+                raise ValueError(f"Expected KEY=VALUE, got {line!r}")
+            env[name.strip()] = value.strip()
+    return {"command": argv[0], "args": argv[1:], "env": env}
+
+
+def spec_key(spec: dict) -> str:
+    canonical = json.dumps([spec["command"], spec["args"], sorted(spec["env"].items())])
+    return hashlib.sha256(canonical.encode()).hexdigest()[:12]
+
+
+def describe(spec: dict) -> str:
+    return shlex.join([spec["command"]] + spec["args"])
+
+
+def stderr_path(spec: dict) -> Path:
+    return STDIO_DIR / f"{spec_key(spec)}.stderr.log"
+
+
+def _mark_start(spec: dict):
+    path = stderr_path(spec)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists() and path.stat().st_size > STDERR_MAX_BYTES:
+        os.replace(path, path.with_name(path.name + ".1"))
+    with open(path, "a") as f:
+        f.write(f"--- {time.strftime('%Y-%m-%d %H:%M:%S')} starting {describe(spec)} ---\n")
+
+
+def make_transport(spec: dict) -> StdioTransport:
+    # keep_alive=False: leaving the client terminates the process tree
+    return StdioTransport(
+        spec["command"],
+        spec["args"],
+        env=spec["env"] or None,
+        keep_alive=False,
+        log_file=stderr_path(spec),
+    )
+
+
+def _update_status(spec: dict, **fields):
+    global _status_version
+    key = spec_key(spec)
+    status = _status.setdefault(key, {
+        "command": describe(spec),
+        "state": "starting",
+        "restarts": 0,
+        "crashes": deque(maxlen=MAX_RESTARTS + 1),
+        "last_crash": None,
+    })
+    status.update(fields)
+    _status_version += 1
+
+
+def status(spec: dict) -> dict | None:
+    status = _status.get(spec_key(spec))
+    if status is None:
+        return None
+    return status | {"idle": len(_pool[spec_key(spec)])}
+
+
+def status_version() -> int:
+    return _status_version
+
+
+def check_local_servers_allowed(kind: str):
+    if not ALLOW_LOCAL_SERVERS:
+        raise PermissionError(f"{kind} servers are disabled; set MCP_INSPECTOR_ALLOW_LOCAL_SERVERS=1 to allow them.")
+
+
+async def _start(spec: dict, make_client: Callable[[StdioTransport], Client]) -> tuple[Client, AsyncExitStack]:
+    # Every process, pooled or not, is started here
+    check_local_servers_allowed("Stdio")
+    _mark_start(spec)
+    stack = AsyncExitStack()
+    client = make_client(make_transport(spec))
+    try:
+        await stack.enter_async_context(client)
+    except BaseException:
+        await stack.aclose()
+        raise
+    return client, stack
+
+
+async def _refill(spec: dict, make_client: Callable[[StdioTransport], Client], size: int):
+    key = spec_key(spec)
+    try:
+        while len(_pool[key]) < size:
+            _pool[key].append(await _start(spec, make_client))
+            _update_status(spec)
+    except Exception:
+        # The reason is in the server's stderr log; the next acquire starts one directly
+        pass
+    finally:
+        _refills.pop(key, None)
+
+
+async def acquire(
+    spec: dict, make_client: Callable[[StdioTransport], Client], pool_size: int = POOL_SIZE
+) -> tuple[Client, AsyncExitStack]:
+    """An initialized client for `spec`, taken from the pool when one is idle.
+
+    The caller owns the returned exit stack; closing it stops the process.
+    The pool is topped back up to `pool_size` in the background.
+    """
+    key = spec_key(spec)
+    if _pool[key]:
+        entry = _pool[key].popleft()
+        metrics.inc("mcp_inspector_stdio_pool_hits_total", "Stdio connections served by a prewarmed process.")
+    else:
+        entry = await _start(spec, make_client)
+    _update_status(spec, state="running")
+    if pool_size > len(_pool[key]) and key not in _refills:
+        _refills[key] = asyncio.create_task(_refill(spec, make_client, pool_size))
+    elif pool_size < len(_pool[key]):
+        # The pool size was lowered; stop the surplus processes
+        await _close_idle(key, len(_pool[key]) - pool_size)
+    return entry
+
+
+async def _close_idle(key: str, count: int | None = None):
+    entries = _pool[key]
+    while entries and (count is None or count > 0):
+        _, stack = entries.pop()
+        if count is not None:
+            count -= 1
+        try:
+            await stack.aclose()
+        except Exception:
+            pass
+
+
+async def drain_pool(keep: dict | None = None):
+    """Stop every prewarmed process, except those for the `keep` spec."""
+    kept = spec_key(keep) if keep is not None else None
+    for key in list(_refills):
+        if key != kept:
+            _refills.pop(key).cancel()
+    for key in list(_pool):
+        if key != kept:
+            await _close_idle(key)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Server lifespan that stops the prewarmed processes on shutdown."""
+    yield
+    await drain_pool()
+
+
+def connection_lost(exc: BaseException) -> bool:
+    """Whether an error means the server process is gone, not just failing."""
+    if isinstance(exc, (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)):
+        return True
+    return isinstance(exc, McpError) and exc.error.code == types.CONNECTION_CLOSED
+
+
+def record_crash(spec: dict) -> bool:
+    """Note a crash; returns whether the restart budget allows another restart."""
+    key = spec_key(spec)
+    now = time.time()
+    _update_status(spec, state="restarting", last_crash=now)
+    crashes = _status[key]["crashes"]
+    crashes.append(now)
+    recent = [t for t in crashes if now - t <= RESTART_WINDOW_SECONDS]
+    if len(recent) > MAX_RESTARTS:
+        _update_status(spec, state="crashed")
+        return False
+    metrics.inc("mcp_inspector_stdio_restarts_total", "Stdio server processes restarted after a crash.")
+    _status[key]["restarts"] += 1
+    return True
+
+
+def restart_delay(spec: dict) -> float:
+    """Back off between restarts of a server that keeps crashing."""
+    recent = len(_status[spec_key(spec)]["crashes"])
+    return min(0.25 * 2 ** (recent - 1), 10.0)
+
+
+def mark_stopped(spec: dict):
+    if spec_key(spec) in _status:
+        _update_status(spec, state="stopped")
+
+
+def stderr_tail(spec: dict, lines: int = STDERR_TAIL_LINES) -> str:
+    path = stderr_path(spec)
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 64 * 1024, 0))
+            data = f.read()
+    except OSError:
+        return ""
+    return "\n".join(data.decode(errors="replace").splitlines()[-lines:])
+
+
+def stderr_size(spec: dict) -> int:
+    try:
+        return stderr_path(spec).stat().st_size
+    except OSError:
+        return 0
+
+
+def _collect_metrics():
+    yield ("mcp_inspector_stdio_pool_idle", "gauge", "Prewarmed stdio server processes waiting to be used.",
+           [({"command": _status[key]["command"] if key in _status else key}, float(len(entries)))
+            for key, entries in _pool.items()])
+
+
+metrics.register_collector(_collect_metrics)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from history_store import DATA_DIR
+from metrics import percentile
+from uri_template import expand
+
+SWEEP_DIR = DATA_DIR / "sweeps"
+
+
+def parse_parameter_sets(text: str) -> list[dict]:
+    """Parameter sets for a template, as JSON lines or CSV with a header row."""
+    text = (text or "").strip()
+    if not text:
+        return []
+    if text.startswith("{"):
+        sets = []
+        for number, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError(f"line {number} is not a JSON object: {line.strip()[:80]}")
+            sets.append(row)
+        return sets
+    return [
+        {k.strip(): v for k, v in row.items() if k and v not in (None, "")}
+        for row in csv.DictReader(io.StringIO(text))
+    ]
+
+
+def template_uris(template: str, parameter_sets: list[dict]) -> list[str]:
+    return [expand(template, params) for params in parameter_sets]
+
+
+def _payload_size(contents: list) -> int:
+    size = 0
+    for item in contents:
+        text = getattr(item, "text", None)
+        if isinstance(text, str):
+            size += len(text.encode())
+        blob = getattr(item, "blob", None)
+        if isinstance(blob, str):
+            size += len(blob) * 3 // 4
+    return size
+
+
+async def run_sweep(
+    uris: list[str],
+    read: Callable[[str], Awaitable[list]],
+    concurrency: int = 8,
+    timeout_seconds: float = 30.0,
+) -> tuple[Path, dict]:
+    """Read every URI with at most `concurrency` requests in flight.
+
+    Each result is appended to a JSONL file as soon as it completes, so
+    nothing but the per-URI stats is kept in memory.
+    """
+    SWEEP_DIR.mkdir(parents=True, exist_ok=True)
+    path = SWEEP_DIR / f"sweep-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}.jsonl"
+    semaphore = asyncio.Semaphore(max(int(concurrency), 1))
+    results: list[dict] = []
+
+    with open(path, "w") as out:
+        async def _read(index: int, uri: str):
+            async with semaphore:
+                started = time.perf_counter()
+                record = {"index": index, "uri": uri}
+                try:
+                    contents = await asyncio.wait_for(read(uri), timeout_seconds)
+                    record.update(ok=True, items=len(contents), size=_payload_size(contents))
+                except Exception as exc:
+                    record.update(ok=False, items=0, size=0, error=f"{type(exc).__name__}: {exc}")
+                record["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            out.write(json.dumps(record) + "\n")
+            results.append(record)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_read(i, uri) for i, uri in enumerate(uris)))
+        wall = time.perf_counter() - started
+
+    return path, summarize(results, wall)
+
+
+def summarize(results: list[dict], wall_seconds: float) -> dict:
+    latencies = sorted(r["latency_ms"] for r in results if r["ok"])
+
+    return {
+        "requests": len(results),
+        "ok": len(latencies),
+        "errors": len(results) - len(latencies),
+        "bytes": sum(r["size"] for r in results),
+        "wall_seconds": round(wall_seconds, 3),
+        "requests_per_second": round(len(results) / wall_seconds, 1) if wall_seconds else None,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1] if latencies else None,
+        "results": results,
+    }
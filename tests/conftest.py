@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The modules live at the repo root and read their data dir at import time
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MCP_INSPECTOR_DATA_DIR", tempfile.mkdtemp(prefix="mcp-inspector-tests-"))
+# The tests connect to in-process servers
+os.environ.setdefault("MCP_INSPECTOR_ALLOW_LOCAL_SERVERS", "1")
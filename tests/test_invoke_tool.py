@@ -0,0 +1,63 @@
+import asyncio
+
+import mcp.types as types
+from fastmcp import FastMCP
+from fastmcp.tools.tool import ToolResult
+
+import inprocess
+import mcp_client
+
+SCORE_SCHEMA = {
+    "type": "object",
+    "properties": {"score": {"type": "integer"}},
+    "required": ["score"],
+}
+
+mcp = FastMCP("drift")
+
+
+# A ToolResult with _meta is passed through as-is, so the server doesn't
+# check it against the outputSchema and the drift reaches the client
+@mcp.tool(output_schema=SCORE_SCHEMA)
+def drifted() -> ToolResult:
+    return ToolResult(
+        content=[types.TextContent(type="text", text="scored")],
+        structured_content={"score": "not-int"},
+        meta={},
+    )
+
+
+@mcp.tool(output_schema=SCORE_SCHEMA)
+def conforming() -> ToolResult:
+    return ToolResult(
+        content=[types.TextContent(type="text", text="scored")],
+        structured_content={"score": 3},
+        meta={},
+    )
+
+
+def _call(tool_name: str) -> tuple[str, str]:
+    async def run():
+        await mcp_client.connect(f"{__file__}:mcp", 10, inprocess.IN_PROCESS_TRANSPORT)
+        try:
+            await mcp_client.list_tools("", 10)
+            return await mcp_client.invoke_tool("", 10, tool_name, "{}")
+        finally:
+            await mcp_client.disconnect()
+
+    return asyncio.run(run())
+
+
+def test_output_schema_drift_is_reported_with_the_result():
+    request, response = _call("drifted")
+    assert request == "call_tool(drifted)"
+    assert "scored" in response
+    assert "❌ **Output schema: fail**" in response
+    assert "score: 'not-int' is not of type 'integer'" in response
+    assert "validate output" in response
+
+
+def test_conforming_output_passes():
+    request, response = _call("conforming")
+    assert request == "call_tool(conforming)"
+    assert "✅ **Output schema: pass**" in response
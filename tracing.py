@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import httpx
+from mcp.shared._httpx_utils import create_mcp_http_client
+
+from history_store import DATA_DIR
+
+# "", "console", "file" or "otlp"; tracing is off unless set
+TRACING_MODE = os.environ.get("MCP_INSPECTOR_TRACING", "").strip().lower()
+TRACE_FILE = os.environ.get("MCP_INSPECTOR_TRACE_FILE", str(DATA_DIR / "traces.jsonl"))
+
+_tracer = None
+# traceparent of the innermost span in the current task
+_traceparent: ContextVar[str | None] = ContextVar("mcp_inspector_traceparent", default=None)
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_exception(self, exc: BaseException):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def setup() -> bool:
+    """Install the tracer provider for TRACING_MODE. Returns whether tracing is on."""
+    global _tracer
+    if _tracer is not None or not TRACING_MODE:
+        return _tracer is not None
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    except ImportError:
+        print("MCP_INSPECTOR_TRACING is set but opentelemetry-sdk is not installed; tracing disabled.")
+        return False
+
+    if TRACING_MODE == "otlp":
+        try:
+            # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* variables
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            print("OTLP tracing needs opentelemetry-exporter-otlp-proto-http; tracing disabled.")
+            return False
+        exporter = OTLPSpanExporter()
+    elif TRACING_MODE == "file":
+        os.makedirs(os.path.dirname(TRACE_FILE) or ".", exist_ok=True)
+        exporter = ConsoleSpanExporter(
+            out=open(TRACE_FILE, "a"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    else:
+        exporter = ConsoleSpanExporter()
+
+    provider = TracerProvider(resource=Resource.create({"service.name": "gradio-mcp-inspector"}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("gradio-mcp-inspector")
+    _propagate_in_meta()
+    return True
+
+
+def _propagate_in_meta():
+    """Stamp each MCP request's params._meta with the caller's traceparent.
+
+    The session's HTTP writer runs in a task started at connect time, so the
+    caller's context never reaches it; the request body does. Stdio and
+    in-process servers see the same field.
+    """
+    from mcp.client.session import ClientSession
+
+    send_request = ClientSession.send_request
+
+    async def traced_send_request(self, request, *args, **kwargs):
+        traceparent = _traceparent.get()
+        if traceparent:
+            data = request.model_dump(by_alias=True, mode="json", exclude_none=True)
+            data.setdefault("params", {}).setdefault("_meta", {})["traceparent"] = traceparent
+            request = type(request).model_validate(data)
+        return await send_request(self, request, *args, **kwargs)
+
+    ClientSession.send_request = traced_send_request
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+@contextmanager
+def span(name: str, attributes: dict[str, Any] | None = None):
+    """Client span around one MCP call; a no-op when tracing is off."""
+    if _tracer is None:
+        yield _NOOP_SPAN
+        return
+
+    from opentelemetry import propagate, trace
+
+    with _tracer.start_as_current_span(
+        name,
+        kind=trace.SpanKind.CLIENT,
+        attributes={k: v for k, v in (attributes or {}).items() if v is not None},
+        record_exception=True,
+    ) as current:
+        carrier: dict[str, str] = {}
+        propagate.inject(carrier)
+        token = _traceparent.set(carrier.get("traceparent"))
+        try:
+            yield current
+        except Exception as exc:
+            current.set_status(trace.Status(trace.StatusCode.ERROR, str(exc)))
+            raise
+        finally:
+            _traceparent.reset(token)
+
+
+async def _inject_traceparent(request: httpx.Request):
+    # For clients whose requests are sent from the caller's own task
+    traceparent = _traceparent.get()
+    if traceparent and "traceparent" not in request.headers:
+        request.headers["traceparent"] = traceparent
+
+
+async def _lift_traceparent(request: httpx.Request):
+    # MCP transports send from a long-lived writer task whose context is stale,
+    # so copy the traceparent stamped into the JSON-RPC body instead
+    body = request.content
+    if "traceparent" in request.headers or b'"traceparent"' not in body:
+        return
+    try:
+        message = json.loads(body)
+        traceparent = message["params"]["_meta"]["traceparent"]
+    except (ValueError, KeyError, TypeError):
+        return
+    if isinstance(traceparent, str):
+        request.headers["traceparent"] = traceparent
+
+
+def instrument_http_client(client: httpx.AsyncClient) -> httpx.AsyncClient:
+    if _tracer is not None:
+        client.event_hooks["request"].append(_inject_traceparent)
+    return client
+
+
+def http_client_factory(
+    headers: dict[str, str] | None = None,
+    timeout: httpx.Timeout | None = None,
+    auth: httpx.Auth | None = None,
+) -> httpx.AsyncClient:
+    """MCP transport client factory that sends each request's traceparent as a header."""
+    client = create_mcp_http_client(headers=headers, timeout=timeout, auth=auth)
+    if _tracer is not None:
+        client.event_hooks["request"].append(_lift_traceparent)
+    return client
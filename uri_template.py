@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any
+from urllib.parse import quote, unquote
+
+# RFC 6570 operator table: prefix, separator, named, value for empty named vars, allow reserved
+_OPERATORS = {
+    "": ("", ",", False, "", False),
+    "+": ("", ",", False, "", True),
+    "#": ("#", ",", False, "", True),
+    ".": (".", ".", False, "", False),
+    "/": ("/", "/", False, "", False),
+    ";": (";", ";", True, "", False),
+    "?": ("?", "&", True, "=", False),
+    "&": ("&", "&", True, "=", False),
+}
+
+_RESERVED = ":/?#[]@!$&'()*+,;="
+_EXPRESSION_RE = re.compile(r"\{([^{}]*)\}")
+_VARSPEC_RE = re.compile(r"^((?:[A-Za-z0-9_]|%[0-9A-Fa-f]{2})(?:\.?(?:[A-Za-z0-9_]|%[0-9A-Fa-f]{2}))*)(?::([1-9][0-9]{0,3})|(\*))?$")
+_PCT_RE = re.compile(r"(%[0-9A-Fa-f]{2})")
+
+# What a single value may contain when matching a URI back to a template
+_MATCH_CHARS = {
+    "": r"[^/?#,]*",
+    "+": r"[^?#,]*",
+    "#": r"[^,]*",
+    ".": r"[^/?#.]*",
+    "/": r"[^/?#]*",
+    ";": r"[^/?#;]*",
+}
+
+
+class TemplateError(ValueError):
+    pass
+
+
+@lru_cache(maxsize=1024)
+def compile_template(template: str) -> dict:
+    """Parse a URI template once into literal and expression parts."""
+    parts: list = []
+    pos = 0
+    for m in _EXPRESSION_RE.finditer(template):
+        if m.start() > pos:
+            parts.append(template[pos:m.start()])
+        body = m.group(1)
+        op = body[:1] if body[:1] and body[:1] in _OPERATORS else ""
+        varspecs = []
+        for spec in body[len(op):].split(","):
+            vm = _VARSPEC_RE.match(spec)
+            if not vm:
+                raise TemplateError(f"Invalid variable {spec!r} in {template!r}")
+            varspecs.append({
+                "name": vm.group(1),
+                "prefix": int(vm.group(2)) if vm.group(2) else None,
+                "explode": bool(vm.group(3)),
+                "operator": op,
+            })
+        parts.append((op, tuple(varspecs)))
+        pos = m.end()
+    if pos < len(template):
+        parts.append(template[pos:])
+    if any("{" in p or "}" in p for p in parts if isinstance(p, str)):
+        raise TemplateError(f"Unbalanced braces in {template!r}")
+    return {"template": template, "parts": tuple(parts)}
+
+
+def variables(template: str) -> list[dict]:
+    """Variables in template order: name, operator, prefix, explode."""
+    seen = {}
+    for part in compile_template(template)["parts"]:
+        if isinstance(part, tuple):
+            for spec in part[1]:
+                seen.setdefault(spec["name"], spec)
+    return list(seen.values())
+
+
+def _encode(value: str, allow_reserved: bool) -> str:
+    if not allow_reserved:
+        return quote(value, safe="")
+    # Reserved expansion keeps reserved characters and existing pct-encoded triplets
+    return "".join(
+        piece if _PCT_RE.fullmatch(piece) else quote(piece, safe=_RESERVED)
+        for piece in _PCT_RE.split(value)
+    )
+
+
+def _stringify(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _expand_expression(op: str, varspecs: tuple, values: dict) -> str:
+    first, sep, named, ifemp, allow_reserved = _OPERATORS[op]
+    out = []
+    for spec in varspecs:
+        value = values.get(spec["name"])
+        if value is None or (isinstance(value, (list, tuple, dict)) and not value):
+            continue
+        name = spec["name"]
+
+        if not isinstance(value, (list, tuple, dict)):
+            text = _stringify(value)
+            if spec["prefix"]:
+                text = text[:spec["prefix"]]
+            if named:
+                out.append(f"{name}={_encode(text, allow_reserved)}" if text else f"{name}{ifemp}")
+            else:
+                out.append(_encode(text, allow_reserved))
+            continue
+
+        if isinstance(value, dict):
+            pairs = [(_encode(_stringify(k), allow_reserved), _encode(_stringify(v), allow_reserved)) for k, v in value.items()]
+        else:
+            pairs = [(None, _encode(_stringify(v), allow_reserved)) for v in value]
+
+        if not spec["explode"]:
+            joined = ",".join(f"{k},{v}" if k is not None else v for k, v in pairs)
+            out.append(f"{name}={joined}" if named else joined)
+        elif named:
+            out.append(sep.join(
+                (f"{k or name}={v}" if v else f"{k or name}{ifemp}") for k, v in pairs
+            ))
+        else:
+            out.append(sep.join(f"{k}={v}" if k is not None else v for k, v in pairs))
+
+    return first + sep.join(out) if out else ""
+
+
+def expand(template: str, values: dict[str, Any]) -> str:
+    """Expand a URI template (RFC 6570 levels 1-4).
+
+    Values may be strings, numbers, lists or dicts; None and empty
+    lists/dicts are undefined and drop out of the expansion.
+    """
+    return "".join(
+        part if isinstance(part, str) else _expand_expression(part[0], part[1], values)
+        for part in compile_template(template)["parts"]
+    )
+
+
+@lru_cache(maxsize=1024)
+def _match_pattern(template: str) -> tuple[re.Pattern, tuple]:
+    """Regex for reverse matching plus (group, spec) pairs, in group order."""
+    regex = []
+    groups = []
+    for part in compile_template(template)["parts"]:
+        if isinstance(part, str):
+            regex.append(re.escape(part))
+            continue
+        op, varspecs = part
+        if op in ("?", "&"):
+            # Query parameters can come in any order; captured whole and parsed
+            group = f"g{len(groups)}"
+            groups.append((group, {"name": None, "operator": op, "specs": varspecs}))
+            regex.append(f"(?P<{group}>{re.escape(op)}[^#]*)?")
+            continue
+        first, sep, named, _, _ = _OPERATORS[op]
+        chars = _MATCH_CHARS[op]
+        pieces = []
+        for spec in varspecs:
+            group = f"g{len(groups)}"
+            groups.append((group, spec))
+            value = f"(?:{chars}(?:{re.escape(sep)}{chars})*)" if spec["explode"] else chars
+            if named:
+                pieces.append(f"{re.escape(spec['name'])}(?:=(?P<{group}>{value}))?")
+            else:
+                pieces.append(f"(?P<{group}>{value})")
+        if op in ("", "+", "#"):
+            # Comma separated: later variables are optional
+            body = pieces[0] + "".join(f"(?:,{p})?" for p in pieces[1:])
+            regex.append(f"(?:{re.escape(first)}{body})?" if first else body)
+        else:
+            regex.append("".join(f"(?:{re.escape(first)}{p})?" for p in pieces))
+    return re.compile("^" + "".join(regex) + "$"), tuple(groups)
+
+
+def match(template: str, uri: str, lists: frozenset[str] | set[str] = frozenset()) -> dict[str, Any] | None:
+    """Reverse an expansion: the variables that produce `uri`, or None.
+
+    Exploded variables come back as lists, as do non-exploded ones named in
+    `lists` (split on commas); other values stay strings. Ambiguous
+    templates resolve to the first (greedy) match.
+    """
+    pattern, groups = _match_pattern(template)
+    m = pattern.match(uri)
+    if m is None:
+        return None
+    result: dict[str, Any] = {}
+    for group, spec in groups:
+        raw = m.group(group)
+        if raw is None:
+            continue
+        if spec["name"] is None:
+            wanted = {s["name"]: s for s in spec["specs"]}
+            # Split before decoding, and with unquote rather than parse_qsl:
+            # expand() writes spaces as %20, so a literal "+" is a plus
+            for pair in raw[1:].split("&"):
+                key, _, value = pair.partition("=")
+                key = unquote(key)
+                if key in wanted:
+                    s = wanted[key]
+                    if s["explode"]:
+                        result.setdefault(key, []).append(unquote(value))
+                    else:
+                        result[key] = [unquote(v) for v in value.split(",")] if key in lists else unquote(value)
+            continue
+        _, sep, named, _, _ = _OPERATORS[spec["operator"]]
+        if spec["explode"]:
+            items = raw.split(sep)
+            if named:
+                # ";list=a;list=b" captures "a;list=b": later items repeat the name
+                prefix = spec["name"] + "="
+                items = items[:1] + [v[len(prefix):] if v.startswith(prefix) else ("" if v == spec["name"] else v) for v in items[1:]]
+            result[spec["name"]] = [unquote(v) for v in items]
+        elif spec["name"] in lists:
+            result[spec["name"]] = [unquote(v) for v in raw.split(",")]
+        else:
+            result[spec["name"]] = unquote(raw)
+    return result
+
+
+def find_template(
+    templates: list[str], uri: str, lists: frozenset[str] | set[str] = frozenset()
+) -> tuple[str, dict[str, Any]] | None:
+    """First template that `uri` could have been expanded from, with its variables."""
+    for template in templates:
+        try:
+            values = match(template, uri, lists)
+        except TemplateError:
+            continue
+        if values is not None:
+            return template, values
+    return None